@@ -0,0 +1,108 @@
+"""
+Benchmarks of drf_query_filter.
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks macro --rows 1000000 --output macro.json
+    python -m benchmarks compare baseline.json results.json
+"""
+
+import argparse
+import sys
+
+
+from . import (
+    runner,
+    settings,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the micro benchmarks")
+    run_parser.add_argument("--output", help="path of the json file with the results")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "--select", default="", help="only run the benchmarks whose id contains it"
+    )
+    run_parser.add_argument(
+        "--quick", action="store_true", help="run every benchmark only once"
+    )
+
+    macro_parser = subparsers.add_parser(
+        "macro", help="run requests through a view over synthetic rows"
+    )
+    macro_parser.add_argument("--output", help="path of the json file with the results")
+    macro_parser.add_argument("--rows", type=int, default=1_000_000)
+    macro_parser.add_argument(
+        "--database",
+        default="benchmark.sqlite3",
+        help="sqlite file, reused between runs with the same seed",
+    )
+    macro_parser.add_argument("--requests", type=int, default=50)
+    macro_parser.add_argument("--seed", type=int, default=0)
+    macro_parser.add_argument(
+        "--select", default="", help="only run the scenarios whose name contains it"
+    )
+    macro_parser.add_argument(
+        "--no-indexes",
+        dest="indexes",
+        action="store_false",
+        help="do not create indexes over the filtered columns",
+    )
+
+    compare_parser = subparsers.add_parser("compare", help="compare two results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = runner.compare(
+            runner.load(args.baseline),
+            runner.load(args.current),
+            threshold=args.threshold,
+        )
+        return 1 if regressions else 0
+
+    if args.command == "macro":
+        settings.setup(database_name=args.database)
+        settings.create_tables()
+
+        from . import (
+            dataset,
+            macro,
+        )
+
+        dataset.populate(args.rows, seed=args.seed, indexes=args.indexes, output=print)
+        results = macro.run(
+            args.rows, requests=args.requests, seed=args.seed, select=args.select
+        )
+    else:
+        settings.setup()
+        settings.create_tables()
+
+        from . import micro
+
+        results = runner.run(
+            micro.get_benchmarks(),
+            repeat=args.repeat,
+            quick=args.quick,
+            select=args.select,
+        )
+
+    if args.output:
+        runner.dump(results, args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Synthetic data for `tests.models.BasicModel`, the rows only depend on the
+seed so a database can be rebuilt to compare runs.
+"""
+
+import datetime
+import random
+from collections.abc import (
+    Callable,
+    Iterator,
+)
+
+
+from django.db import (
+    connection,
+    transaction,
+)
+
+
+from tests.models import BasicModel
+
+# fmt: off
+FIRST_NAMES = [
+    "Ada", "Alan", "Barbara", "Carlos", "Dennis", "Edsger", "Frances", "Grace",
+    "Guido", "Hedy", "Ivan", "Jean", "John", "Ken", "Linus", "Margaret",
+    "Niklaus", "Radia", "Roger", "Sophie", "Tim", "Ursula", "Whitfield", "Yukihiro",
+]
+LAST_NAMES = [
+    "Allen", "Bartik", "Cerf", "Dijkstra", "Engelbart", "Goldberg", "Hamilton",
+    "Hopper", "Kahn", "Knuth", "Lamarr", "Liskov", "Lovelace", "Milner", "Perlman",
+    "Ritchie", "Rossum", "Simon", "Sutherland", "Thompson", "Torvalds", "Turing",
+    "Wirth", "Wilson",
+]
+# fmt: on
+
+START_DATE = datetime.date(2020, 1, 1)
+DAYS = 365 * 6
+INTEGER_MAX = 10_000
+
+INDEXES = {
+    "integer": ["integer"],
+    "date": ["date"],
+    "string_uno": ["string_uno"],
+    "string_dos": ["string_dos"],
+}
+
+
+def generate_rows(
+    count: int, seed: int = 0
+) -> Iterator[tuple[str, str, datetime.date, int, bool]]:
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        yield (
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            START_DATE + datetime.timedelta(days=rng.randrange(DAYS)),
+            # Skewed towards the small values like most real ids/counters
+            int(rng.paretovariate(1.2)) % INTEGER_MAX,
+            rng.random() < 0.5,
+        )
+
+
+def count_rows() -> int:
+    return BasicModel.objects.count()
+
+
+def create_indexes() -> None:
+    table = BasicModel._meta.db_table
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        for name, columns in INDEXES.items():
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})".format(
+                    index=quote("{}_{}_bench".format(table, name)),
+                    table=quote(table),
+                    columns=", ".join(quote(column) for column in columns),
+                )
+            )
+        cursor.execute("ANALYZE")
+
+
+def populate(
+    count: int,
+    seed: int = 0,
+    batch_size: int = 50_000,
+    indexes: bool = True,
+    output: Callable[[str], object] | None = None,
+) -> int:
+    """
+    Fill the table until it has `count` rows, returns the number of rows
+    created. Existing rows are kept so a database file can be reused.
+    """
+    existing = count_rows()
+    missing = count - existing
+
+    if missing > 0:
+        table = BasicModel._meta.db_table
+        quote = connection.ops.quote_name
+        columns = ["string_uno", "string_dos", "date", "integer", "boolean"]
+        sql = "INSERT INTO {table} ({columns}) VALUES ({values})".format(
+            table=quote(table),
+            columns=", ".join(quote(column) for column in columns),
+            values=", ".join(["%s"] * len(columns)),
+        )
+        rows = generate_rows(missing, seed=seed + existing)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("PRAGMA synchronous = OFF")
+                cursor.execute("PRAGMA journal_mode = MEMORY")
+
+            created = 0
+            while created < missing:
+                batch = [row for _, row in zip(range(batch_size), rows)]
+                with transaction.atomic():
+                    cursor.executemany(sql, batch)
+                created += len(batch)
+                if output is not None:
+                    output("{} / {} rows".format(existing + created, count))
+
+    if indexes:
+        create_indexes()
+
+    return max(missing, 0)
@@ -0,0 +1,212 @@
+"""
+Latency of realistic requests through a rest_framework view over a table
+filled with synthetic rows, see `dataset`.
+"""
+
+import datetime
+import random
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+from django.db.models import (
+    Q,
+    Value,
+)
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+
+from drf_query_filter import fields
+from drf_query_filter.filters import QueryParamFilter
+from tests.models import BasicModel
+from tests.test_filters import BasicModelSerializer
+
+
+from . import dataset
+from .runner import get_metadata
+
+
+class Pagination(LimitOffsetPagination):
+    default_limit = 50
+
+
+class MacroViewSet(ReadOnlyModelViewSet[BasicModel]):
+    queryset = BasicModel.objects.all().order_by("id")
+    permission_classes = [AllowAny]
+    serializer_class = BasicModelSerializer
+    pagination_class = Pagination
+    filter_backends = [QueryParamFilter]
+    query_raise_exceptions = True
+
+    query_params = [
+        fields.InIntegerField("ids", "id"),
+        fields.IntegerField("integer"),
+        fields.InIntegerField("integers", "integer"),
+        fields.RangeIntegerField("integer_range", "integer", equal=True),
+        fields.BooleanField("boolean"),
+        fields.RangeDateField("date", equal=True),
+        fields.StringField(
+            "search",
+            ["string_uno__istartswith", "string_dos__istartswith"],
+            connector=Q.OR,
+        ),
+        fields.StringField("name", ["string_uno", "string_dos"], connector=Q.OR),
+        fields.ConcatField(
+            "full_name",
+            ["string_uno", Value(" "), "string_dos"],
+            lookup="icontains",
+        ),
+    ]
+
+
+Params = dict[str, str]
+Scenario = Callable[[random.Random, int], Params]
+
+
+def random_ids(rng: random.Random, rows: int, count: int) -> str:
+    return ",".join(str(rng.randint(1, rows)) for _ in range(count))
+
+
+def random_date_range(rng: random.Random, days: int) -> str:
+    start = dataset.START_DATE + datetime.timedelta(
+        days=rng.randrange(dataset.DAYS - days)
+    )
+    return "{},{}".format(start, start + datetime.timedelta(days=days))
+
+
+def random_integer_range(rng: random.Random) -> str:
+    start = rng.randrange(100)
+    return "{},{}".format(start, start + rng.randrange(1, 50))
+
+
+SINGLE_SCENARIOS: dict[str, Scenario] = {
+    "integer": lambda rng, rows: {"integer": str(rng.randrange(100))},
+    "boolean": lambda rng, rows: {"boolean": rng.choice(["true", "false"])},
+    "range_integer": lambda rng, rows: {"integer_range": random_integer_range(rng)},
+    "range_date": lambda rng, rows: {"date": random_date_range(rng, 30)},
+    "or_startswith": lambda rng, rows: {
+        "search": rng.choice(dataset.FIRST_NAMES + dataset.LAST_NAMES)[:3]
+    },
+    "or_exact": lambda rng, rows: {
+        "name": rng.choice(dataset.FIRST_NAMES + dataset.LAST_NAMES)
+    },
+    "concat": lambda rng, rows: {
+        "full_name": "{} {}".format(
+            rng.choice(dataset.FIRST_NAMES), rng.choice(dataset.LAST_NAMES)[:3]
+        )
+    },
+    "in_integers_50": lambda rng, rows: {
+        "integers": ",".join(str(rng.randrange(1000)) for _ in range(50))
+    },
+    "in_ids_100": lambda rng, rows: {"ids": random_ids(rng, rows, 100)},
+    "in_ids_1000": lambda rng, rows: {"ids": random_ids(rng, rows, 1_000)},
+    "in_ids_10000": lambda rng, rows: {"ids": random_ids(rng, rows, 10_000)},
+}
+
+COMBINED_SCENARIOS: list[tuple[str, ...]] = [
+    ("range_date", "boolean"),
+    ("range_date", "range_integer"),
+    ("or_startswith", "range_date"),
+    ("concat", "range_date"),
+    ("in_ids_100", "boolean"),
+    ("or_exact", "integer", "boolean"),
+]
+
+
+def get_scenarios() -> dict[str, Scenario]:
+    scenarios = dict(SINGLE_SCENARIOS)
+
+    for names in COMBINED_SCENARIOS:
+
+        def combined(
+            rng: random.Random, rows: int, names: tuple[str, ...] = names
+        ) -> Params:
+            params: Params = {}
+            for name in names:
+                params.update(SINGLE_SCENARIOS[name](rng, rows))
+            return params
+
+        scenarios["+".join(names)] = combined
+
+    return scenarios
+
+
+def percentile(timings: list[float], percent: int) -> float:
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[percent - 1]
+
+
+def run_scenario(
+    name: str,
+    scenario: Scenario,
+    rows: int,
+    requests: int,
+    warmup: int,
+    seed: int,
+) -> dict[str, Any]:
+    rng = random.Random("{}-{}".format(seed, name))
+    factory = APIRequestFactory()
+    view = MacroViewSet.as_view({"get": "list"})
+    timings = []
+
+    for index in range(warmup + requests):
+        request = factory.get("/", scenario(rng, rows))
+
+        start = time.perf_counter()
+        response = view(request)
+        response.render()
+        elapsed = time.perf_counter() - start
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                "{} returned {}: {}".format(name, response.status_code, response.data)
+            )
+        if index >= warmup:
+            timings.append(elapsed)
+
+    return {
+        "id": "macro.{}".format(name),
+        "name": name,
+        "count": len(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": percentile(timings, 50),
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+        "p99": percentile(timings, 99),
+    }
+
+
+def run(
+    rows: int,
+    requests: int = 50,
+    warmup: int = 3,
+    seed: int = 0,
+    select: str = "",
+    output: Callable[[str], object] = print,
+) -> dict[str, Any]:
+    results = []
+
+    output("{:<45} {:>10} {:>10} {:>10}".format("scenario", "p50 ms", "p95 ms", "p99 ms"))
+    for name, scenario in get_scenarios().items():
+        if select and select not in name:
+            continue
+
+        result = run_scenario(name, scenario, rows, requests, warmup, seed)
+        output(
+            "{:<45} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+                name, result["p50"] * 1000, result["p95"] * 1000, result["p99"] * 1000
+            )
+        )
+        results.append(result)
+
+    metadata = get_metadata()
+    metadata.update({"rows": rows, "requests": requests, "seed": seed})
+    return {"metadata": metadata, "results": results}
@@ -0,0 +1,270 @@
+import datetime
+import functools
+from collections.abc import Iterable
+from typing import Any
+
+
+from django.db.models import (
+    Q,
+    Value,
+)
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+from drf_query_filter import fields
+from drf_query_filter.dates import DateFormatParser
+from drf_query_filter.expressions import InValues
+from drf_query_filter.filters import QueryParamFilter
+from drf_query_filter.plans import FilterPlan
+from tests.models import BasicModel
+from tests.test_filters import ModelViewSet
+
+
+from .runner import Benchmark
+
+CHOICES = [str(value) for value in range(20)]
+
+FIELD_VALUES: list[tuple[fields.Field, str]] = [
+    (fields.Field("field"), "value"),
+    (fields.StringField("field"), "value"),
+    (fields.IntegerField("field"), "123456"),
+    (fields.FloatField("field"), "1234.56"),
+    (fields.DecimalField("field"), "1234.56"),
+    (fields.DateTimeField("field"), "2020-01-01T10:25:30Z"),
+    (fields.DateField("field"), "2020-12-31"),
+    (fields.ChoicesField("field", choices=CHOICES), "10"),
+    (fields.BooleanField("field"), "True"),
+    (fields.ExistsField("field", return_value=True), ""),
+    (fields.ConcatField("field", ["a", Value(" "), "b"]), "value"),
+    (fields.RangeIntegerField("field"), "1,100"),
+    (fields.RangeFloatField("field"), "1.5,100.5"),
+    (fields.RangeDecimalField("field"), "1.5,100.5"),
+    (fields.RangeDateTimeField("field"), "2020-01-01T10:25:30Z,2020-12-31T10:25:30Z"),
+    (fields.RangeDateField("field"), "2020-01-01,2020-12-31"),
+    (fields.InIntegerField("field"), "1,2,3,4,5"),
+    (fields.InChoicesField("field", choices=CHOICES), "1,2,3,4,5"),
+]
+
+RANGE_VALUES: list[tuple[str, fields.Field, str]] = [
+    ("both", fields.RangeIntegerField("field"), "1,100"),
+    ("left", fields.RangeIntegerField("field"), "1,"),
+    ("right", fields.RangeIntegerField("field"), ",100"),
+    ("dates", fields.RangeDateField("field"), "2020-01-01,2020-12-31"),
+]
+
+DATE_VALUES: list[tuple[str, str]] = [
+    ("%Y-%m-%dT%H:%M:%SZ", "2020-01-01T10:25:30Z"),
+    ("%Y-%m-%dT%H:%M:%S.%f%z", "2020-01-01T10:25:30.123456+0700"),
+    ("%Y-%m-%d", "2020-12-31"),
+    ("%d/%m/%Y", "31/12/2020"),
+    ("%b %d %Y", "Dec 31 2020"),
+]
+
+WIDTHS = [1, 10, 50]
+DEPTHS = [1, 10, 50]
+LIST_SIZES = [10, 100, 1_000, 10_000, 100_000]
+# SQLite allows at most 32766 parameters, bigger lists only work with InValues
+IN_VALUES_SIZES = [1_000, 10_000, 30_000]
+IN_VALUES_STRATEGIES = ["json_each", "values", "chunks"]
+CONNECTORS = [Q.AND, Q.OR, Q.XOR]
+
+
+def build_wide_node(width: int) -> tuple[fields.Node, dict[str, str]]:
+    node = fields.Node(
+        [fields.IntegerField("field_{}".format(index)) for index in range(width)]
+    )
+    return node, {"field_{}".format(index): str(index) for index in range(width)}
+
+
+def build_deep_node(depth: int) -> tuple[fields.Node, dict[str, str]]:
+    node: fields.Node = fields.IntegerField("field_0")
+    for index in range(1, depth):
+        node = fields.Node(
+            [fields.IntegerField("field_{}".format(index)), node],
+            connector=CONNECTORS[index % len(CONNECTORS)],
+        )
+    return node, {"field_{}".format(index): str(index) for index in range(depth)}
+
+
+def get_field_benchmarks() -> Iterable[Benchmark]:
+    for field, raw_value in FIELD_VALUES:
+        yield Benchmark(
+            "perform_validation",
+            field.__class__.__name__,
+            functools.partial(field.perform_validation, raw_value),
+        )
+
+    for name, field, raw_value in RANGE_VALUES:
+        yield Benchmark(
+            "range_perform_validation",
+            name,
+            functools.partial(field.perform_validation, raw_value),
+        )
+
+    for size in LIST_SIZES:
+        raw_value = ",".join(str(value) for value in range(size))
+        in_field = fields.InIntegerField("field")
+        yield Benchmark(
+            "list_perform_validation",
+            "InIntegerField",
+            functools.partial(in_field.perform_validation, raw_value),
+            {"size": size},
+        )
+
+        canonical_field = fields.InIntegerField("field", unique=True, sort=True)
+        yield Benchmark(
+            "list_perform_validation",
+            "InIntegerField_unique_sort",
+            functools.partial(canonical_field.perform_validation, raw_value),
+            {"size": size},
+        )
+
+        raw_value = ",".join(CHOICES[value % len(CHOICES)] for value in range(size))
+        choices_field = fields.InChoicesField("field", choices=CHOICES)
+        yield Benchmark(
+            "list_perform_validation",
+            "InChoicesField",
+            functools.partial(choices_field.perform_validation, raw_value),
+            {"size": size},
+        )
+
+
+def get_date_benchmarks() -> Iterable[Benchmark]:
+    for date_format, raw_value in DATE_VALUES:
+        parser = DateFormatParser(date_format)
+        yield Benchmark(
+            "date_parse",
+            "strptime",
+            functools.partial(datetime.datetime.strptime, raw_value, date_format),
+            {"format": date_format},
+        )
+        yield Benchmark(
+            "date_parse",
+            "parser",
+            functools.partial(parser.parse, raw_value),
+            {"format": date_format},
+        )
+
+
+def get_node_benchmarks() -> Iterable[Benchmark]:
+    trees = [("width", width, build_wide_node(width)) for width in WIDTHS] + [
+        ("depth", depth, build_deep_node(depth)) for depth in DEPTHS
+    ]
+
+    for shape, size, (node, data) in trees:
+        plan = FilterPlan([node])
+        yield Benchmark(
+            "node_get_filter",
+            "tree",
+            functools.partial(node.get_filter, data),
+            {shape: size},
+        )
+        yield Benchmark(
+            "node_get_filter",
+            "plan",
+            functools.partial(plan.get_filter, data),
+            {shape: size},
+        )
+
+    # Requests that only send a couple of the declared query params
+    node, _ = build_wide_node(50)
+    plan = FilterPlan(node.childrens)
+    data = {"field_10": "10", "field_20": "20"}
+    yield Benchmark(
+        "node_get_filter",
+        "plan_sparse",
+        lambda: plan.get_filter(data),
+        {"width": 50, "present": len(data)},
+    )
+    yield Benchmark(
+        "node_get_filter",
+        "plan_sparse_skip_absent",
+        lambda: plan.get_filter(data, skip_absent=True),
+        {"width": 50, "present": len(data)},
+    )
+
+
+def create_rows(count: int) -> None:
+    date = datetime.date(2026, 1, 1)
+    BasicModel.objects.bulk_create(
+        BasicModel(
+            string_uno="uno {}".format(index),
+            string_dos="dos {}".format(index % 10),
+            date=date + datetime.timedelta(days=index % 365),
+            integer=index % 40,
+            boolean=index % 2 == 0,
+        )
+        for index in range(count)
+    )
+
+
+REQUESTS: list[tuple[str, dict[str, str]]] = [
+    ("empty", {}),
+    ("exact", {"pk": "10", "integer": "10"}),
+    ("search", {"search_startswith": "uno 1"}),
+    ("concat", {"string_concat": "1 dos"}),
+    ("range", {"boolean": "1", "date": "2026-02-01,2026-03-01"}),
+    (
+        "all",
+        {
+            "integer": "20",
+            "search_startswith": "uno",
+            "search_exact": "dos 1",
+            "string_concat": "dos",
+            "date": "2026-02-01,2026-03-01",
+        },
+    ),
+]
+
+
+def get_filter_queryset_benchmarks(rows: int = 1_000) -> Iterable[Benchmark]:
+    create_rows(rows)
+    factory = APIRequestFactory()
+    backend = QueryParamFilter()
+    view = ModelViewSet()
+    queryset = ModelViewSet.queryset
+
+    for name, query_params in REQUESTS:
+        request = Request(factory.get("/", query_params))
+
+        def build(request: Request = request) -> Any:
+            return backend.filter_queryset(request, queryset, view)
+
+        def execute(request: Request = request) -> Any:
+            return list(backend.filter_queryset(request, queryset, view))
+
+        yield Benchmark("filter_queryset", "build", build, {"request": name})
+        yield Benchmark(
+            "filter_queryset", "execute", execute, {"request": name, "rows": rows}
+        )
+
+
+def get_in_values_benchmarks() -> Iterable[Benchmark]:
+    queryset = BasicModel.objects.all()
+
+    for size in IN_VALUES_SIZES:
+        values = list(range(size))
+        yield Benchmark(
+            "in_values",
+            "lookup",
+            functools.partial(queryset.filter(pk__in=values).count),
+            {"size": size},
+        )
+        for strategy in IN_VALUES_STRATEGIES:
+            yield Benchmark(
+                "in_values",
+                strategy,
+                functools.partial(
+                    queryset.filter(InValues("pk", values, strategy)).count
+                ),
+                {"size": size},
+            )
+
+
+def get_benchmarks() -> Iterable[Benchmark]:
+    yield from get_field_benchmarks()
+    yield from get_date_benchmarks()
+    yield from get_node_benchmarks()
+    yield from get_filter_queryset_benchmarks()
+    yield from get_in_values_benchmarks()
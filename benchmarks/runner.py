@@ -0,0 +1,139 @@
+import dataclasses
+import datetime
+import json
+import platform
+import statistics
+import sys
+import timeit
+from collections.abc import (
+    Callable,
+    Iterable,
+)
+from typing import Any
+
+
+import django
+import rest_framework
+
+
+import drf_query_filter
+
+
+@dataclasses.dataclass(frozen=True)
+class Benchmark:
+    group: str
+    name: str
+    func: Callable[[], object]
+    params: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        benchmark_id = "{}.{}".format(self.group, self.name)
+        if self.params:
+            benchmark_id += "[{}]".format(
+                ",".join("{}={}".format(key, value) for key, value in self.params.items())
+            )
+        return benchmark_id
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int, quick: bool) -> dict[str, Any]:
+    timer = timeit.Timer(benchmark.func)
+
+    if quick:
+        number, repeat = 1, 1
+    else:
+        number, _ = timer.autorange()
+
+    timings = [timing / number for timing in timer.repeat(repeat=repeat, number=number)]
+
+    return {
+        "id": benchmark.id,
+        "group": benchmark.group,
+        "name": benchmark.name,
+        "params": benchmark.params,
+        "number": number,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def get_metadata() -> dict[str, Any]:
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "django": django.get_version(),
+        "djangorestframework": rest_framework.VERSION,
+        "drf_query_filter": drf_query_filter.__version__,
+    }
+
+
+def run(
+    benchmarks: Iterable[Benchmark],
+    repeat: int = 5,
+    quick: bool = False,
+    select: str = "",
+    output: Callable[[str], object] = print,
+) -> dict[str, Any]:
+    results = []
+
+    for benchmark in benchmarks:
+        if select and select not in benchmark.id:
+            continue
+
+        result = run_benchmark(benchmark, repeat=repeat, quick=quick)
+        output(
+            "{id:<70} {median:>12.3f} us".format(
+                id=result["id"], median=result["median"] * 1_000_000
+            )
+        )
+        results.append(result)
+
+    return {"metadata": get_metadata(), "results": results}
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = 0.1,
+    output: Callable[[str], object] = print,
+) -> list[str]:
+    """
+    Print the ratio of the median of the benchmarks found in both results,
+    returns the id of the benchmarks slower than the baseline by more than
+    the threshold.
+    """
+    baseline_results = {result["id"]: result for result in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        baseline_result = baseline_results.get(result["id"])
+        if baseline_result is None:
+            continue
+
+        ratio = result["median"] / baseline_result["median"]
+        regression = ratio > 1 + threshold
+        if regression:
+            regressions.append(result["id"])
+
+        output(
+            "{id:<70} {ratio:>8.2f}x{flag}".format(
+                id=result["id"], ratio=ratio, flag=" REGRESSION" if regression else ""
+            )
+        )
+
+    return regressions
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)  # type: ignore
+
+
+def dump(results: dict[str, Any], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, default=str)
@@ -0,0 +1,40 @@
+from typing import Any
+
+
+import django
+from django.conf import settings
+
+
+def setup(**options: Any) -> None:
+    """Configure django with the models of the tests, by default in memory"""
+    if settings.configured:
+        return
+
+    settings.configure(
+        DEBUG=False,
+        ALLOWED_HOSTS=["testserver"],
+        DEFAULT_AUTO_FIELD="django.db.models.AutoField",
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": options.pop("database_name", ":memory:"),
+            }
+        },
+        SECRET_KEY="not-a-secure-secret-key",
+        TIME_ZONE="America/Phoenix",
+        USE_TZ=True,
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "drf_query_filter",
+            "tests",
+        ],
+        **options,
+    )
+    django.setup()
+
+
+def create_tables() -> None:
+    from django.core.management import call_command
+
+    call_command("migrate", run_syncdb=True, verbosity=0)
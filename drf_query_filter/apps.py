@@ -0,0 +1,55 @@
+import logging
+from typing import Any
+
+
+from django.apps import AppConfig
+from django.core import checks
+from django.core.signals import request_started
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+)
+
+log = logging.getLogger("drf_query_filter")
+
+
+def warm_filter_plans_receiver(sender: Any, **kwargs: Any) -> None:
+    # The urlconf can only be imported safely once every app is ready, so the
+    # plans are compiled just before the first request is handled.
+    request_started.disconnect(dispatch_uid="drf_query_filter_warm_filter_plans")
+
+    from .filters import warm_filter_plans
+
+    try:
+        warm_filter_plans()
+    except Exception:
+        log.warning("Unable to warm the filter plans", exc_info=True)
+
+
+class DrfQueryFilterConfig(AppConfig):
+    name = "drf_query_filter"
+    verbose_name = "DRF Query Filter"
+
+    def ready(self) -> None:
+        from . import cache
+        from .checks import check_filter_indexes
+
+        checks.register(check_filter_indexes, checks.Tags.urls)
+
+        request_started.connect(
+            warm_filter_plans_receiver,
+            dispatch_uid="drf_query_filter_warm_filter_plans",
+        )
+        post_save.connect(
+            cache.model_changed_receiver,
+            dispatch_uid="drf_query_filter_post_save",
+        )
+        post_delete.connect(
+            cache.model_changed_receiver,
+            dispatch_uid="drf_query_filter_post_delete",
+        )
+        m2m_changed.connect(
+            cache.m2m_changed_receiver,
+            dispatch_uid="drf_query_filter_m2m_changed",
+        )
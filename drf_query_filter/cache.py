@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any
+
+
+from django.conf import settings
+from django.core.cache import (
+    BaseCache,
+    caches,
+)
+from django.db.models import Model
+
+__all__ = [
+    "TOO_MANY_PKS",
+    "bump_model_version",
+    "get_cache_aliases",
+    "get_model_versions",
+    "get_tracked_models",
+    "track_models",
+]
+
+KEY_PREFIX = "drf_query_filter"
+
+# Caches where every change of a model bumps its version, in every process
+DEFAULT_CACHE_ALIASES = ("default",)
+
+# Stored instead of the primary keys of results bigger than `cache_max_length`
+TOO_MANY_PKS = "too_many_pks"
+
+# Models used by the views with a cache, with the aliases of their caches
+tracked_models: dict[type[Model], set[str]] = {}
+tracked_models_lock = threading.Lock()
+
+
+def get_concrete_model(model: type[Model]) -> type[Model]:
+    # Proxy models share the rows, and the version, of their concrete model
+    return model._meta.concrete_model or model
+
+
+def get_version_key(model: type[Model]) -> str:
+    return "{prefix}:version:{label}".format(
+        prefix=KEY_PREFIX, label=get_concrete_model(model)._meta.label_lower
+    )
+
+
+def get_filter_cache_key(*parts: Any) -> str:
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+    return "{prefix}:filter:{digest}".format(prefix=KEY_PREFIX, digest=digest)
+
+
+def get_model_versions(cache: BaseCache, models: Iterable[type[Model]]) -> list[Any]:
+    """
+    Returns the current version of each model, a missing version is created
+    with the current time so it never matches the version of an old entry.
+    """
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            cache.add(key, version, timeout=None)
+            versions[key] = cache.get(key, version)
+
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model: type[Model], cache: BaseCache) -> None:
+    try:
+        cache.incr(get_version_key(model))
+    except ValueError:
+        # Not created yet, it gets a new version when it is read
+        pass
+
+
+def track_models(models: Iterable[type[Model]], cache_alias: str) -> None:
+    """Changes in these models invalidate the entries of the cache"""
+    with tracked_models_lock:
+        for model in models:
+            tracked_models.setdefault(get_concrete_model(model), set()).add(
+                cache_alias
+            )
+
+
+def get_tracked_models() -> dict[type[Model], set[str]]:
+    """
+    The models tracked by the plans compiled so far. The urlconf is not
+    imported here, the receivers of the model signals call this.
+    """
+    return tracked_models
+
+
+def get_cache_aliases(model: type[Model]) -> set[str]:
+    """
+    The caches where a change of the model bumps its version: the ones of
+    `DRF_QUERY_FILTER_CACHE_ALIASES`, `("default",)` by default, and the ones
+    tracked for the model. The tracked models depend on the plans compiled by
+    this process, the setting doesn't, so other processes see the change.
+    """
+    aliases = set(
+        getattr(settings, "DRF_QUERY_FILTER_CACHE_ALIASES", DEFAULT_CACHE_ALIASES)
+    )
+    aliases.update(get_tracked_models().get(get_concrete_model(model), ()))
+    return aliases
+
+
+def invalidate_model(model: type[Model]) -> None:
+    for cache_alias in get_cache_aliases(model):
+        bump_model_version(model, caches[cache_alias])
+
+
+def model_changed_receiver(sender: type[Model], **kwargs: Any) -> None:
+    invalidate_model(sender)
+
+
+def m2m_changed_receiver(
+    sender: type[Model], instance: Model, model: type[Model], **kwargs: Any
+) -> None:
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+
+    for changed_model in (sender, type(instance), model):
+        invalidate_model(changed_model)
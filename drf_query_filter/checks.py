@@ -0,0 +1,280 @@
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import (
+    Model,
+    UniqueConstraint,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Concat
+
+
+from . import utils
+from .expressions import (
+    get_concat_parts,
+    get_materialized_field,
+)
+from .fields import (
+    ConcatField,
+    Field,
+)
+
+__all__ = [
+    "check_filter_indexes",
+    "get_field_warnings",
+    "get_indexed_columns",
+    "get_target_warnings",
+]
+
+log = logging.getLogger("drf_query_filter")
+
+# Lookups that cannot use a B-tree index on the column
+UNINDEXABLE_LOOKUPS = frozenset(
+    [
+        "contains",
+        "icontains",
+        "endswith",
+        "iendswith",
+        "iexact",
+        "istartswith",
+        "regex",
+        "iregex",
+    ]
+)
+
+
+def get_indexed_columns(model: type[Model]) -> frozenset[str]:
+    """
+    Names of the fields of the model that are the first column of an
+    index: primary keys, unique fields, `db_index`, `Meta.indexes`,
+    `unique_together` and unique constraints.
+    """
+    opts = model._meta
+    names = {
+        field.name
+        for field in opts.concrete_fields
+        if field.primary_key or field.unique or getattr(field, "db_index", False)
+    }
+
+    for index in opts.indexes:
+        if index.fields:
+            names.add(index.fields[0].removeprefix("-"))
+
+    for fields in opts.unique_together:
+        names.add(fields[0])
+
+    for constraint in opts.constraints:
+        if isinstance(constraint, UniqueConstraint) and constraint.fields:
+            names.add(constraint.fields[0])
+
+    return frozenset(names)
+
+
+def get_target_warnings(
+    model: type[Model], path: str, annotations: Iterable[str] = ()
+) -> list[tuple[str, str, str]]:
+    """
+    Resolves the lookup path against the fields of the model and returns the
+    problems found as `(id, message, hint)`. Paths that start with an
+    annotation are not checked.
+    """
+    parts = path.split(LOOKUP_SEP)
+
+    if parts[0] in annotations:
+        return []
+
+    field: Any = None
+    index = 0
+
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+        except FieldDoesNotExist:
+            if field is None:
+                return [("W004", "{} is not a field of {}".format(part, model), "")]
+            break
+
+        if not field.is_relation or field.related_model is None:
+            index += 1
+            break
+
+        if field.many_to_many or field.one_to_many:
+            # Joins by the keys of the related model
+            model = field.related_model
+            field = model._meta.pk
+        else:
+            model = field.related_model
+            field = field.target_field
+        index += 1
+    else:
+        # The path ends with a relation, filtered by its key
+        return []
+
+    warnings = []
+    rest = parts[index:]
+    lookup = "exact"
+
+    if rest:
+        lookup = rest[-1]
+        for transform in rest[:-1]:
+            if field.get_transform(transform) is None:
+                message = "{} of {} is not a transform".format(transform, path)
+                return [("W004", message, "")]
+            warnings.append(
+                (
+                    "W003",
+                    "{} wraps the column of {} in a function".format(transform, path),
+                    "Use a functional index, or for dates RangeDateField with "
+                    "datetime_bounds=True.",
+                )
+            )
+
+        if field.get_lookup(lookup) is None:
+            if field.get_transform(lookup) is None:
+                return [("W004", "{} of {} is not a lookup".format(lookup, path), "")]
+            warnings.append(
+                (
+                    "W003",
+                    "{} wraps the column of {} in a function".format(lookup, path),
+                    "Use a functional index, or for dates RangeDateField with "
+                    "datetime_bounds=True.",
+                )
+            )
+            lookup = "exact"
+
+    if lookup in UNINDEXABLE_LOOKUPS:
+        warnings.append(
+            (
+                "W002",
+                "The lookup {} of {} cannot use an index".format(lookup, path),
+                "Use exact or startswith lookups, or an index made for it, like a"
+                " trigram index.",
+            )
+        )
+    elif not warnings and field.name not in get_indexed_columns(model):
+        warnings.append(
+            (
+                "W001",
+                "{} filters on {}.{}, a column without index".format(
+                    path, model._meta.label, field.name
+                ),
+                "Add db_index=True or an index that starts with the column.",
+            )
+        )
+
+    return warnings
+
+
+def get_field_warnings(
+    model: type[Model], field: Field, annotations: Iterable[str] = ()
+) -> list[tuple[str, str, str]]:
+    """
+    The problems of the target fields of the field, a `ConcatField` is checked
+    by the generated field that materializes it.
+    """
+    if not isinstance(field, ConcatField):
+        warnings = []
+        for path in field.target_fields:
+            warnings.extend(get_target_warnings(model, path, annotations))
+        return warnings
+
+    materialized = get_materialized_field(
+        model, get_concat_parts(Concat(*field.target_fields))
+    )
+
+    if materialized is None:
+        return [
+            (
+                "W005",
+                "Concat of {} is computed for every row".format(
+                    field.target_field_name
+                ),
+                "Materialize it with the command materialize_concat_fields.",
+            )
+        ]
+
+    path = field.get_target_field().replace(
+        field.target_field_name, materialized.name, 1
+    )
+    return get_target_warnings(model, path)
+
+
+def check_filter_indexes(app_configs: Any = None, **kwargs: Any) -> list[Any]:
+    """
+    Warns about the target fields of the `QueryParamFilter` of the views in
+    the urlconf that cannot use an index, and reports the plans that can't be
+    compiled as errors.
+    """
+    from .filters import iter_filter_views
+
+    messages: list[Any] = []
+    seen: set[tuple[Any, ...]] = set()
+
+    try:
+        views = list(iter_filter_views())
+    except Exception:
+        log.debug("Unable to check the views of the urlconf", exc_info=True)
+        return []
+
+    for view_class, backend in views:
+        try:
+            plan = backend.compile_filter_plan(view_class)
+        except ValueError as exc:
+            # Annotations with the same name and different expressions
+            messages.append(
+                checks.Error(
+                    "{view}: {error}".format(view=view_class.__qualname__, error=exc),
+                    hint="Give the annotations different names.",
+                    obj=view_class,
+                    id="drf_query_filter.E001",
+                )
+            )
+            continue
+        except Exception as exc:
+            messages.append(
+                checks.Error(
+                    "{view}: the filter plan can't be compiled: {error!r}".format(
+                        view=view_class.__qualname__, error=exc
+                    ),
+                    obj=view_class,
+                    id="drf_query_filter.E002",
+                )
+            )
+            continue
+
+        queryset = getattr(view_class, "queryset", None)
+
+        if plan is None or queryset is None:
+            continue
+
+        model = queryset.model
+
+        if app_configs is not None and model._meta.app_config not in app_configs:
+            continue
+
+        for field in utils.iter_fields(plan.query_fields):
+            warnings = get_field_warnings(model, field, plan.annotations)
+
+            for code, message, hint in warnings:
+                key = (view_class, field.query_param_name, code, message)
+                if key in seen:
+                    continue
+                seen.add(key)
+                messages.append(
+                    checks.Warning(
+                        "{view}: query param {name}: {message}.".format(
+                            view=view_class.__qualname__,
+                            name=field.query_param_name,
+                            message=message,
+                        ),
+                        hint=hint or None,
+                        obj=view_class,
+                        id="drf_query_filter.{}".format(code),
+                    )
+                )
+
+    return messages
@@ -0,0 +1,149 @@
+from collections.abc import Mapping
+from typing import Any
+
+
+from django.db.models.constants import LOOKUP_SEP
+
+
+from . import utils
+from .fields import (
+    ConcatField,
+    Field,
+    ListField,
+)
+from .plans import (
+    FieldStep,
+    FilterPlan,
+    NodeStep,
+    Step,
+)
+
+__all__ = [
+    "CostModel",
+]
+
+
+class CostModel:
+    """
+    Estimates the cost of the query params of a request from the fields that
+    read them, without validating the values nor building any query.
+
+    The cost of a field is the weight of its type times the weight of the most
+    expensive lookup of its target fields, for every target field, plus the
+    weight of every value of a list and of every annotation.
+    """
+
+    default_field_weights: dict[type[Field], float] = {ConcatField: 4.0}
+    default_lookup_weights: dict[str, float] = {
+        "contains": 5.0,
+        "icontains": 5.0,
+        "endswith": 5.0,
+        "iendswith": 5.0,
+        "iexact": 2.0,
+        "istartswith": 2.0,
+        "regex": 10.0,
+        "iregex": 10.0,
+    }
+    default_list_value_weight = 0.01
+    default_annotation_weight = 2.0
+
+    def __init__(
+        self,
+        field_weights: Mapping[type[Field], float] | None = None,
+        lookup_weights: Mapping[str, float] | None = None,
+        list_value_weight: float | None = None,
+        annotation_weight: float | None = None,
+    ) -> None:
+        """
+        :param field_weights: Weight by field class, subclasses use the weight
+        of their closest class, 1 by default. Merged with the default weights.
+        :param lookup_weights: Weight by lookup, 1 by default. Merged with the
+        default weights.
+        :param list_value_weight: Weight of every value of a `ListField`.
+        :param annotation_weight: Weight of every annotation of the field.
+        """
+        self.field_weights = {**self.default_field_weights, **(field_weights or {})}
+        self.lookup_weights = {**self.default_lookup_weights, **(lookup_weights or {})}
+        self.list_value_weight = (
+            self.default_list_value_weight
+            if list_value_weight is None
+            else list_value_weight
+        )
+        self.annotation_weight = (
+            self.default_annotation_weight
+            if annotation_weight is None
+            else annotation_weight
+        )
+
+    def get_field_weight(self, field: Field) -> float:
+        for cls in type(field).__mro__:
+            if cls in self.field_weights:
+                return self.field_weights[cls]
+        return 1.0
+
+    def get_lookup_weight(self, field: Field) -> float:
+        if isinstance(field, ConcatField):
+            lookups = [field.lookup]
+        else:
+            lookups = [
+                target_field.rsplit(LOOKUP_SEP, 1)[-1]
+                for target_field in field.target_fields
+                if isinstance(target_field, str)
+            ]
+        return max(
+            [self.lookup_weights.get(lookup, 1.0) for lookup in lookups], default=1.0
+        )
+
+    def get_list_length(self, field: Field, raw_value: Any) -> int:
+        if not isinstance(field, ListField) or not isinstance(raw_value, str):
+            return 1
+        return raw_value.count(field.list_separator) + 1
+
+    def get_field_cost(
+        self, field: Field, raw_value: Any, annotation_count: int | None = None
+    ) -> float:
+        """
+        :param annotation_count: The number of annotations of the field, by
+        default counted from `get_annotate`.
+        """
+        if annotation_count is None:
+            annotation_count = len(field.get_annotate())
+
+        targets = 1 if isinstance(field, ConcatField) else len(field.target_fields)
+        return (
+            self.get_field_weight(field) * self.get_lookup_weight(field) * targets
+            + self.list_value_weight * self.get_list_length(field, raw_value)
+            + self.annotation_weight * annotation_count
+        )
+
+    def get_costs(self, plan: FilterPlan, data: Mapping[str, str]) -> dict[str, float]:
+        """The cost of every query param of the plan found in data"""
+        costs: dict[str, float] = {}
+
+        for step in plan.steps:
+            self.add_step_costs(step, data, costs)
+
+        return costs
+
+    def add_step_costs(
+        self, step: Step, data: Mapping[str, str], costs: dict[str, float]
+    ) -> None:
+        if isinstance(step, NodeStep):
+            for child in step.childrens:
+                self.add_step_costs(child, data, costs)
+            return
+
+        fields: list[tuple[Field, int | None]]
+
+        if isinstance(step, FieldStep):
+            # The annotations were collected when the plan was compiled
+            fields = [(step.field, len(step.annotate))]
+        else:
+            fields = [(field, None) for field in utils.iter_fields([step.node])]
+
+        for field, annotation_count in fields:
+            found, raw_value = field.get_raw_value_from_query_param(data)  # type: ignore
+            if found:
+                costs[field.query_param_name] = costs.get(
+                    field.query_param_name, 0.0
+                ) + self.get_field_cost(field, raw_value, annotation_count)
@@ -0,0 +1,180 @@
+import datetime
+import functools
+import re
+
+__all__ = [
+    "DateFormatParser",
+    "compile_date_format",
+    "get_date_format_parser",
+]
+
+# Strict version of the directives of `strptime`, every value accepted here is
+# parsed the same way by `strptime`, anything else falls back to it.
+DIRECTIVES = {
+    "Y": r"(?P<year>[0-9]{4})",
+    "m": r"(?P<month>[0-9]{2})",
+    "d": r"(?P<day>[0-9]{2})",
+    "H": r"(?P<hour>[0-9]{2})",
+    "M": r"(?P<minute>[0-9]{2})",
+    "S": r"(?P<second>[0-9]{2})",
+    "f": r"(?P<microsecond>[0-9]{1,6})",
+    "z": r"(?P<utcoffset>[+-][0-9]{2}[0-5][0-9])",
+}
+
+# Directives of variable length, `strptime` could split their digits in a
+# different way when they are followed by one of these characters.
+AMBIGUOUS_DIRECTIVES = re.compile(r"%[fz][0-9:.%]")
+
+# Formats that `datetime.fromisoformat` parses in the same way, longest first
+ISO_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+)
+
+# Same defaults as `strptime`
+DEFAULTS = {
+    "year": "1900",
+    "month": "1",
+    "day": "1",
+    "hour": "0",
+    "minute": "0",
+    "second": "0",
+}
+
+
+def translate_date_format(date_format: str) -> str | None:
+    """
+    Translates the `strptime` format into a regular expression, returns None
+    when the format uses directives that are not supported.
+    """
+    if AMBIGUOUS_DIRECTIVES.search(date_format):
+        return None
+
+    parts = []
+    characters = iter(date_format)
+
+    for character in characters:
+        if character != "%":
+            parts.append(re.escape(character))
+            continue
+
+        directive = next(characters, "")
+        if directive == "%":
+            parts.append("%")
+        elif directive in DIRECTIVES:
+            parts.append(DIRECTIVES[directive])
+        else:
+            return None
+
+    return "".join(parts)
+
+
+def get_iso_format(date_format: str) -> str | None:
+    """
+    Returns the ISO format at the start of `date_format` when the rest of it
+    is only literals and `%z`.
+    """
+    for iso_format in ISO_FORMATS:
+        if date_format.startswith(iso_format):
+            rest = date_format.removeprefix(iso_format)
+            rest = rest.replace("%%", "").replace("%z", "")
+            if "%" not in rest:
+                return iso_format
+    return None
+
+
+def compile_date_format(date_format: str) -> re.Pattern[str] | None:
+    """
+    Compiles the `strptime` format into a regular expression, the part that
+    can be given to `datetime.fromisoformat` is captured in the `iso` group.
+    """
+    iso_format = get_iso_format(date_format)
+
+    if iso_format is None:
+        regex = translate_date_format(date_format)
+    else:
+        iso_regex = translate_date_format(iso_format)
+        rest_regex = translate_date_format(date_format.removeprefix(iso_format))
+        if iso_regex is None or rest_regex is None:
+            return None
+        regex = "(?P<iso>{iso}){rest}".format(iso=iso_regex, rest=rest_regex)
+
+    if regex is None:
+        return None
+
+    try:
+        return re.compile(regex)
+    except re.error:
+        # The same directive used twice
+        return None
+
+
+class DateFormatParser:
+    """
+    Parses strings with a `strptime` format, values that match the compiled
+    format are built directly and the rest are given to `strptime`, so the
+    result and the errors are always the same as with `strptime`.
+    """
+
+    __slots__ = ("date_format", "pattern", "iso", "utcoffset")
+
+    def __init__(self, date_format: str) -> None:
+        self.date_format = date_format
+        self.pattern = compile_date_format(date_format)
+        self.iso = self.pattern is not None and "iso" in self.pattern.groupindex
+        self.utcoffset = (
+            self.pattern is not None and "utcoffset" in self.pattern.groupindex
+        )
+
+    def __repr__(self) -> str:
+        return "{class_name}({date_format!r})".format(
+            class_name=self.__class__.__name__, date_format=self.date_format
+        )
+
+    def parse(self, value: str) -> datetime.datetime:
+        if self.pattern is not None:
+            match = self.pattern.fullmatch(value)
+            if match is not None:
+                try:
+                    return self.build(match)
+                except ValueError:
+                    pass
+
+        return datetime.datetime.strptime(value, self.date_format)
+
+    def build(self, match: re.Match[str]) -> datetime.datetime:
+        if self.iso:
+            dt = datetime.datetime.fromisoformat(match["iso"])
+        else:
+            values = DEFAULTS | match.groupdict()
+            microsecond = values.get("microsecond")
+            dt = datetime.datetime(
+                int(values["year"]),
+                int(values["month"]),
+                int(values["day"]),
+                int(values["hour"]),
+                int(values["minute"]),
+                int(values["second"]),
+                int(microsecond.ljust(6, "0")) if microsecond else 0,
+            )
+
+        if self.utcoffset:
+            return dt.replace(tzinfo=get_timezone(match["utcoffset"]))
+        return dt
+
+
+@functools.lru_cache(maxsize=128)
+def get_timezone(utcoffset: str) -> datetime.timezone:
+    delta = datetime.timedelta(hours=int(utcoffset[1:3]), minutes=int(utcoffset[3:5]))
+    return datetime.timezone(-delta if utcoffset[0] == "-" else delta)
+
+
+@functools.cache
+def get_date_format_parser(date_format: str) -> DateFormatParser:
+    """Fields with the same format share the same parser"""
+    return DateFormatParser(date_format)
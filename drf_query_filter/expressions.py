@@ -0,0 +1,702 @@
+import functools
+import json
+from collections.abc import (
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from typing import (
+    Any,
+    TypeAlias,
+)
+
+
+from django.core.exceptions import (
+    EmptyResultSet,
+    FieldDoesNotExist,
+)
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import (
+    BooleanField,
+    Exists,
+    F,
+    ForeignObjectRel,
+    GeneratedField,
+    IntegerField,
+    ManyToManyField,
+    Model,
+    OuterRef,
+    Q,
+    Value,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import Expression
+from django.db.models.functions import Concat
+from django.db.models.functions.text import ConcatPair
+from django.db.models.lookups import In
+from django.db.models.sql.compiler import SQLCompiler
+
+__all__ = [
+    "InValues",
+    "MaterializedConcat",
+    "RelatedExists",
+    "UnionOr",
+    "get_bucket_size",
+    "get_concat_parts",
+    "get_exists_query",
+    "get_materialized_field",
+    "get_multi_valued_split",
+    "get_union_query",
+    "pad_values",
+]
+
+SQLResult = tuple[str, tuple[Any, ...]]
+
+
+class InValues(Expression):
+    """
+    Boolean expression equal to the lookup `in` that does not send one
+    parameter per value, the SQL depends on the strategy:
+
+    * `array`: `expression = ANY(%s)` with the values in a single array parameter.
+    * `json_each`: `expression IN (SELECT value FROM json_each(%s))` with the
+      values in a single JSON parameter.
+    * `json_table`: Same as `json_each` with the `JSON_TABLE` of MySQL.
+    * `values`: `expression IN (VALUES (1), (2))` with the integers inlined.
+    * `chunks`: `expression IN (%s, ...) OR expression IN (%s, ...)` with at
+      most `chunk_size` values in each `IN`, fewer when the database limits
+      the number of parameters of a query.
+
+    When no strategy is given, the one of `vendor_strategies` for the database
+    is used. Strategies that cannot handle the type of the values fall back
+    to `chunks`. New strategies are methods named `as_<strategy>_sql`.
+
+    Unlike the lookup `in` the values are not deduplicated.
+    """
+
+    conditional = True
+    output_field = BooleanField()
+
+    chunk_size = 1000
+    default_strategy = "chunks"
+    vendor_strategies = {
+        "postgresql": "array",
+        "sqlite": "json_each",
+        "mysql": "json_table",
+        "oracle": "chunks",
+    }
+
+    def __init__(
+        self, expression: Any, values: Sequence[Any], strategy: str | None = None
+    ) -> None:
+        super().__init__()
+        self.expression: Any = (
+            F(expression) if isinstance(expression, str) else expression
+        )
+        self.values = values
+        self.strategy = strategy
+
+    def __repr__(self) -> str:
+        return "{class_name}({expression!r}, <{count} values>)".format(
+            class_name=self.__class__.__name__,
+            expression=self.expression,
+            count=len(self.values),
+        )
+
+    def get_source_expressions(self) -> list[Any]:
+        return [self.expression]
+
+    def set_source_expressions(self, exprs: Sequence[Any]) -> None:
+        (self.expression,) = exprs
+
+    def get_strategy(self, connection: BaseDatabaseWrapper) -> str:
+        if self.strategy is not None:
+            return self.strategy
+        return self.vendor_strategies.get(connection.vendor, self.default_strategy)
+
+    def get_prep_values(self, connection: BaseDatabaseWrapper) -> list[Any]:
+        output_field = self.expression.output_field
+
+        # Validated integers do not need to go through the field one by one
+        if isinstance(output_field, IntegerField) and all(
+            type(value) is int for value in self.values
+        ):
+            return list(self.values)
+
+        return [
+            output_field.get_db_prep_value(value, connection, prepared=False)
+            for value in self.values
+        ]
+
+    def as_sql(
+        self,
+        compiler: SQLCompiler,
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        if not self.values:
+            raise EmptyResultSet
+
+        sql, params = compiler.compile(self.expression)
+        values = self.get_prep_values(connection)
+        strategy = getattr(self, "as_{}_sql".format(self.get_strategy(connection)))
+        return strategy(sql, params, values, connection)  # type: ignore
+
+    def as_array_sql(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        values: list[Any],
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        return "{sql} = ANY(%s)".format(sql=sql), (*params, values)
+
+    def as_json_each_sql(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        values: list[Any],
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        if not is_json_values(values):
+            return self.as_chunks_sql(sql, params, values, connection)
+
+        return (
+            "{sql} IN (SELECT value FROM json_each(%s))".format(sql=sql),
+            (*params, json.dumps(values)),
+        )
+
+    def as_json_table_sql(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        values: list[Any],
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        # JSON_TABLE requires the type of the column
+        if not all(type(value) is int for value in values):
+            return self.as_chunks_sql(sql, params, values, connection)
+
+        return (
+            "{sql} IN (SELECT value FROM JSON_TABLE(%s, '$[*]'"
+            " COLUMNS (value BIGINT PATH '$')) AS in_values)".format(sql=sql),
+            (*params, json.dumps(values)),
+        )
+
+    def as_values_sql(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        values: list[Any],
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        # Only integers can be inlined safely
+        if not all(type(value) is int for value in values):
+            return self.as_chunks_sql(sql, params, values, connection)
+
+        rows = ", ".join("({:d})".format(value) for value in values)
+        return "{sql} IN (VALUES {rows})".format(sql=sql, rows=rows), tuple(params)
+
+    def as_chunks_sql(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        values: list[Any],
+        connection: BaseDatabaseWrapper,
+    ) -> SQLResult:
+        chunk_size = connection.ops.max_in_list_size() or self.chunk_size
+        max_query_params = connection.features.max_query_params
+
+        if max_query_params is not None:
+            # Every chunk repeats the params of the expression
+            chunk_size = min(chunk_size, max(max_query_params - len(params), 1))
+
+        conditions = []
+        all_params: list[Any] = []
+
+        for start in range(0, len(values), chunk_size):
+            end = start + chunk_size
+            chunk = values[start:end]
+            conditions.append(
+                "{sql} IN ({placeholders})".format(
+                    sql=sql, placeholders=", ".join(["%s"] * len(chunk))
+                )
+            )
+            all_params.extend(params)
+            all_params.extend(chunk)
+
+        if len(conditions) == 1:
+            return conditions[0], tuple(all_params)
+        return "({})".format(" OR ".join(conditions)), tuple(all_params)
+
+
+def is_json_values(values: list[Any]) -> bool:
+    return all(type(value) is int for value in values) or all(
+        type(value) is str for value in values
+    )
+
+
+def get_bucket_size(count: int, buckets: bool | Sequence[int]) -> int:
+    """
+    Returns the size of the bucket for `count` values, `True` for powers of
+    two or the sorted sizes of a ladder. Above the biggest size of the ladder
+    the size is rounded up to a multiple of it.
+    """
+    if count <= 1 or not buckets:
+        return count
+
+    if buckets is True:
+        return 1 << (count - 1).bit_length()
+
+    for size in buckets:
+        if count <= size:
+            return size
+
+    biggest = buckets[-1]
+    return -(-count // biggest) * biggest
+
+
+def pad_values(values: Sequence[Any], size: int) -> list[Any]:
+    """Repeats the last value until there are `size` values"""
+    if len(values) >= size:
+        return list(values)
+    return [*values, *[values[-1]] * (size - len(values))]
+
+
+# Outer path to the relation, the relation and the path after it
+MultiValuedSplit: TypeAlias = (
+    "tuple[str, ForeignObjectRel | ManyToManyField[Any, Any], str]"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def get_multi_valued_split(
+    model: type[Model], lookup: str
+) -> "MultiValuedSplit | None":
+    """
+    Splits the lookup at its first reverse foreign key or many to many
+    relation, None when it does not cross any or it cannot be resolved with
+    the fields of the models, like annotations.
+    """
+    parts = lookup.split(LOOKUP_SEP)
+    opts = model._meta
+
+    for index, part in enumerate(parts):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+
+        if not field.is_relation or field.related_model is None:
+            return None
+
+        if field.many_to_many or field.one_to_many:
+            if not isinstance(field, (ForeignObjectRel, ManyToManyField)):
+                return None
+
+            start = index + 1
+            rest = parts[start:]
+            related_opts = field.related_model._meta
+            if not rest or (rest[0] != "pk" and not has_field(related_opts, rest[0])):
+                # Lookups over the relation itself, like `isnull`
+                return None
+
+            return LOOKUP_SEP.join(parts[:index]), field, LOOKUP_SEP.join(rest)
+
+        opts = field.related_model._meta
+
+    return None
+
+
+def has_field(opts: Any, name: str) -> bool:
+    try:
+        opts.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+RelationKey: TypeAlias = tuple[str, str]
+
+
+def iter_lookups(children: Iterable[Any]) -> Iterator[tuple[str, Any]]:
+    """The lookups of the children of a query and of their nested queries"""
+    for child in children:
+        if isinstance(child, Q):
+            yield from iter_lookups(child.children)
+        else:
+            yield child
+
+
+def strip_relation(child: Any, splits: Mapping[str, "MultiValuedSplit"]) -> Any:
+    """The child with its lookups relative to the model of the relation"""
+    if isinstance(child, Q):
+        return Q(
+            *[strip_relation(item, splits) for item in child.children],
+            _connector=child.connector,
+            _negated=child.negated,
+        )
+    lookup, value = child
+    return splits[lookup][2], value
+
+
+class RelatedExists(Expression):
+    """
+    Boolean expression with the lookups over a multi-valued relation in a
+    correlated `EXISTS` subquery instead of a join, so the rows are not
+    repeated and no `DISTINCT` is needed.
+
+    The lookups, `(lookup, value)` or queries of them, must cross the same
+    reverse foreign key or many to many relation, `orders__status` of a
+    customer becomes `EXISTS(SELECT 1 FROM order WHERE order.customer_id =
+    customer.id AND order.status = %s)`. The relation is found when the
+    expression is resolved, using the model of the query.
+    """
+
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, *lookups: "tuple[str, Any] | Q") -> None:
+        super().__init__()
+        if not lookups:
+            raise ValueError("RelatedExists requires at least one lookup")
+        self.lookups = lookups
+
+    def __repr__(self) -> str:
+        return "{class_name}({lookups})".format(
+            class_name=self.__class__.__name__,
+            lookups=", ".join(repr(lookup) for lookup in self.lookups),
+        )
+
+    def get_subquery(self, model: type[Model]) -> Any:
+        splits = {
+            lookup: split
+            for lookup, _ in iter_lookups(self.lookups)
+            if (split := get_multi_valued_split(model, lookup)) is not None
+        }
+
+        if len(splits) != len({lookup for lookup, _ in iter_lookups(self.lookups)}):
+            # Nothing to correlate with, the lookups are checked on the row itself
+            return model._base_manager.filter(Q(*self.lookups), pk=OuterRef("pk"))
+
+        source, relation, _ = next(iter(splits.values()))
+
+        if any(split[:2] != (source, relation) for split in splits.values()):
+            raise ValueError(
+                "The lookups of RelatedExists must cross the same relation"
+            )
+
+        if isinstance(relation, ManyToManyField):
+            remote_name, outer_name = relation.related_query_name(), "pk"
+        elif relation.many_to_many:
+            remote_name, outer_name = relation.field.name, "pk"
+        else:
+            remote_name = relation.field.name
+            outer_name = relation.field.target_field.name
+
+        if source:
+            outer_name = LOOKUP_SEP.join([source, outer_name])
+
+        related_model = relation.related_model
+        return related_model._base_manager.filter(
+            Q(*[strip_relation(lookup, splits) for lookup in self.lookups]),
+            **{remote_name: OuterRef(outer_name)},
+        )
+
+    def resolve_expression(
+        self,
+        query: Any = None,
+        allow_joins: bool = True,
+        reuse: Any = None,
+        summarize: bool = False,
+        for_save: bool = False,
+    ) -> Any:
+        return Exists(self.get_subquery(query.model)).resolve_expression(
+            query, allow_joins, reuse, summarize, for_save
+        )
+
+
+def get_relation_keys(child: Any, model: type[Model]) -> frozenset["RelationKey"]:
+    """
+    The multi-valued relations crossed by the lookups of the child, negated
+    queries are left to Django and don't count.
+    """
+    if isinstance(child, Q):
+        if child.negated:
+            return frozenset()
+        return frozenset().union(
+            *[get_relation_keys(item, model) for item in child.children]
+        )
+
+    split = get_multi_valued_split(model, child[0]) if isinstance(child, tuple) else None
+
+    if split is None:
+        return frozenset()
+    return frozenset([(split[0], split[1].name)])
+
+
+def is_related_only(child: Any, key: "RelationKey", model: type[Model]) -> bool:
+    """Whether every lookup of the child crosses the relation"""
+    if isinstance(child, Q):
+        return not child.negated and all(
+            is_related_only(item, key, model) for item in child.children
+        )
+    return get_relation_keys(child, model) == {key}
+
+
+def get_exists_query(query: Q, model: type[Model]) -> Q:
+    """
+    Replaces the lookups of the query that cross a multi-valued relation of
+    the model with `RelatedExists` when the rows matched are the same as with
+    the join of a single `filter()`:
+
+    * The children joined with AND that cross the same relation share the
+      subquery, so they have to match the same related row like they do with
+      the join. When one of them also has other lookups, like
+      `Q(a__x=1) & (Q(a__y=2) | Q(b=3))`, the query is left with the join.
+    * The children joined with OR get a subquery each, any related row can
+      match any of them.
+    * Negated queries are left to Django, which already uses a subquery.
+    """
+    if query.negated or not get_relation_keys(query, model):
+        return query
+
+    children: list[Any] = list(query.children)
+    keys = [get_relation_keys(child, model) for child in children]
+
+    if query.connector == Q.OR:
+        return Q(
+            *[
+                RelatedExists(child)
+                if len(child_keys) == 1
+                and is_related_only(child, next(iter(child_keys)), model)
+                else get_exists_query(child, model) if isinstance(child, Q) else child
+                for child, child_keys in zip(children, keys)
+            ],
+            _connector=query.connector,
+        )
+
+    if query.connector != Q.AND:
+        # The relation of XOR can't be split between subqueries
+        return query
+
+    # Position in the new children of the subquery of each relation
+    groups: dict[RelationKey, int] = {}
+    new_children: list[Any] = []
+
+    for child, child_keys in zip(children, keys):
+        if not child_keys:
+            new_children.append(child)
+            continue
+
+        key = next(iter(child_keys))
+
+        if len(child_keys) == 1 and is_related_only(child, key, model):
+            if key in groups:
+                new_children[groups[key]].append(child)
+            else:
+                groups[key] = len(new_children)
+                new_children.append([child])
+            continue
+
+        # A child that mixes the relation with other lookups can't share the
+        # subquery of its siblings
+        if any(
+            child_keys & other_keys
+            for other_child, other_keys in zip(children, keys)
+            if other_child is not child
+        ):
+            return query
+
+        new_children.append(get_exists_query(child, model))
+
+    return Q(
+        *[
+            RelatedExists(*child) if isinstance(child, list) else child
+            for child in new_children
+        ],
+        _connector=query.connector,
+    )
+
+
+# Lookups that can be answered with an index seek
+INDEXABLE_LOOKUPS = frozenset(
+    ["exact", "in", "startswith", "gt", "gte", "lt", "lte", "range", "isnull"]
+)
+
+
+class UnionOr(Expression):
+    """
+    Boolean expression equal to the conditions joined with OR, written as
+    `pk IN (SELECT pk WHERE a UNION SELECT pk WHERE b ...)`. Each branch of
+    the union can use the index of its own column, while a single `WHERE a
+    OR b` is often answered with a full scan.
+
+    The conditions are lookups or `Q` over the fields of the model of the
+    query, they cannot use annotations.
+    """
+
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, *conditions: Q | tuple[str, Any]) -> None:
+        super().__init__()
+        if not conditions:
+            raise ValueError("UnionOr requires at least one condition")
+        self.conditions = conditions
+
+    def __repr__(self) -> str:
+        return "{class_name}({conditions})".format(
+            class_name=self.__class__.__name__,
+            conditions=", ".join(repr(condition) for condition in self.conditions),
+        )
+
+    def get_subquery(self, model: type[Model]) -> Any:
+        querysets = [
+            model._base_manager.filter(
+                condition if isinstance(condition, Q) else Q(condition)
+            ).values("pk")
+            for condition in self.conditions
+        ]
+        return querysets[0].union(*querysets[1:])
+
+    def resolve_expression(
+        self,
+        query: Any = None,
+        allow_joins: bool = True,
+        reuse: Any = None,
+        summarize: bool = False,
+        for_save: bool = False,
+    ) -> Any:
+        subquery = self.get_subquery(query.model).query.resolve_expression(
+            query, allow_joins, reuse, summarize
+        )
+        pk = F("pk").resolve_expression(query, allow_joins, reuse, summarize)
+        return In(pk, subquery)
+
+
+def is_indexable_lookup(model: type[Model], lookup: str) -> bool:
+    """
+    Whether the lookup starts with a field of the model, not an annotation,
+    and ends with one of `INDEXABLE_LOOKUPS` or no lookup at all. Transforms
+    like `date_joined__year` or `name__lower` wrap the column in a function
+    and are not indexable, neither are the lookups that cross multi-valued
+    relations.
+    """
+    rest = lookup.split(LOOKUP_SEP)
+    field: Any = None
+
+    while rest:
+        name = rest[0]
+        if name == "pk":
+            field = model._meta.pk
+        elif has_field(model._meta, name):
+            field = model._meta.get_field(name)
+        else:
+            break
+        rest = rest[1:]
+
+        if not field.is_relation or field.related_model is None:
+            break
+
+        # A branch of the UNION would match any related row, not the same
+        # one as the siblings over the relation
+        if field.many_to_many or field.one_to_many:
+            return False
+
+        # The relations compare the keys of the related model
+        model = field.related_model
+        field = field.target_field
+
+    if field is None or len(rest) > 1:
+        return False
+
+    if rest:
+        return field.get_lookup(rest[0]) is not None and rest[0] in INDEXABLE_LOOKUPS
+
+    return True
+
+
+def get_union_query(query: Q, model: type[Model], fan_out: int = 2) -> Q:
+    """
+    Replaces the nodes joined with OR of at least `fan_out` lookups, all of
+    them over indexable lookups of fields of the model, with `UnionOr`.
+    """
+    children: list[Any] = [
+        get_union_query(child, model, fan_out) if isinstance(child, Q) else child
+        for child in query.children
+    ]
+
+    if (
+        query.connector == Q.OR
+        and len(children) >= fan_out
+        and all(
+            isinstance(child, tuple) and is_indexable_lookup(model, child[0])
+            for child in children
+        )
+    ):
+        return Q(UnionOr(*children), _negated=query.negated)
+
+    return Q(*children, _connector=query.connector, _negated=query.negated)
+
+
+def get_concat_parts(expression: Any) -> tuple[Any, ...]:
+    """
+    The flat list of the parts of a `Concat`, the names of the fields and
+    the values, to compare concatenations built in different ways.
+    """
+    if isinstance(expression, (Concat, ConcatPair)):
+        return tuple(
+            part
+            for source in expression.get_source_expressions()
+            for part in get_concat_parts(source)
+        )
+    if isinstance(expression, F):
+        return (expression.name,)  # type: ignore
+    if isinstance(expression, Value):
+        return (expression,)
+    return (repr(expression),)
+
+
+@functools.lru_cache(maxsize=256)
+def get_materialized_field(
+    model: type[Model], parts: tuple[Any, ...]
+) -> GeneratedField | None:
+    """The generated field of the model with the same concatenation, if any"""
+    for field in model._meta.concrete_fields:
+        expression = getattr(field, "expression", None)
+        if (
+            isinstance(field, GeneratedField)
+            and isinstance(expression, Concat)
+            and get_concat_parts(expression) == parts
+        ):
+            return field
+    return None
+
+
+class MaterializedConcat(Concat):
+    """
+    `Concat` that uses the generated field of the model with the same
+    expression when there is one, so the filters can use its index instead
+    of building the string of every row.
+    """
+
+    def resolve_expression(
+        self,
+        query: Any = None,
+        allow_joins: bool = True,
+        reuse: Any = None,
+        summarize: bool = False,
+        for_save: bool = False,
+    ) -> Any:
+        if query is not None:
+            field = get_materialized_field(query.model, get_concat_parts(self))
+
+            if field is not None:
+                return F(field.name).resolve_expression(
+                    query, allow_joins, reuse, summarize, for_save
+                )
+
+        return super().resolve_expression(
+            query, allow_joins, reuse, summarize, for_save
+        )
@@ -0,0 +1,360 @@
+import datetime
+import functools
+from collections.abc import (
+    Iterable,
+    Mapping,
+)
+from typing import Any
+
+
+from django.db.models import (
+    Count,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+)
+from django.utils import timezone
+
+
+from . import utils
+from .fields import (
+    ChoicesField,
+    DateField,
+    DateTimeField,
+    Field,
+    ListField,
+    default_timezone,
+)
+from .mixins import Range
+from .plans import (
+    FilterPlan,
+    combine_queries,
+)
+
+__all__ = [
+    "get_facet_choices",
+    "get_facet_field",
+    "get_facets",
+    "get_range_summaries",
+]
+
+
+def get_facet_field(field: Field) -> ChoicesField | None:
+    """
+    The field with the choices of `ChoicesField`, `BooleanField` and
+    `InChoicesField`, None for the fields without facets.
+    """
+    if isinstance(field, ChoicesField):
+        return field
+    if isinstance(field, ListField) and isinstance(field.field, ChoicesField):
+        return field.field
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def get_facet_choices(field: ChoicesField) -> dict[str, Q]:
+    """
+    The query of every choice of the field by its key, keys that validate to
+    the same value, like `true` and `1` of `BooleanField`, only keep the first.
+    """
+    choices: dict[str, Q] = {}
+    values: list[Any] = []
+
+    for key in field.choices:
+        errors, value = field.perform_validation(str(key))
+
+        if errors or value in values:
+            continue
+
+        values.append(value)
+        choices[str(key)] = field.get_query(value)
+
+    return choices
+
+
+def get_plan_query(
+    plan: FilterPlan, data: Mapping[str, str]
+) -> tuple[Q, dict[str, Any]]:
+    """The query and annotations of the valid query params joined with AND"""
+    queries = []
+    annotate: dict[str, Any] = {}
+
+    for query, step_annotate, _ in plan.get_filter(data):
+        annotate.update(step_annotate)
+        if query:
+            queries.append(query)
+
+    return combine_queries(queries, Q.AND), annotate
+
+
+def get_facet_queries(
+    plan: FilterPlan, data: Mapping[str, str], names: Iterable[str]
+) -> tuple[dict[str, Q], dict[str, Any]]:
+    """
+    The query of every name with all the query params except its own, and
+    the annotations all the queries need.
+    """
+    queries: dict[str, Q] = {}
+    all_annotate: dict[str, Any] = {}
+    # Names that are absent share the query of all the query params
+    shared: tuple[Q, dict[str, Any]] | None = None
+
+    for name in names:
+        if name in data:
+            query, annotate = get_plan_query(
+                plan, {key: value for key, value in data.items() if key != name}
+            )
+        else:
+            if shared is None:
+                shared = get_plan_query(plan, data)
+            query, annotate = shared
+
+        queries[name] = query
+        all_annotate.update(annotate)
+
+    return queries, all_annotate
+
+
+def get_facets(
+    plan: FilterPlan,
+    queryset: QuerySet,  # type: ignore
+    data: Mapping[str, str],
+) -> dict[str, dict[str, int]]:
+    """
+    Counts the rows of each choice of the facet fields in a single query.
+
+    The counts of a facet are filtered by every query param except its own,
+    so the other choices of a multi-select show how many rows they would add.
+    The invalid query params are ignored.
+    """
+    facet_fields: dict[str, ChoicesField] = {}
+
+    for field in utils.iter_fields(plan.query_fields):
+        facet_field = get_facet_field(field)
+        if facet_field is not None:
+            facet_fields.setdefault(field.query_param_name, facet_field)
+
+    if not facet_fields:
+        return {}
+
+    queries, annotate = get_facet_queries(plan, dict(data.items()), facet_fields)
+    aggregates: dict[str, Count] = {}
+    labels: list[tuple[str, str]] = []
+
+    for name, facet_field in facet_fields.items():
+        for key, choice_query in get_facet_choices(facet_field).items():
+            alias = "facet_{}".format(len(labels))
+            labels.append((name, key))
+            aggregates[alias] = Count(
+                "pk", distinct=True, filter=queries[name] & choice_query
+            )
+
+    facets: dict[str, dict[str, int]] = {name: {} for name in facet_fields}
+
+    if not aggregates:
+        return facets
+
+    result = queryset.alias(**annotate).aggregate(**aggregates)
+
+    for index, (name, key) in enumerate(labels):
+        facets[name][key] = result["facet_{}".format(index)]
+
+    return facets
+
+
+DATE_INTERVALS = ("day", "week", "month")
+
+
+def align_date(value: datetime.date, interval: str) -> datetime.date:
+    if interval == "week":
+        return value - datetime.timedelta(days=value.weekday())
+    if interval == "month":
+        return value.replace(day=1)
+    return value
+
+
+def count_intervals(start: datetime.date, end: datetime.date, interval: str) -> int:
+    """The number of intervals from `start`, already aligned, until after `end`"""
+    if interval == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (end - start).days
+    return days // 7 + 1 if interval == "week" else days + 1
+
+
+def add_intervals(value: datetime.date, interval: str, count: int) -> datetime.date:
+    """The date `count` intervals after `value`, clamped at the last date"""
+    try:
+        if interval == "month":
+            months = value.year * 12 + value.month - 1 + count
+            return value.replace(year=months // 12, month=months % 12 + 1)
+        days = count * 7 if interval == "week" else count
+        return value + datetime.timedelta(days=days)
+    except (OverflowError, ValueError):
+        return datetime.date.max
+
+
+def get_date_edges(
+    start: datetime.date, end: datetime.date, buckets: int, interval: str | None
+) -> list[datetime.date]:
+    """
+    Edges of at most `buckets` buckets from the start of the interval of
+    `start` until after `end`, the last edge is clamped at the last date.
+    Without interval the smallest one with at most `buckets` buckets is used,
+    when even months give more buckets, or the given interval does, each
+    bucket spans several intervals.
+    """
+    for current in [interval] if interval else DATE_INTERVALS:
+        aligned = align_date(start, current)
+        count = count_intervals(aligned, end, current)
+        if count <= buckets:
+            break
+
+    # Every bucket spans `step` intervals, the last one is completed
+    step = -(-count // buckets)
+    return [
+        add_intervals(aligned, current, step * index)
+        for index in range(-(-count // step) + 1)
+    ]
+
+
+def get_number_edges(start: Any, end: Any, buckets: int) -> list[Any]:
+    if isinstance(start, int):
+        width = max(1, -(-(end - start + 1) // buckets))
+        edges = [start]
+        while edges[-1] <= end:
+            edges.append(edges[-1] + width)
+        return edges
+
+    if start == end:
+        return [start, end]
+
+    width = (end - start) / buckets
+    return [start + width * index for index in range(buckets)] + [end]
+
+
+def get_edges(
+    field: Field, start: Any, end: Any, buckets: int, date_interval: str | None
+) -> tuple[list[Any], bool]:
+    """
+    Edges of the buckets and whether the last bucket includes its end, the
+    edges of datetime columns are the midnights of the current timezone.
+    """
+    if not isinstance(field, DateTimeField):
+        edges = get_number_edges(start, end, buckets)
+        return edges, not isinstance(start, int)
+
+    if isinstance(start, datetime.datetime):
+        start, end = to_local_date(start), to_local_date(end)
+
+    edges = get_date_edges(start, end, buckets, date_interval)
+    # A clamped last edge, like for the sentinel 9999-12-31, includes its end
+    inclusive = edges[-1] == datetime.date.max
+
+    if not isinstance(field, DateField) or getattr(field, "datetime_bounds", False):
+        _timezone = default_timezone()
+        edges = [
+            datetime.datetime.combine(edge, datetime.time.min, tzinfo=_timezone)
+            for edge in edges
+        ]
+
+    return edges, inclusive
+
+
+def to_local_date(value: datetime.datetime) -> datetime.date:
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def get_range_summaries(
+    plan: FilterPlan,
+    queryset: QuerySet,  # type: ignore
+    data: Mapping[str, str],
+    buckets: int = 10,
+    bounds: Mapping[str, tuple[Any, Any]] | None = None,
+    date_interval: str | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    The min, max and histogram of the first target field of every `Range`
+    field, each one filtered by every query param except its own.
+
+    The min and max of all the fields are computed in one query and the
+    histograms in a second one, when the `bounds` of every field are given
+    the histograms are computed with them in a single query.
+
+    :param date_interval: `day`, `week` or `month`, the buckets of the dates
+    start at the beginning of the interval. By default the smallest interval
+    with at most `buckets` buckets. There are never more than `buckets`
+    buckets, a bucket spans several intervals when needed.
+    """
+    range_fields: dict[str, Field] = {}
+
+    for field in utils.iter_fields(plan.query_fields):
+        if isinstance(field, Range):
+            range_fields.setdefault(field.query_param_name, field)
+
+    if not range_fields:
+        return {}
+
+    queries, annotate = get_facet_queries(plan, dict(data.items()), range_fields)
+    queryset = queryset.alias(**annotate)
+    targets = {name: field.target_fields[0] for name, field in range_fields.items()}
+
+    bounds_aggregates: dict[str, Any] = {}
+    for index, (name, target) in enumerate(targets.items()):
+        bounds_aggregates["min_{}".format(index)] = Min(target, filter=queries[name])
+        bounds_aggregates["max_{}".format(index)] = Max(target, filter=queries[name])
+
+    known_bounds = dict(bounds or {})
+    if all(name in known_bounds for name in range_fields):
+        result: dict[str, Any] = {}
+    else:
+        result = queryset.aggregate(**bounds_aggregates)
+        bounds_aggregates = {}
+        known_bounds = {
+            name: (result["min_{}".format(index)], result["max_{}".format(index)])
+            for index, name in enumerate(range_fields)
+        }
+
+    aggregates: dict[str, Any] = dict(bounds_aggregates)
+    histograms: dict[str, list[tuple[str, Any, Any]]] = {}
+
+    for name, field in range_fields.items():
+        start, end = known_bounds[name]
+        histograms[name] = []
+
+        if start is None or end is None:
+            continue
+
+        edges, inclusive = get_edges(field, start, end, buckets, date_interval)
+        last = len(edges) - 2
+
+        for index, (left, right) in enumerate(zip(edges, edges[1:])):
+            alias = "bucket_{}".format(len(aggregates))
+            lesser = "lte" if inclusive and index == last else "lt"
+            bucket_query = Q(
+                **{
+                    "{}__gte".format(targets[name]): left,
+                    "{}__{}".format(targets[name], lesser): right,
+                }
+            )
+            aggregates[alias] = Count(
+                "pk", distinct=True, filter=queries[name] & bucket_query
+            )
+            histograms[name].append((alias, left, right))
+
+    if aggregates:
+        result.update(queryset.aggregate(**aggregates))
+
+    return {
+        name: {
+            "min": result.get("min_{}".format(index), known_bounds[name][0]),
+            "max": result.get("max_{}".format(index), known_bounds[name][1]),
+            "buckets": [
+                {"start": left, "end": right, "count": result[alias]}
+                for alias, left, right in histograms[name]
+            ],
+        }
+        for index, name in enumerate(range_fields)
+    }
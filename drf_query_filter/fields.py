@@ -1,9 +1,19 @@
 import datetime
 import decimal
+import enum
 import itertools
+import json
 import logging
-from collections.abc import Callable
-from typing import Any
+import re
+from collections.abc import (
+    Callable,
+    Iterable,
+    Sequence,
+)
+from typing import (
+    Any,
+    ClassVar,
+)
 
 
 from django.conf import settings
@@ -14,7 +24,6 @@ from django.db.models.fields import (
     CharField as DjangoCharField,
     Field as DjangoField,
 )
-from django.db.models.functions import Concat
 from django.db.models.query_utils import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -29,7 +38,17 @@ from rest_framework.fields import (
 )
 
 
-from .mixins import Range
+from .dates import get_date_format_parser
+from .expressions import (
+    InValues,
+    MaterializedConcat,
+    get_bucket_size,
+    pad_values,
+)
+from .mixins import (
+    Empty,
+    Range,
+)
 
 __all__ = [
     "Field",
@@ -40,6 +59,7 @@ __all__ = [
     "DecimalField",
     "DateTimeField",
     "DateField",
+    "RelativeDateTimeField",
     "ChoicesField",
     "BooleanField",
     "ExistsField",
@@ -49,6 +69,7 @@ __all__ = [
     "RangeDecimalField",
     "RangeDateTimeField",
     "RangeDateField",
+    "RangeRelativeDateTimeField",
     "InIntegerField",
     "InChoicesField",
 ]
@@ -56,51 +77,101 @@ __all__ = [
 log = logging.getLogger("drf_query_filter")
 
 
+def get_canonical_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return get_canonical_value(value.value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Empty):
+        return None
+    if isinstance(value, decimal.Decimal):
+        return str(value.normalize())
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [get_canonical_value(item) for item in value]
+    return str(value)
+
+
 class Node:
+    """
+    A node of the tree of fields.
+
+    Nodes are immutable, combining nodes with `&`, `|` or `^` returns a new
+    node that shares the given nodes instead of modifying them. This allows
+    the same tree to be shared between threads and be used as a key.
+    """
+
+    __slots__ = ("childrens", "connector", "_hash")
+
+    # Names of the slots of the class and its parents, except the hash
+    attribute_names: ClassVar[tuple[str, ...]] = ("childrens", "connector")
+
     internal_error_messages: dict[str, str] = {
         "value_error": "cannot perform the operation with the given instance"
     }
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.attribute_names = tuple(
+            dict.fromkeys(
+                slot
+                for klass in reversed(cls.__mro__)
+                for slot in klass.__dict__.get("__slots__", ())
+                if slot not in ("_hash", "__dict__", "__weakref__")
+            )
+        )
+
     def __init__(
         self,
-        childrens: list["Node"],
+        childrens: Iterable["Node"] | None,
         connector: str = Q.AND,
     ) -> None:
-        self.childrens = childrens or list()
+        self.childrens: tuple[Node, ...] = tuple(childrens or ())
         self.connector = connector
+        self._hash: int | None = None
 
-    def __and__(self, other: "Node") -> "Node":
+    def combine(self, other: "Node", connector: str) -> "Node":
         if not isinstance(other, Node):
             raise ValueError(self.internal_error_messages["value_error"])
 
-        if self.connector == Q.AND:
-            self.childrens.append(other)
-            return self
-        else:
-            node = Node(childrens=[self, other], connector=Q.AND)
-            return node
+        childrens: list[Node] = []
+        for node in (self, other):
+            if type(node) is Node and node.connector == connector:
+                childrens.extend(node.childrens)
+            else:
+                childrens.append(node)
 
-    def __or__(self, other: "Node") -> "Node":
-        if not isinstance(other, Node):
-            raise ValueError(self.internal_error_messages["value_error"])
+        return Node(childrens=childrens, connector=connector)
 
-        if self.connector == Q.OR:
-            self.childrens.append(other)
-            return self
-        else:
-            node = Node(childrens=[self, other], connector=Q.OR)
-            return node
+    def __and__(self, other: "Node") -> "Node":
+        return self.combine(other, Q.AND)
+
+    def __or__(self, other: "Node") -> "Node":
+        return self.combine(other, Q.OR)
 
     def __xor__(self, other: "Node") -> "Node":
-        if not isinstance(other, Node):
-            raise ValueError(self.internal_error_messages["value_error"])
+        return self.combine(other, Q.XOR)
 
-        if self.connector == Q.XOR:
-            self.childrens.append(other)
-            return self
-        else:
-            node = Node(childrens=[self, other], connector=Q.XOR)
-            return node
+    def get_identity(self) -> tuple[Any, ...]:
+        """Values used to compare and hash the node"""
+        return (type(self), self.connector, self.childrens)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Node) or type(self) is not type(other):
+            return NotImplemented
+        return self.get_identity() == other.get_identity()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.get_identity())
+        return self._hash
 
     def __repr__(self) -> str:
         if self.childrens:
@@ -117,6 +188,14 @@ class Node:
             errors.update(child.errors)
         return errors
 
+    def get_query_param_names(self) -> frozenset[str]:
+        """Returns the names of the query params read by the node and its childrens"""
+        return frozenset(
+            itertools.chain.from_iterable(
+                child.get_query_param_names() for child in self.childrens
+            )
+        )
+
     def get_filter(
         self, data: dict[str, str]
     ) -> tuple[Q, dict[str, str], dict[str, list[Any]]]:
@@ -128,7 +207,7 @@ class Node:
             child_query, child_annotate, child_errors = child.get_filter(data)
 
             if child_errors:
-                errors.update(errors)
+                errors.update(child_errors)
 
             annotate.update(child_annotate)
             if self.connector == Q.AND:
@@ -177,6 +256,14 @@ class Field(Node):
      obtain a Q object
     """
 
+    __slots__ = (
+        "query_param_name",
+        "target_fields",
+        "validators",
+        "description",
+        "example",
+    )
+
     def __init__(
         self,
         query_param_name: str,
@@ -216,27 +303,34 @@ class Field(Node):
         self.description = description
         self.example = example
 
-        super().__init__(childrens=[], connector=connector)
+        super().__init__(childrens=None, connector=connector)
 
     def __str__(self) -> str:
-        if self.childrens:
-            return "{query_param} {connector} {childrens}".format(
-                query_param=self.query_param_name,
-                connector=self.connector,
-                childrens=" {} ".format(self.connector).join(
-                    (repr(child) if not child.childrens else "({:r})".format(child))
-                    for child in self.childrens
-                ),
-            )
         return self.query_param_name
 
     def __repr__(self) -> str:
-        return ("{class_name}(query_param={query_param}, childrens={childrens})").format(
+        return "{class_name}(query_param={query_param})".format(
             class_name=self.__class__.__name__,
             query_param=self.query_param_name,
-            childrens=", ".join(repr(children) for children in self.childrens),
         )
 
+    def get_identity(self) -> tuple[Any, ...]:
+        """
+        Fields are compared by all of their attributes, only the hashable
+        ones are used for the hash.
+        """
+        attributes: list[Any] = [
+            getattr(self, name, None) for name in self.attribute_names
+        ]
+        # Subclasses that don't define __slots__
+        attributes.extend(getattr(self, "__dict__", {}).items())
+        return (type(self), *attributes)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((type(self), self.query_param_name, self.connector))
+        return self._hash
+
     def validate(self, raw_value: str) -> Any:
         """
         Function for custom validations, if there is any error it should throw
@@ -269,6 +363,24 @@ class Field(Node):
 
         return errors, value
 
+    def perform_bulk_validation(self, raw_values: list[str]) -> tuple[list[Any], Any]:
+        """
+        Validates a list of values, returns the errors and the valid values.
+        Fields with a faster way to validate many values can overwrite it.
+        """
+        errors: list[Any] = []
+        values = []
+
+        for raw_value in raw_values:
+            value_errors, value = self.perform_validation(raw_value)
+
+            if value_errors:
+                errors.extend(value_errors)
+            else:
+                values.append(value)
+
+        return errors, values
+
     def get_raw_value_from_query_param(
         self, query_param_data: dict[str, str]
     ) -> tuple[bool, Any]:
@@ -277,6 +389,13 @@ class Field(Node):
         except KeyError:
             return False, None
 
+    def get_query_param_names(self) -> frozenset[str]:
+        """
+        Fields that read other query params in `get_raw_value_from_query_param`
+        should include them here.
+        """
+        return frozenset([self.query_param_name])
+
     def get_annotate(self) -> dict[str, Any]:
         """
         This should be overwritten if the field requires to annotate custom
@@ -307,21 +426,15 @@ class Field(Node):
             else:
                 errors = {self.query_param_name: self_errors}
 
-        for child in self.childrens:
-            child_query, child_annotate, child_errors = child.get_filter(query_param_data)
-            if child_errors:
-                errors.update(child_errors)
-            else:
-                annotate.update(child_annotate)
-                if self.connector == Q.AND:
-                    query &= child_query
-                elif self.connector == Q.OR:
-                    query |= child_query
-                elif self.connector == Q.XOR:
-                    query ^= child_query
-
         return query, annotate, errors
 
+    def get_canonical_value(self, value: Any) -> Any:
+        """
+        JSON compatible version of a validated value, values that filter the
+        same way should return the same result.
+        """
+        return get_canonical_value(value)
+
     def get_schema(self) -> dict[str, Any]:
         return {"type": "string"}
 
@@ -336,36 +449,70 @@ class Field(Node):
         }
 
     def get_schema_operation_parameters(self) -> list[dict[str, Any]]:
-        schema: list[dict[str, Any]] = [self.get_schema_operation_parameter()]
-
-        if self.childrens:
-            schema.extend(
-                itertools.chain.from_iterable(
-                    child.get_schema_operation_parameters() for child in self.childrens
-                )
-            )
-
-        return schema
+        return [self.get_schema_operation_parameter()]
 
 
 class ListField(Field):
     """
-    ListField executes
+    ListField executes the validation of the given field over every value of
+    the list separated by `list_separator`.
+
+    :param unique: Removes the repeated values keeping the first one.
+    :param sort: Sorts the values, the values must be comparable.
+    :param max_length: Maximum number of values, checked before validating them.
+    :param in_values_threshold: Target fields with the lookup `in` use the
+    expression `InValues` when there are more values than this, by default None
+    to always use the lookup.
+    :param in_values_strategy: Strategy of `InValues`, by default it depends on
+    the database.
+    :param buckets: Pads the values of the lookup `in` by repeating the last one
+    up to the next power of two when True, or up to the next size of the given
+    ladder, so the number of distinct SQL statements stays small.
     """
 
+    __slots__ = (
+        "field",
+        "list_separator",
+        "unique",
+        "sort",
+        "max_length",
+        "in_values_threshold",
+        "in_values_strategy",
+        "buckets",
+    )
+
+    default_list_separator = ","
+    # The lookup `in` is used as it is unless a threshold is given
+    default_in_values_threshold: int | None = None
+
+    error_messages = {
+        "max_length": _("Ensure this field has no more than {max_length} elements."),
+    }
+
     def __init__(
         self,
         field: Field,
+        list_separator: str | None = None,
+        unique: bool = False,
+        sort: bool = False,
+        max_length: int | None = None,
+        in_values_threshold: int | None = default_in_values_threshold,
+        in_values_strategy: str | None = None,
+        buckets: bool | Sequence[int] = False,
     ) -> None:
         self.field = field
+        self.list_separator = list_separator or self.default_list_separator
+        self.unique = unique
+        self.sort = sort
+        self.max_length = max_length
+        self.in_values_threshold = in_values_threshold
+        self.in_values_strategy = in_values_strategy
+        self.buckets = buckets if isinstance(buckets, bool) else tuple(sorted(buckets))
 
         self.query_param_name = self.field.query_param_name
         self.description = self.field.description
         self.example = self.field.example
 
-        if self.field.childrens:
-            log.warning("Given field has childrens")
-
         super().__init__(
             self.field.query_param_name,
             self.field.target_fields,
@@ -376,32 +523,93 @@ class ListField(Field):
         )
 
     def perform_validation(self, raw_value: str) -> tuple[list[Any], Any]:
-        raw_values = raw_value.split(",")
+        raw_values = [
+            raw_val for raw_val in raw_value.split(self.list_separator) if raw_val
+        ]
 
-        validated_values = []
-        errors: list[Any] = []
+        # The empty parts, like in `1,,2,`, are not values
+        if self.max_length is not None and len(raw_values) > self.max_length:
+            return [
+                ErrorDetail(
+                    self.error_messages["max_length"].format(max_length=self.max_length),
+                    code="max_length",
+                )
+            ], []
 
-        for raw_val in raw_values:
-            if raw_val:
-                field_errors, value = self.field.perform_validation(raw_val)
+        if self.unique:
+            raw_values = list(dict.fromkeys(raw_values))
 
-                if field_errors:
-                    errors.extend(field_errors)
-                else:
-                    validated_values.append(value)
+        errors, validated_values = self.field.perform_bulk_validation(raw_values)
 
         if not validated_values:
             errors.append(
                 ErrorDetail("No values has been passed", code="no_values_given")
             )
+        else:
+            # Different raw values can be validated into the same value
+            if self.unique:
+                validated_values = list(dict.fromkeys(validated_values))
+            if self.sort:
+                self.sort_values(validated_values)
 
         return errors, validated_values
 
+    def sort_values(self, values: list[Any]) -> None:
+        try:
+            values.sort()
+        except TypeError:
+            # Values that can't be compared, like None and numbers, are sorted
+            # by their canonical value
+            values.sort(
+                key=lambda value: json.dumps(
+                    self.field.get_canonical_value(value), sort_keys=True, default=str
+                )
+            )
+
     def get_query(self, value: list[Any]) -> Q:
-        return Q(
-            **{field: value for field in self.target_fields},
-            _connector=self.connector,
+        large = (
+            self.in_values_threshold is not None
+            and len(value) > self.in_values_threshold
         )
+        if not large and not self.buckets:
+            return Q(
+                **{field: value for field in self.target_fields},
+                _connector=self.connector,
+            )
+
+        # The lookup `in` removes the repeated values, the padded values of the
+        # small lists use the placeholders of the strategy `chunks` instead.
+        strategy = self.in_values_strategy or (None if large else "chunks")
+        in_values = pad_values(value, get_bucket_size(len(value), self.buckets))
+
+        expressions = []
+        lookups = {}
+        for field in self.target_fields:
+            if field.endswith("__in"):
+                expressions.append(
+                    InValues(field.removesuffix("__in"), in_values, strategy)
+                )
+            else:
+                lookups[field] = value
+
+        return Q(*expressions, **lookups, _connector=self.connector)
+
+    def get_canonical_value(self, value: list[Any]) -> Any:
+        canonical_values = list(map(self.field.get_canonical_value, value))
+
+        # Other lookups, like `range` or `exact` of an array, depend on the order
+        if not all(
+            isinstance(target_field, str) and target_field.endswith("__in")
+            for target_field in self.target_fields
+        ):
+            return canonical_values
+
+        # The order and the repeated values do not change the result of `in`
+        values = {
+            json.dumps(canonical_value, sort_keys=True): canonical_value
+            for canonical_value in canonical_values
+        }
+        return [values[key] for key in sorted(values)]
 
     def get_schema(self) -> dict[str, Any]:
         return {
@@ -422,6 +630,8 @@ class ListField(Field):
 
 
 class StringField(Field):
+    __slots__ = ("schema_format",)
+
     def __init__(
         self,
         query_param_name: str,
@@ -457,6 +667,8 @@ class IntegerField(Field):
     Field that only accepts integers as values
     """
 
+    __slots__ = ()
+
     error_messages = {
         "invalid": _("`{value}` value must be an integer."),
     }
@@ -470,6 +682,15 @@ class IntegerField(Field):
                 code="invalid",
             )
 
+    def perform_bulk_validation(self, raw_values: list[str]) -> tuple[list[Any], Any]:
+        if not self.validators and type(self).validate is IntegerField.validate:
+            try:
+                return [], list(map(int, raw_values))
+            except ValueError:
+                # Validated one by one to report which values are wrong
+                pass
+        return super().perform_bulk_validation(raw_values)
+
     def get_schema(self) -> dict[str, str]:
         return {
             "type": "number",
@@ -482,6 +703,8 @@ class FloatField(Field):
     Field that only accepts floats values
     """
 
+    __slots__ = ()
+
     error_messages = {
         "invalid": _("`{value}` value must be a float."),
     }
@@ -507,6 +730,8 @@ class DecimalField(Field):
     Field that only accepts Decimal values
     """
 
+    __slots__ = ()
+
     error_messages = {
         "invalid": _("`{value}` value must be a double."),
         "is_nan": _("`{value}` value must not be NaN"),
@@ -550,6 +775,8 @@ class DateTimeField(Field):
     Field that only accepts values that can be parsed into datetime
     """
 
+    __slots__ = ("date_format", "make_aware", "parser")
+
     error_messages = {
         "wrong_format": (
             "Value %(value)s does not have the correct format,"
@@ -581,13 +808,15 @@ class DateTimeField(Field):
 
         self.date_format = date_format or self.default_date_format
         self.make_aware = make_aware
+        self.parser = get_date_format_parser(self.date_format)
 
     def validate(self, raw_value: Any) -> Any:
         try:
-            dt = datetime.datetime.strptime(raw_value, self.date_format)
-            if self.make_aware:
+            dt = self.parser.parse(raw_value)
+            # The current timezone is only looked up for naive values
+            if self.make_aware and (dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None):
                 _timezone = default_timezone()
-                if _timezone and (dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None):
+                if _timezone:
                     return timezone.make_aware(dt, _timezone)
             return dt
         except ValueError:
@@ -609,12 +838,14 @@ class DateField(DateTimeField):
     Field that only accepts values that can be parsed into date
     """
 
+    __slots__ = ()
+
     default_date_format = "%Y-%m-%d"
     format = "date"
 
     def validate(self, raw_value: str) -> Any:
         try:
-            return datetime.datetime.strptime(raw_value, self.date_format).date()
+            return self.parser.parse(raw_value).date()
         except ValueError:
             raise ValidationError(
                 self.error_messages["wrong_format"]
@@ -623,12 +854,94 @@ class DateField(DateTimeField):
             )
 
 
+RELATIVE_UNITS = {
+    "s": datetime.timedelta(seconds=1),
+    "m": datetime.timedelta(minutes=1),
+    "h": datetime.timedelta(hours=1),
+    "d": datetime.timedelta(days=1),
+    "w": datetime.timedelta(weeks=1),
+}
+RELATIVE_PATTERN = re.compile(
+    r"(?:now)?(?:(?P<sign>[+-])(?P<amount>[0-9]{1,6})(?P<unit>[smhdw]))?"
+)
+
+
+class RelativeDateTimeField(DateTimeField):
+    """
+    Field that accepts times relative to now, like `now`, `-15m`, `-24h`,
+    `-7d`, `-2w` or `now+1h`, and also dates with `date_format`.
+
+    The relative times are floored to `granularity` in the current timezone,
+    so every request within the same `granularity` gets the same value and
+    the same queries, which lets the caches of the queries and the results
+    hit. The default granularity is one minute.
+    """
+
+    __slots__ = ("granularity",)
+
+    error_messages = {
+        "wrong_format": (
+            "Value %(value)s is not a relative time like -24h or now,"
+            " or a date with the format %(date_format)s"
+        ),
+        "out_of_range": "Value %(value)s is out of the range of dates",
+    }
+    default_granularity = datetime.timedelta(minutes=1)
+
+    def __init__(
+        self,
+        *args: Any,
+        granularity: datetime.timedelta | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.granularity = granularity or self.default_granularity
+
+    def get_now(self) -> datetime.datetime:
+        now = timezone.now()
+        return timezone.localtime(now) if timezone.is_aware(now) else now
+
+    def floor(self, value: datetime.datetime) -> datetime.datetime:
+        """
+        Floors the value to the granularity counted from `datetime.min` in
+        the current timezone, days start at midnight and weeks on Monday.
+        """
+        naive = value.replace(tzinfo=None)
+        naive -= (naive - datetime.datetime.min) % self.granularity
+
+        if value.tzinfo is None:
+            return naive
+        return timezone.make_aware(naive, value.tzinfo)
+
+    def validate(self, raw_value: Any) -> Any:
+        match = RELATIVE_PATTERN.fullmatch(raw_value)
+
+        if match is None or not raw_value:
+            return super().validate(raw_value)
+
+        value = self.get_now()
+
+        try:
+            if match["sign"]:
+                delta = int(match["amount"]) * RELATIVE_UNITS[match["unit"]]
+                value = value + delta if match["sign"] == "+" else value - delta
+
+            return self.floor(value)
+        except OverflowError:
+            raise ValidationError(
+                self.error_messages["out_of_range"] % {"value": raw_value},
+                code="out_of_range",
+            )
+
+
 class ChoicesField(Field):
     """
     Field made to support multiple options.
     This can handle custom messages for the error raised
     """
 
+    __slots__ = ("choices", "choices_string_to_values", "validate_message")
+
     default_validate_message = _("Given value `{value}` is not a valid option")
 
     def __init__(
@@ -676,6 +989,15 @@ class ChoicesField(Field):
                 code="not_in_choices",
             )
 
+    def perform_bulk_validation(self, raw_values: list[str]) -> tuple[list[Any], Any]:
+        if not self.validators and type(self).validate is ChoicesField.validate:
+            choices = self.choices
+            try:
+                return [], [choices[raw_value] for raw_value in raw_values]
+            except KeyError:
+                pass
+        return super().perform_bulk_validation(raw_values)
+
     def get_schema(self) -> dict[str, Any]:
         return {"type": "string", "enum": list(self.choices.keys())}
 
@@ -685,6 +1007,8 @@ class BooleanField(ChoicesField):
     Field that only accepts boolean related strings
     """
 
+    __slots__ = ("invert",)
+
     TRUE_VALUES = ["true", "t", "1"]
     FALSE_VALUES = ["false", "f", "0"]
     default_validate_message = _("Given value `{value}` is not a valid boolean")
@@ -729,6 +1053,8 @@ class ExistsField(Field):
     This Field doesn't care for the value given
     """
 
+    __slots__ = ("return_value",)
+
     def __init__(
         self,
         query_param_name: str,
@@ -759,6 +1085,8 @@ class ConcatField(Field):
     Concatenate Fields and query from that result
     """
 
+    __slots__ = ("lookup", "output_field", "target_field_name")
+
     def __init__(
         self,
         query_param_name: str,
@@ -800,32 +1128,110 @@ class ConcatField(Field):
         return Q(**{self.get_target_field(): value})
 
     def get_annotate(self) -> dict[str, Any]:
-        concat = Concat(*self.target_fields, output_field=self.output_field)
+        # Uses the generated field of the model with the same concatenation
+        concat = MaterializedConcat(*self.target_fields, output_field=self.output_field)
         return {self.target_field_name: concat}
 
 
 class RangeIntegerField(Range, IntegerField):
-    pass
+    __slots__ = Range.range_slots
 
 
 class RangeFloatField(Range, FloatField):
-    pass
+    __slots__ = Range.range_slots
 
 
 class RangeDecimalField(Range, DecimalField):
-    pass
+    __slots__ = Range.range_slots
 
 
 class RangeDateTimeField(Range, DateTimeField):
-    pass
+    __slots__ = Range.range_slots
+
+
+class RangeRelativeDateTimeField(Range, RelativeDateTimeField):
+    __slots__ = Range.range_slots
 
 
 class RangeDateField(Range, DateField):
-    pass
+    """
+    With `datetime_bounds` the target fields are datetime columns, the dates
+    are turned into the half-open range `>= start of day` and `< start of the
+    next day` in the current timezone, so an index on the column can be used
+    instead of comparing `column__date`. A `__date` suffix of the target
+    fields is removed. The last date has no next day, it is an open bound at
+    the end and out of range after the start.
+    """
+
+    __slots__ = Range.range_slots + ("datetime_bounds",)
+
+    error_messages = {
+        **DateField.error_messages,
+        "out_of_range": "Value %(value)s is out of the range of dates",
+    }
+
+    def __init__(self, *args: Any, datetime_bounds: bool = False, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.datetime_bounds = datetime_bounds
+
+        if datetime_bounds:
+            self.target_fields = [
+                target_field.removesuffix("__date") for target_field in self.target_fields
+            ]
+
+    def perform_validation(self, raw_value: str) -> tuple[list[Any], Any]:
+        errors, value = super().perform_validation(raw_value)
+
+        if errors or not self.datetime_bounds or self.equal:
+            return errors, value
+
+        left_value, _ = value
+
+        # No day starts after the last date
+        if left_value == datetime.date.max:
+            return [
+                ErrorDetail(
+                    self.error_messages["out_of_range"] % {"value": left_value},
+                    code="out_of_range",
+                )
+            ], value
+
+        return errors, value
+
+    def get_query(self, value: Any) -> Q:
+        if not self.datetime_bounds:
+            return super().get_query(value)
+
+        left_value, right_value = value
+        one_day = datetime.timedelta(days=1)
+        query_dict = {}
+
+        for target_field in self.target_fields:
+            if not isinstance(left_value, Empty):
+                start = left_value if self.equal else left_value + one_day
+                query_dict["{}__gte".format(target_field)] = get_start_of_day(start)
+            if isinstance(right_value, Empty):
+                continue
+            if not self.equal:
+                query_dict["{}__lt".format(target_field)] = get_start_of_day(right_value)
+            elif right_value != datetime.date.max:
+                end = right_value + one_day
+                query_dict["{}__lt".format(target_field)] = get_start_of_day(end)
+
+        return Q(**query_dict, _connector=self.connector)
+
+
+def get_start_of_day(value: datetime.date) -> datetime.datetime:
+    """Midnight of the date in the current timezone, naive without `USE_TZ`"""
+    start = datetime.datetime.combine(value, datetime.time.min)
+    _timezone = default_timezone()
+    return timezone.make_aware(start, _timezone) if _timezone else start
 
 
 # === Just Keep... ===
 class InIntegerField(ListField):
+    __slots__ = ()
+
     def __init__(
         self,
         query_param_name: str,
@@ -834,6 +1240,13 @@ class InIntegerField(ListField):
         description: str = "",
         example: str = "",
         connector: str = Q.AND,
+        list_separator: str | None = None,
+        unique: bool = False,
+        sort: bool = False,
+        max_length: int | None = None,
+        in_values_threshold: int | None = ListField.default_in_values_threshold,
+        in_values_strategy: str | None = None,
+        buckets: bool | Sequence[int] = False,
     ) -> None:
         field = IntegerField(
             query_param_name,
@@ -844,7 +1257,16 @@ class InIntegerField(ListField):
             connector,
         )
 
-        super().__init__(field)
+        super().__init__(
+            field,
+            list_separator,
+            unique,
+            sort,
+            max_length,
+            in_values_threshold,
+            in_values_strategy,
+            buckets,
+        )
 
         self.target_fields = [
             "{}__in".format(target_field) for target_field in self.target_fields
@@ -852,6 +1274,8 @@ class InIntegerField(ListField):
 
 
 class InChoicesField(ListField):
+    __slots__ = ()
+
     def __init__(
         self,
         query_param_name: str,
@@ -862,6 +1286,13 @@ class InChoicesField(ListField):
         example: str = "",
         validate_message: str = "",
         connector: str = Q.AND,
+        list_separator: str | None = None,
+        unique: bool = False,
+        sort: bool = False,
+        max_length: int | None = None,
+        in_values_threshold: int | None = ListField.default_in_values_threshold,
+        in_values_strategy: str | None = None,
+        buckets: bool | Sequence[int] = False,
     ) -> None:
         field = ChoicesField(
             query_param_name,
@@ -874,7 +1305,16 @@ class InChoicesField(ListField):
             connector,
         )
 
-        super().__init__(field)
+        super().__init__(
+            field,
+            list_separator,
+            unique,
+            sort,
+            max_length,
+            in_values_threshold,
+            in_values_strategy,
+            buckets,
+        )
 
         self.target_fields = [
             "{}__in".format(target_field) for target_field in self.target_fields
@@ -1,23 +1,60 @@
+import hashlib
 import itertools
+import json
+import logging
+import time
+from collections.abc import Iterator
 from typing import Any
 
 
-from django.db.models import QuerySet
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db.models import (
+    Model,
+    QuerySet,
+)
 from rest_framework import filters
+from rest_framework.exceptions import (
+    ErrorDetail,
+    ValidationError,
+)
 from rest_framework.request import Request
 
 
-from . import fields
+from . import (
+    cache,
+    costs,
+    facets,
+    fields,
+    hooks,
+    plans,
+    utils,
+)
+from .expressions import InValues
+
+log = logging.getLogger("drf_query_filter")
 
 
 class QueryParamFilter(filters.BaseFilterBackend):
     query_param_attr = "query_params"
     query_param_call = "get_query_params"
 
+    plan_cache = plans.PlanCache()
+
     query_schema_attr = "query_schema"
     query_schema_call = "get_query_schema"
 
     query_raise_exceptions = "query_raise_exceptions"
+    query_skip_absent_params = "query_skip_absent_params"
+    query_single_clone = "query_single_clone"
+    query_exists = "query_exists"
+    query_union_fan_out = "query_union_fan_out"
+    query_hooks = "query_hooks"
+    query_cost_budget = "query_cost_budget"
+    query_cost_model = "query_cost_model"
+    query_cost_downgrade = "query_cost_downgrade"
+
+    default_cost_model = costs.CostModel()
 
     def get_query_fields(self, view: Any) -> list[fields.Node]:
         try:
@@ -42,24 +79,307 @@ class QueryParamFilter(filters.BaseFilterBackend):
         except AttributeError:
             return False
 
+    def get_query_skip_absent_params(self, view: Any) -> bool:
+        return getattr(view, self.query_skip_absent_params, False)
+
+    def get_query_single_clone(self, view: Any) -> bool:
+        return getattr(view, self.query_single_clone, False)
+
+    def get_query_exists(self, view: Any) -> bool:
+        return getattr(view, self.query_exists, False)
+
+    def get_query_union_fan_out(self, view: Any) -> int | None:
+        return getattr(view, self.query_union_fan_out, None)
+
+    def get_query_hooks(self, view: Any) -> hooks.FilterHooks | None:
+        return getattr(view, self.query_hooks, None)
+
+    def get_query_cost_budget(self, view: Any) -> float | None:
+        return getattr(view, self.query_cost_budget, None)
+
+    def get_query_cost_model(self, view: Any) -> costs.CostModel:
+        return getattr(view, self.query_cost_model, None) or self.default_cost_model
+
+    def get_query_cost_downgrade(self, view: Any) -> bool:
+        return getattr(view, self.query_cost_downgrade, False)
+
+    def apply_cost_budget(
+        self,
+        plan: plans.FilterPlan,
+        request: Request,
+        view: Any,
+        query_hooks: hooks.FilterHooks | None = None,
+    ) -> Any:
+        """
+        Returns the query params to filter with. When their cost exceeds the
+        `query_cost_budget` of the view the request is rejected with the code
+        `too_complex`, or with `query_cost_downgrade` the most expensive query
+        params are ignored until the rest fit in the budget.
+
+        Everything that reads the query params with the plan, the filter, the
+        filter values, the facets and the range summaries, uses these.
+        """
+        query_params: Any = request.query_params
+        budget = self.get_query_cost_budget(view)
+
+        if budget is None:
+            return query_params
+
+        query_costs = self.get_query_cost_model(view).get_costs(plan, query_params)
+        total = sum(query_costs.values())
+        dropped: set[str] = set()
+
+        if total > budget and self.get_query_cost_downgrade(view):
+            for name in sorted(query_costs, key=lambda name: -query_costs[name]):
+                if total <= budget:
+                    break
+                dropped.add(name)
+                total -= query_costs[name]
+
+        if query_hooks is not None:
+            query_hooks.cost_estimated(
+                request, view, query_costs, budget, frozenset(dropped)
+            )
+
+        if total > budget:
+            raise ValidationError(
+                detail=ErrorDetail(
+                    "The query params are too complex, their cost is {:g} and the"
+                    " limit is {:g}".format(total, budget),
+                    code="too_complex",
+                ),
+            )
+
+        if dropped:
+            query_params = query_params.copy()
+            for name in dropped:
+                query_params.pop(name, None)
+
+        return query_params
+
+    def get_filter_plan(self, view: Any) -> plans.FilterPlan | None:
+        query_fields = self.get_query_fields(view)
+
+        if not query_fields:
+            return None
+
+        return self.plan_cache.get(query_fields)
+
+    def get_view_class_query_fields(self, view_class: type[Any]) -> list[fields.Node]:
+        """
+        The fields declared as an attribute of the view class, the callable
+        is not used since it may depend on the request.
+        """
+        if hasattr(view_class, self.query_param_call):
+            return []
+
+        return getattr(view_class, self.query_param_attr, None) or []
+
+    def warm_filter_plan(self, view_class: type[Any]) -> plans.FilterPlan | None:
+        """Compile the plan of a view class ahead of time into `plan_cache`"""
+        query_fields = self.get_view_class_query_fields(view_class)
+
+        if not query_fields:
+            return None
+
+        return self.plan_cache.get(query_fields)
+
+    def compile_filter_plan(self, view_class: type[Any]) -> plans.FilterPlan | None:
+        """
+        Compile the plan of a view class without the plan cache nor any other
+        side effect, for the checks and the commands that inspect the views.
+        """
+        query_fields = self.get_view_class_query_fields(view_class)
+
+        if not query_fields:
+            return None
+
+        return plans.FilterPlan(query_fields)
+
     def filter_queryset(
         self, request: Request, queryset: QuerySet, view: Any  # type: ignore
     ) -> QuerySet:  # type: ignore
-        query_fields = self.get_query_fields(view)
         query_params = request.query_params
 
-        if not query_params or not query_fields:
+        if not query_params:
+            return queryset
+
+        plan = self.get_filter_plan(view)
+
+        if plan is None:
             return queryset
 
-        for field in query_fields:
-            queryset, _ = field.filter(
+        query_hooks = self.get_query_hooks(view)
+
+        if query_hooks is not None:
+            return self.filter_queryset_with_hooks(
+                plan, query_hooks, request, queryset, view
+            )
+
+        queryset, _ = plan.filter(
+            queryset,
+            self.apply_cost_budget(plan, request, view),
+            raise_exceptions=self.get_query_raise_exceptions(view),
+            skip_absent=self.get_query_skip_absent_params(view),
+            single_clone=self.get_query_single_clone(view),
+            exists=self.get_query_exists(view),
+            union_fan_out=self.get_query_union_fan_out(view),
+        )
+
+        return queryset
+
+    def filter_queryset_with_hooks(
+        self,
+        plan: plans.FilterPlan,
+        query_hooks: hooks.FilterHooks,
+        request: Request,
+        queryset: QuerySet,  # type: ignore
+        view: Any,
+    ) -> QuerySet:  # type: ignore
+        start = time.perf_counter()
+        query_params = request.query_params
+        errors: dict[str, Any] = {}
+        query_hooks.filter_started(request, view)
+
+        try:
+            query_params = self.apply_cost_budget(plan, request, view, query_hooks)
+            queryset, errors = plan.filter(
                 queryset,
                 query_params,
                 raise_exceptions=self.get_query_raise_exceptions(view),
+                skip_absent=self.get_query_skip_absent_params(view),
+                single_clone=self.get_query_single_clone(view),
+                exists=self.get_query_exists(view),
+                union_fan_out=self.get_query_union_fan_out(view),
+                hooks=query_hooks,
+            )
+        except ValidationError as exc:
+            # Requests over the cost budget are rejected without field errors
+            if isinstance(exc.detail, dict):
+                errors = exc.detail
+            raise
+        finally:
+            query_hooks.filter_finished(
+                request,
+                view,
+                queryset,
+                present=plan.query_param_names.intersection(query_params.keys()),
+                invalid=frozenset(errors),
+                duration=time.perf_counter() - start,
             )
 
         return queryset
 
+    def get_plan_filter_values(
+        self, plan: plans.FilterPlan, query_params: Any
+    ) -> list[tuple[str, Any]]:
+        """
+        The canonical values of the valid query params read by the plan,
+        sorted by name. Nodes that overwrite `get_filter` could read any query
+        param, so the raw values of the unknown query params are included too.
+        """
+        values, _ = self.validate_plan_values(plan, query_params)
+        return values
+
+    def validate_plan_values(
+        self, plan: plans.FilterPlan, query_params: Any
+    ) -> tuple[list[tuple[str, Any]], dict[str, Any]]:
+        """
+        The values of `get_plan_filter_values` and the errors of the query
+        params that are not valid.
+        """
+        values: dict[str, Any] = {}
+        all_errors: dict[str, Any] = {}
+
+        for field in utils.iter_fields(plan.query_fields):
+            name = field.query_param_name
+            if name in values or name in all_errors:
+                continue
+
+            found, raw_value = field.get_raw_value_from_query_param(query_params)
+            if not found:
+                continue
+
+            errors, value = field.perform_validation(raw_value)
+            if errors:
+                all_errors[name] = errors
+            else:
+                values[name] = field.get_canonical_value(value)
+
+        if plan.opaque_steps:
+            for name in query_params.keys():
+                if name not in plan.query_param_names:
+                    values[name] = query_params[name]
+
+        return sorted(values.items()), all_errors
+
+    def get_filter_values(self, request: Request, view: Any) -> list[tuple[str, Any]]:
+        """
+        What the request filters on: the canonical value of every valid query
+        param declared in the view, sorted by name.
+        """
+        plan = self.get_filter_plan(view)
+
+        if plan is None:
+            return []
+
+        return self.get_plan_filter_values(
+            plan, self.apply_cost_budget(plan, request, view)
+        )
+
+    def get_filter_key(self, request: Request, view: Any) -> str:
+        """
+        Fingerprint of `get_filter_values`, requests that filter the same way
+        have the same key regardless of the order, the format of the values
+        or the unknown query params.
+        """
+        return get_digest(self.get_filter_values(request, view))
+
+    def get_facets(
+        self, request: Request, queryset: QuerySet, view: Any  # type: ignore
+    ) -> dict[str, dict[str, int]]:
+        """
+        Counts of every choice of the `ChoicesField`, `BooleanField` and
+        `InChoicesField` of the view in a single query, each facet is filtered
+        by every query param except its own. See `facets.get_facets`.
+        """
+        plan = self.get_filter_plan(view)
+
+        if plan is None:
+            return {}
+
+        return facets.get_facets(
+            plan, queryset, self.apply_cost_budget(plan, request, view)
+        )
+
+    def get_range_summaries(
+        self,
+        request: Request,
+        queryset: QuerySet,  # type: ignore
+        view: Any,
+        buckets: int = 10,
+        bounds: dict[str, tuple[Any, Any]] | None = None,
+        date_interval: str | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Min, max and histogram of every `Range` field of the view, each one
+        filtered by every query param except its own. See
+        `facets.get_range_summaries`.
+        """
+        plan = self.get_filter_plan(view)
+
+        if plan is None:
+            return {}
+
+        return facets.get_range_summaries(
+            plan,
+            queryset,
+            self.apply_cost_budget(plan, request, view),
+            buckets=buckets,
+            bounds=bounds,
+            date_interval=date_interval,
+        )
+
     def get_schema_operation_parameters(self, view: Any) -> Any:
         query_fields = self.get_query_fields_for_schema(view) or []
 
@@ -68,3 +388,209 @@ class QueryParamFilter(filters.BaseFilterBackend):
                 field.get_schema_operation_parameters() for field in query_fields
             )
         )
+
+
+class CachedQueryParamFilter(QueryParamFilter):
+    """
+    Stores the primary keys that match the query params in a django cache,
+    the following requests with the same query params filter the queryset
+    by those primary keys.
+
+    Requests with invalid query params are filtered without the cache, so
+    they get the same errors as with `QueryParamFilter`.
+
+    The entries are invalidated by `post_save`, `post_delete` and
+    `m2m_changed` of the model of the queryset and of the models crossed by
+    the target fields. Updates that do not send these signals, like
+    `QuerySet.update`, are only seen once the entry expires.
+
+    Every change of a model bumps its version in the caches of the setting
+    `DRF_QUERY_FILTER_CACHE_ALIASES`, `("default",)` by default, so the
+    entries are invalidated by every process. Other caches are only bumped
+    by the processes that compiled the plans of their views, a view with a
+    cache outside of the setting should call `warm_filter_plans` at start.
+    """
+
+    query_cache_alias = "query_cache_alias"
+    query_cache_timeout = "query_cache_timeout"
+
+    default_cache_alias = "default"
+    default_cache_timeout = 60
+    # Bigger results store `cache.TOO_MANY_PKS` and are filtered without the cache
+    cache_max_length = 10_000
+    # More primary keys are filtered with `InValues`, None to use the lookup `in`
+    cache_in_values_threshold: int | None = None
+
+    def get_query_cache_alias(self, view: Any) -> str:
+        return getattr(view, self.query_cache_alias, self.default_cache_alias)
+
+    def get_query_cache_timeout(self, view: Any) -> int | None:
+        return getattr(view, self.query_cache_timeout, self.default_cache_timeout)
+
+    def get_cache_models(
+        self, plan: plans.FilterPlan, model: type[Model]
+    ) -> list[type[Model]]:
+        """The model and the models crossed by the target fields"""
+        models = {model: None}
+
+        for field in utils.iter_fields(plan.query_fields):
+            for target_field in field.target_fields:
+                if isinstance(target_field, str):
+                    models.update(
+                        dict.fromkeys(utils.get_path_models(model, target_field))
+                    )
+
+        return list(models)
+
+    def get_cache_key(
+        self,
+        request: Request,
+        queryset: QuerySet,  # type: ignore
+        view: Any,
+        filter_values: list[tuple[str, Any]],
+        models: list[type[Model]],
+        versions: list[Any],
+    ) -> str:
+        # The SQL of the queryset tells apart the querysets of the same model
+        # restricted in `get_queryset`, for example by the user.
+        sql, params = queryset.query.sql_with_params()
+
+        return cache.get_filter_cache_key(
+            view.__class__.__module__,
+            view.__class__.__qualname__,
+            queryset.model._meta.label_lower,
+            [model._meta.label_lower for model in models],
+            versions,
+            filter_values,
+            sql,
+            params,
+        )
+
+    def filter_by_pks(
+        self, queryset: QuerySet, pks: list[Any]  # type: ignore
+    ) -> QuerySet:  # type: ignore
+        if not pks:
+            return queryset.none()
+        if (
+            self.cache_in_values_threshold is not None
+            and len(pks) > self.cache_in_values_threshold
+        ):
+            return queryset.filter(InValues("pk", pks))
+        return queryset.filter(pk__in=pks)
+
+    def warm_filter_plan(self, view_class: type[Any]) -> plans.FilterPlan | None:
+        plan = super().warm_filter_plan(view_class)
+        queryset = getattr(view_class, "queryset", None)
+
+        if plan is not None and queryset is not None:
+            cache.track_models(
+                self.get_cache_models(plan, queryset.model),
+                self.get_query_cache_alias(view_class),
+            )
+
+        return plan
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet, view: Any  # type: ignore
+    ) -> QuerySet:  # type: ignore
+        if not request.query_params:
+            return queryset
+
+        plan = self.get_filter_plan(view)
+
+        if plan is None:
+            return queryset
+
+        filter_values, errors = self.validate_plan_values(
+            plan, self.apply_cost_budget(plan, request, view)
+        )
+
+        if errors:
+            # The invalid query params are not part of the key, these requests
+            # are filtered without the cache so they get their errors
+            return super().filter_queryset(request, queryset, view)
+
+        cache_alias = self.get_query_cache_alias(view)
+        query_cache = caches[cache_alias]
+        models = self.get_cache_models(plan, queryset.model)
+        cache.track_models(models, cache_alias)
+
+        try:
+            key = self.get_cache_key(
+                request,
+                queryset,
+                view,
+                filter_values,
+                models,
+                cache.get_model_versions(query_cache, models),
+            )
+        except EmptyResultSet:
+            return super().filter_queryset(request, queryset, view)
+
+        pks = query_cache.get(key)
+
+        if pks == cache.TOO_MANY_PKS:
+            return super().filter_queryset(request, queryset, view)
+
+        if pks is None:
+            filtered = super().filter_queryset(request, queryset, view)
+            # One more row than can be stored tells if the result is too big
+            pks = list(
+                filtered.order_by()
+                .values_list("pk", flat=True)
+                .distinct()[: self.cache_max_length + 1]
+            )
+
+            if len(pks) > self.cache_max_length:
+                # The next requests skip reading the primary keys again
+                query_cache.set(
+                    key, cache.TOO_MANY_PKS, self.get_query_cache_timeout(view)
+                )
+                return filtered
+
+            query_cache.set(key, pks, self.get_query_cache_timeout(view))
+
+        return self.filter_by_pks(queryset, pks)
+
+
+def get_digest(values: Any) -> str:
+    data = json.dumps(values, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def iter_filter_views(
+    urlconf: str | None = None,
+) -> Iterator[tuple[type[Any], QueryParamFilter]]:
+    """The views found in the urlconf with each of their `QueryParamFilter`"""
+    for view_class in utils.get_view_classes(urlconf):
+        for backend_class in getattr(view_class, "filter_backends", None) or []:
+            if isinstance(backend_class, type) and issubclass(
+                backend_class, QueryParamFilter
+            ):
+                yield view_class, backend_class()
+
+
+def warm_filter_plans(urlconf: str | None = None) -> int:
+    """
+    Compile the filter plans of every view found in the urlconf that uses
+    `QueryParamFilter`, returns the number of plans compiled.
+    """
+    count = 0
+
+    for view_class, backend in iter_filter_views(urlconf):
+        try:
+            plan = backend.warm_filter_plan(view_class)
+        except ValueError:
+            # Reported by the system check drf_query_filter.E001
+            log.warning(
+                "Unable to compile the filter plan of %s",
+                view_class.__qualname__,
+                exc_info=True,
+            )
+            continue
+
+        if plan is not None:
+            count += 1
+
+    log.debug("%s filter plans compiled", count)
+    return count
@@ -0,0 +1,148 @@
+import logging
+from typing import (
+    TYPE_CHECKING,
+    Any,
+)
+
+
+from django.db.models import (
+    Q,
+    QuerySet,
+)
+from rest_framework.request import Request
+
+if TYPE_CHECKING:
+    from .fields import Field
+
+__all__ = [
+    "FilterHooks",
+    "LoggingHooks",
+    "get_sql_shape",
+]
+
+log = logging.getLogger("drf_query_filter")
+
+
+def get_sql_shape(queryset: QuerySet) -> str:  # type: ignore
+    """
+    Returns the SQL of the queryset with placeholders instead of the
+    parameters, compiling it is expensive so it's up to the hooks to call it.
+    """
+    sql, _ = queryset.query.sql_with_params()
+    return sql
+
+
+class FilterHooks:
+    """
+    Receives the events of `QueryParamFilter`, set an instance in the view
+    attribute `query_hooks`. Every method does nothing by default.
+    """
+
+    def filter_started(self, request: Request, view: Any) -> None:
+        pass
+
+    def cost_estimated(
+        self,
+        request: Request,
+        view: Any,
+        costs: dict[str, float],
+        budget: float,
+        dropped: frozenset[str],
+    ) -> None:
+        """
+        Called before filtering when the view has a `query_cost_budget`.
+
+        :param costs: The cost of every query param found in the request.
+        :param dropped: Names of the query params ignored to fit the budget.
+        """
+
+    def field_evaluated(
+        self,
+        field: "Field",
+        errors: list[Any],
+        validation_time: float,
+        build_time: float,
+        query: Q | None,
+        annotate: dict[str, Any],
+    ) -> None:
+        """
+        Called for every field found in the query params.
+
+        :param validation_time: seconds spent in `perform_validation`.
+        :param build_time: seconds spent in `get_query` and `get_annotate`,
+        zero if the value is invalid.
+        """
+
+    def filter_finished(
+        self,
+        request: Request,
+        view: Any,
+        queryset: QuerySet,  # type: ignore
+        present: frozenset[str],
+        invalid: frozenset[str],
+        duration: float,
+    ) -> None:
+        """
+        :param queryset: The filtered queryset, `get_sql_shape` returns its SQL.
+        :param present: Names of the declared query params found in the request.
+        :param invalid: Names of the query params with errors.
+        :param duration: seconds spent in `filter_queryset`.
+        """
+
+
+class LoggingHooks(FilterHooks):
+    """Writes the events in the `drf_query_filter` logger with DEBUG level"""
+
+    def cost_estimated(
+        self,
+        request: Request,
+        view: Any,
+        costs: dict[str, float],
+        budget: float,
+        dropped: frozenset[str],
+    ) -> None:
+        log.debug(
+            "cost %s: cost=%.2f budget=%.2f dropped=%s",
+            view.__class__.__name__,
+            sum(costs.values()),
+            budget,
+            sorted(dropped),
+        )
+
+    def field_evaluated(
+        self,
+        field: "Field",
+        errors: list[Any],
+        validation_time: float,
+        build_time: float,
+        query: Q | None,
+        annotate: dict[str, Any],
+    ) -> None:
+        log.debug(
+            "field %s: valid=%s validation=%.6fs build=%.6fs",
+            field.query_param_name,
+            not errors,
+            validation_time,
+            build_time,
+        )
+
+    def filter_finished(
+        self,
+        request: Request,
+        view: Any,
+        queryset: QuerySet,  # type: ignore
+        present: frozenset[str],
+        invalid: frozenset[str],
+        duration: float,
+    ) -> None:
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+
+        log.debug(
+            "filter %s: present=%s invalid=%s duration=%.6fs sql=%s",
+            view.__class__.__name__,
+            sorted(present),
+            sorted(invalid),
+            duration,
+            get_sql_shape(queryset),
+        )
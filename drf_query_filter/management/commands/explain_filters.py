@@ -0,0 +1,228 @@
+import datetime
+import itertools
+import json
+import re
+from typing import Any
+
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
+from django.db.models import QuerySet
+
+
+from drf_query_filter import utils
+from drf_query_filter.fields import (
+    ChoicesField,
+    DateField,
+    DateTimeField,
+    DecimalField,
+    Field,
+    FloatField,
+    IntegerField,
+    ListField,
+    RelativeDateTimeField,
+)
+from drf_query_filter.filters import (
+    QueryParamFilter,
+    iter_filter_views,
+)
+from drf_query_filter.mixins import Range
+from drf_query_filter.plans import FilterPlan
+
+# SQLite: "SCAN tests_basicmodel", a scan with "USING INDEX" reads an index
+SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(.*)")
+SQLITE_IDS = re.compile(r"^[0-9]+ [0-9]+ [0-9]+ ")
+SQLITE_TEMP_BTREE = re.compile(r"\bUSE TEMP B-TREE FOR (.+)")
+# PostgreSQL: "Seq Scan on tests_basicmodel  (cost=0.00..35.50 rows=2550 width=4)"
+POSTGRES_SEQ_SCAN = re.compile(r"\bSeq Scan on (\w+)")
+POSTGRES_ROWS = re.compile(r"\brows=([0-9]+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN with a sample value of every query param of the views in the"
+        " urlconf and prints a JSON report of the sequential scans, temporary"
+        " B-trees and estimated rows."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--urlconf", help="Urlconf with the views, by default ROOT_URLCONF"
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to run EXPLAIN against, by default the default database",
+        )
+        parser.add_argument(
+            "--pairs",
+            action="store_true",
+            help="Also explain every pair of query params of each view",
+        )
+        parser.add_argument("--output", help="Write the report to this file")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        vendor = connections[options["database"]].vendor
+        views: dict[str, Any] = {}
+
+        for view_class, backend in iter_filter_views(options["urlconf"]):
+            label = "{}.{}".format(view_class.__module__, view_class.__qualname__)
+
+            try:
+                plan = backend.compile_filter_plan(view_class)
+            except Exception as exc:
+                # Reported by the system checks, the other views are explained
+                views[label] = {"error": repr(exc)}
+                continue
+
+            queryset = getattr(view_class, "queryset", None)
+
+            if plan is None or queryset is None:
+                continue
+
+            queryset = queryset.using(options["database"])
+            samples = self.get_samples(plan)
+
+            view_report: dict[str, Any] = {
+                "params": {
+                    name: self.explain(backend, view_class, plan, queryset, {name: value})
+                    for name, value in samples.items()
+                }
+            }
+
+            if options["pairs"]:
+                view_report["pairs"] = {
+                    "&".join(pair): self.explain(
+                        backend,
+                        view_class,
+                        plan,
+                        queryset,
+                        {name: samples[name] for name in pair},
+                    )
+                    for pair in itertools.combinations(sorted(samples), 2)
+                }
+
+            views[label] = view_report
+
+        report = json.dumps(
+            {"vendor": vendor, "views": views}, indent=2, sort_keys=True, default=str
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    def get_samples(self, plan: FilterPlan) -> dict[str, str]:
+        samples: dict[str, str] = {}
+
+        for field in utils.iter_fields(plan.query_fields):
+            if field.query_param_name not in samples:
+                samples[field.query_param_name] = self.get_sample_value(field)
+
+        return samples
+
+    def get_sample_value(self, field: Field) -> str:
+        """A value of the query param that the field accepts, its `example` if set"""
+        if field.example:
+            return field.example
+
+        if isinstance(field, Range):
+            return "{}{}{}".format(
+                self.get_single_value(field, False),
+                field.list_separator,
+                self.get_single_value(field, True),
+            )
+
+        if isinstance(field, ListField):
+            return self.get_sample_value(field.field)
+
+        return self.get_single_value(field, False)
+
+    def get_single_value(self, field: Field, high: bool) -> str:
+        """A single value of the type of the field, `high` for the end of ranges"""
+        if isinstance(field, ChoicesField):
+            return next(iter(field.choices), "")
+
+        if isinstance(field, RelativeDateTimeField):
+            return "now" if high else "-1d"
+
+        if isinstance(field, DateTimeField):
+            value = datetime.datetime.now()
+            if not high:
+                value -= datetime.timedelta(days=30)
+            if isinstance(field, DateField):
+                return value.date().strftime(field.date_format)
+            return value.strftime(field.date_format)
+
+        if isinstance(field, (IntegerField, FloatField, DecimalField)):
+            return "100" if high else "1"
+
+        return "a"
+
+    def explain(
+        self,
+        backend: QueryParamFilter,
+        view_class: type[Any],
+        plan: FilterPlan,
+        queryset: QuerySet,  # type: ignore
+        data: dict[str, str],
+    ) -> dict[str, Any]:
+        # The options of the backend read the attributes of the view class
+        queryset, errors = plan.filter(
+            queryset.all(),
+            data,
+            skip_absent=True,
+            exists=backend.get_query_exists(view_class),
+            union_fan_out=backend.get_query_union_fan_out(view_class),
+        )
+        report: dict[str, Any] = {"values": data}
+
+        if errors:
+            report["errors"] = errors
+            return report
+
+        vendor = connections[queryset.db].vendor
+        report.update(self.parse_plan(vendor, queryset.explain()))
+        return report
+
+    def parse_plan(self, vendor: str, plan: str) -> dict[str, Any]:
+        """
+        The tables read with a sequential scan, the temporary B-trees and the
+        estimated rows of the plan, SQLite doesn't estimate the rows.
+        """
+        lines = [line.rstrip() for line in plan.splitlines() if line.strip()]
+        seq_scans: list[str] = []
+        temp_btrees: list[str] = []
+        rows = None
+
+        if vendor == "sqlite":
+            # The ids of the nodes change between versions of SQLite
+            lines = [SQLITE_IDS.sub("", line) for line in lines]
+
+        for line in lines:
+            if vendor == "sqlite":
+                if match := SQLITE_SCAN.search(line):
+                    if "USING" not in match.group(2):
+                        seq_scans.append(match.group(1))
+                if match := SQLITE_TEMP_BTREE.search(line):
+                    temp_btrees.append(match.group(1))
+            elif vendor == "postgresql":
+                if match := POSTGRES_SEQ_SCAN.search(line):
+                    seq_scans.append(match.group(1))
+                if rows is None and (match := POSTGRES_ROWS.search(line)):
+                    rows = int(match.group(1))
+
+        return {
+            "seq_scans": seq_scans,
+            "temp_btrees": temp_btrees,
+            "rows": rows,
+            "plan": lines,
+        }
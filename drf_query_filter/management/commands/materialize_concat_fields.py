@@ -0,0 +1,216 @@
+import json
+from typing import Any
+
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db.models import (
+    CharField,
+    F,
+    Model,
+    Value,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Concat
+
+
+from drf_query_filter import utils
+from drf_query_filter.expressions import (
+    get_concat_parts,
+    get_materialized_field,
+)
+from drf_query_filter.fields import ConcatField
+from drf_query_filter.filters import iter_filter_views
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the GeneratedField declarations, or the functional indexes, that"
+        " materialize the ConcatFields of the views in the urlconf. ConcatField"
+        " uses a generated field with the same expression automatically."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--urlconf", help="Urlconf with the views, by default ROOT_URLCONF"
+        )
+        parser.add_argument(
+            "--index",
+            action="store_true",
+            help="Print functional indexes for Meta.indexes instead of generated fields",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        declarations: dict[str, list[str]] = {}
+        errors: list[str] = []
+        seen: set[tuple[type[Model], tuple[Any, ...]]] = set()
+
+        for view_class, backend in iter_filter_views(options["urlconf"]):
+            try:
+                plan = backend.compile_filter_plan(view_class)
+            except Exception as exc:
+                # Reported by the system checks, the other views are printed
+                errors.append(
+                    "# {}.{}: the filter plan can't be compiled: {!r}".format(
+                        view_class.__module__, view_class.__qualname__, exc
+                    )
+                )
+                continue
+
+            queryset = getattr(view_class, "queryset", None)
+
+            if plan is None or queryset is None:
+                continue
+
+            model = queryset.model
+
+            for field in utils.iter_fields(plan.query_fields):
+                if not isinstance(field, ConcatField):
+                    continue
+
+                concat = Concat(*field.target_fields)
+                parts = get_concat_parts(concat)
+
+                if (model, parts) in seen:
+                    continue
+                seen.add((model, parts))
+
+                lines = declarations.setdefault(model._meta.label, [])
+                error = self.get_error(model, field)
+
+                if error:
+                    lines.append("# {}: {}".format(field.query_param_name, error))
+                elif options["index"]:
+                    lines.append(self.get_index(model, field))
+                else:
+                    lines.append(self.get_generated_field(model, field))
+
+        for error in errors:
+            self.stdout.write(error)
+
+        if not declarations:
+            self.stdout.write("No ConcatField found")
+            return
+
+        if errors:
+            self.stdout.write("")
+
+        self.stdout.write("from django.db import models")
+        self.stdout.write("from django.db.models import Value")
+        self.stdout.write("from django.db.models.functions import Concat")
+
+        for label, lines in declarations.items():
+            self.stdout.write("\n\n# {}".format(label))
+            self.stdout.write("\n".join(lines))
+
+        if not options["index"]:
+            self.stdout.write("\n\n# Add the fields to the models and run makemigrations")
+
+    def get_error(self, model: type[Model], field: ConcatField) -> str:
+        materialized = get_materialized_field(
+            model, get_concat_parts(Concat(*field.target_fields))
+        )
+
+        if materialized is not None:
+            return "already materialized by {}".format(materialized.name)
+
+        for target_field in field.target_fields:
+            if isinstance(target_field, Value):
+                continue
+
+            if isinstance(target_field, F):
+                target_field = target_field.name
+
+            if not isinstance(target_field, str):
+                return "{!r} is not a field".format(target_field)
+
+            if LOOKUP_SEP in target_field:
+                return "{} is not a field of the model".format(target_field)
+
+            try:
+                model_field = model._meta.get_field(target_field)
+            except FieldDoesNotExist:
+                return "{} is not a field of the model".format(target_field)
+
+            if model_field.is_relation or not model_field.concrete:
+                return "{} is not a column of the model".format(target_field)
+
+        return ""
+
+    def get_name(self, model: type[Model], field: ConcatField) -> str:
+        name = field.target_field_name.strip("_") or field.query_param_name
+
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return name
+
+        return "{}_concat".format(name)
+
+    def get_expression(self, field: ConcatField) -> str:
+        parts = []
+
+        for target_field in field.target_fields:
+            if isinstance(target_field, Value):
+                parts.append("Value({})".format(json.dumps(target_field.value)))
+            elif isinstance(target_field, F):
+                parts.append(json.dumps(target_field.name))
+            else:
+                parts.append(json.dumps(target_field))
+
+        return "Concat({})".format(", ".join(parts))
+
+    def get_max_length(self, model: type[Model], field: ConcatField) -> int | None:
+        max_length = 0
+
+        for target_field in field.target_fields:
+            if isinstance(target_field, Value):
+                max_length += len(str(target_field.value))
+                continue
+
+            if isinstance(target_field, F):
+                target_field = target_field.name
+
+            model_field = model._meta.get_field(target_field)
+
+            if not isinstance(model_field, CharField) or model_field.max_length is None:
+                return None
+
+            max_length += model_field.max_length
+
+        return max_length
+
+    def get_generated_field(self, model: type[Model], field: ConcatField) -> str:
+        max_length = self.get_max_length(model, field)
+
+        if max_length is None:
+            output_field = "models.TextField()"
+        else:
+            output_field = "models.CharField(max_length={})".format(max_length)
+
+        return (
+            "{name} = models.GeneratedField(\n"
+            "    expression={expression},\n"
+            "    output_field={output_field},\n"
+            "    db_persist=True,\n"
+            "    db_index=True,\n"
+            ")"
+        ).format(
+            name=self.get_name(model, field),
+            expression=self.get_expression(field),
+            output_field=output_field,
+        )
+
+    def get_index(self, model: type[Model], field: ConcatField) -> str:
+        # Index names are limited to 30 characters
+        name = "{}_{}_idx".format(
+            model._meta.model_name[:10],  # type: ignore
+            self.get_name(model, field)[:15],
+        )
+
+        return 'models.Index({expression}, name="{name}"),'.format(
+            expression=self.get_expression(field), name=name
+        )
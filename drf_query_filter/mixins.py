@@ -11,6 +11,11 @@ class Empty:
 
 
 class Range(ABC):
+    # The slots are declared by each subclass, a mixin with slots cannot be
+    # combined with a field that also has slots.
+    __slots__ = ()
+    range_slots = ("list_separator", "equal", "allow_empty")
+
     default_list_separator = ","
 
     def __init__(
@@ -21,9 +26,11 @@ class Range(ABC):
         allow_empty: bool = True,
         **kwargs: Any,
     ):
-        self.list_separator = list_separator or self.default_list_separator
-        self.equal = equal
-        self.allow_empty = allow_empty
+        self.list_separator = (  # type: ignore
+            list_separator or self.default_list_separator
+        )
+        self.equal = equal  # type: ignore
+        self.allow_empty = allow_empty  # type: ignore
         super().__init__(*args, **kwargs)
 
     def get_target_fields(
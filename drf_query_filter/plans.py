@@ -0,0 +1,551 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import (
+    Callable,
+    Iterable,
+    Mapping,
+)
+from typing import Any
+
+
+from django.db.models import (
+    Q,
+    QuerySet,
+)
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ValidationError
+
+
+from .expressions import (
+    get_exists_query,
+    get_union_query,
+)
+from .fields import (
+    Field,
+    Node,
+)
+from .hooks import FilterHooks
+
+__all__ = [
+    "AnnotationRegistry",
+    "FilterPlan",
+    "PlanCache",
+    "combine_queries",
+]
+
+FilterResult = tuple[Q, dict[str, Any], dict[str, list[Any]]]
+
+
+def combine_queries(queries: list[Q], connector: str) -> Q:
+    """
+    Combine the given queries with a connector in a single pass.
+
+    The result is equal to chaining `&`, `|` or `^` over the queries but
+    avoids the intermediate copy that each operator does.
+    """
+    if not queries:
+        return Q(_connector=connector)
+    if len(queries) == 1:
+        return queries[0]
+
+    query = Q(_connector=connector)
+    for child_query in queries:
+        query.add(child_query, connector)
+    return query
+
+
+def rewrite_query(
+    query: Q, model: Any, exists: bool = False, union_fan_out: int | None = None
+) -> Q:
+    """Applies the optional rewrites of `FilterPlan.filter` to a query"""
+    if union_fan_out is not None:
+        query = get_union_query(query, model, union_fan_out)
+    if exists:
+        query = get_exists_query(query, model)
+    return query
+
+
+class AnnotationRegistry:
+    """
+    The annotations of the fields of a plan. Structurally identical
+    expressions declared with different names share the alias of the first
+    one, and different expressions with the same name raise a `ValueError`
+    when the plan is compiled instead of silently replacing each other.
+    """
+
+    def __init__(self) -> None:
+        self.annotations: dict[str, Any] = {}
+        self.aliases: dict[Any, str] = {}
+
+    def add(self, field: Field) -> tuple[dict[str, Any], dict[str, str]]:
+        """
+        Registers the annotations of the field, returns the annotations to
+        apply and the names of the field that were replaced by shared aliases.
+        """
+        annotate: dict[str, Any] = {}
+        renames: dict[str, str] = {}
+
+        for name, expression in field.get_annotate().items():
+            try:
+                alias = self.aliases.get(expression, name)
+            except TypeError:
+                # Unhashable expressions are not shared
+                alias = name
+
+            if alias in self.annotations:
+                if self.annotations[alias] is not expression and not is_equal(
+                    self.annotations[alias], expression
+                ):
+                    raise ValueError(
+                        "The annotation {name!r} of {field!r} conflicts with another"
+                        " annotation with the same name".format(name=name, field=field)
+                    )
+            else:
+                self.annotations[alias] = expression
+                try:
+                    self.aliases[expression] = alias
+                except TypeError:
+                    pass
+
+            annotate[alias] = self.annotations[alias]
+            if alias != name:
+                renames[name] = alias
+
+        return annotate, renames
+
+
+def is_equal(first: Any, second: Any) -> bool:
+    try:
+        return bool(first == second)
+    except TypeError:
+        return False
+
+
+def rename_query(query: Q, renames: Mapping[str, str]) -> Q:
+    """Replaces the first name of the lookups of the query found in renames"""
+    children: list[Any] = []
+
+    for child in query.children:
+        if isinstance(child, Q):
+            children.append(rename_query(child, renames))
+        elif isinstance(child, tuple):
+            name, _, rest = child[0].partition(LOOKUP_SEP)
+            if name in renames:
+                child = (LOOKUP_SEP.join(filter(None, [renames[name], rest])), child[1])
+            children.append(child)
+        else:
+            children.append(child)
+
+    return Q(*children, _connector=query.connector, _negated=query.negated)
+
+
+class NodeStep:
+    """Compiled version of a `Node`"""
+
+    __slots__ = ("connector", "childrens", "query_param_names")
+
+    def __init__(self, node: Node, registry: AnnotationRegistry | None = None) -> None:
+        registry = registry or AnnotationRegistry()
+        self.connector = node.connector
+        self.childrens = tuple(compile_node(child, registry) for child in node.childrens)
+        self.query_param_names: frozenset[str] | None = node.get_query_param_names()
+
+    def evaluate(
+        self,
+        data: Mapping[str, str],
+        present: frozenset[str] | None = None,
+        hooks: FilterHooks | None = None,
+    ) -> FilterResult:
+        queries = []
+        annotate: dict[str, Any] = {}
+        errors: dict[str, list[Any]] = {}
+
+        for child in self.childrens:
+            if is_absent(child, present):
+                continue
+
+            child_query, child_annotate, child_errors = child.evaluate(
+                data, present, hooks
+            )
+
+            if child_errors:
+                errors.update(child_errors)
+
+            annotate.update(child_annotate)
+            if child_query:
+                queries.append(child_query)
+
+        return combine_queries(queries, self.connector), annotate, errors
+
+
+class FieldStep:
+    """Compiled version of a `Field`, the methods of the field are bound once"""
+
+    __slots__ = (
+        "field",
+        "query_param_name",
+        "query_param_names",
+        "get_raw_value",
+        "perform_validation",
+        "get_field_query",
+        "annotate",
+        "renames",
+    )
+
+    def __init__(self, field: Field, registry: AnnotationRegistry | None = None) -> None:
+        self.field = field
+        self.query_param_name = field.query_param_name
+        self.query_param_names: frozenset[str] | None = field.get_query_param_names()
+        self.get_raw_value = field.get_raw_value_from_query_param
+        self.perform_validation = field.perform_validation
+        self.get_field_query = field.get_query
+        # The annotations of fields are computed once, they don't depend on the value
+        self.annotate, self.renames = (registry or AnnotationRegistry()).add(field)
+
+    def get_query(self, value: Any) -> Q:
+        query = self.get_field_query(value)
+        if self.renames:
+            return rename_query(query, self.renames)
+        return query
+
+    def get_annotate(self) -> dict[str, Any]:
+        return self.annotate
+
+    def evaluate(
+        self,
+        data: Mapping[str, str],
+        present: frozenset[str] | None = None,
+        hooks: FilterHooks | None = None,
+    ) -> FilterResult:
+        found, raw_value = self.get_raw_value(data)  # type: ignore
+
+        if not found:
+            return Q(), {}, {}
+
+        if hooks is not None:
+            return self.evaluate_with_hooks(raw_value, hooks)
+
+        errors, value = self.perform_validation(raw_value)
+
+        if errors:
+            return Q(), {}, {self.query_param_name: errors}
+
+        return self.get_query(value), self.get_annotate(), {}
+
+    def evaluate_with_hooks(self, raw_value: Any, hooks: FilterHooks) -> FilterResult:
+        start = time.perf_counter()
+        errors, value = self.perform_validation(raw_value)
+        validation_time = time.perf_counter() - start
+
+        if errors:
+            hooks.field_evaluated(self.field, errors, validation_time, 0.0, None, {})
+            return Q(), {}, {self.query_param_name: errors}
+
+        start = time.perf_counter()
+        query, annotate = self.get_query(value), self.get_annotate()
+        build_time = time.perf_counter() - start
+
+        hooks.field_evaluated(
+            self.field, errors, validation_time, build_time, query, annotate
+        )
+        return query, annotate, {}
+
+
+class OpaqueStep:
+    """
+    Step for nodes that overwrite `get_filter`, these cannot be compiled and
+    are evaluated as they are. With `filter_queryset` the top level node
+    overwrites `filter` and the plan filters the queryset with it.
+    """
+
+    __slots__ = ("node", "get_filter", "query_param_names", "filter_queryset")
+
+    def __init__(self, node: Node, filter_queryset: bool = False) -> None:
+        self.node = node
+        self.filter_queryset = filter_queryset
+        self.get_filter: Callable[[Mapping[str, str]], FilterResult] = (
+            node.get_filter  # type: ignore
+        )
+        # Unknown, the node could read any of the query params
+        self.query_param_names = None
+
+    def evaluate(
+        self,
+        data: Mapping[str, str],
+        present: frozenset[str] | None = None,
+        hooks: FilterHooks | None = None,
+    ) -> FilterResult:
+        return self.get_filter(data)
+
+
+Step = NodeStep | FieldStep | OpaqueStep
+
+
+def is_absent(step: Step, present: frozenset[str] | None) -> bool:
+    """Whether none of the query params of the step are present"""
+    return (
+        present is not None
+        and step.query_param_names is not None
+        and step.query_param_names.isdisjoint(present)
+    )
+
+
+def compile_node(
+    node: Node, registry: AnnotationRegistry | None = None, top_level: bool = False
+) -> Step:
+    """
+    :param top_level: The node is one of the query fields of the view, the
+    backend calls the `filter` of these, so the ones that overwrite it are
+    not compiled.
+    """
+    if top_level and type(node).filter is not Node.filter:
+        return OpaqueStep(node, filter_queryset=True)
+
+    get_filter = type(node).get_filter
+
+    if isinstance(node, Field):
+        if get_filter is Field.get_filter:
+            return FieldStep(node, registry)
+    elif get_filter is Node.get_filter:
+        return NodeStep(node, registry)
+
+    return OpaqueStep(node)
+
+
+class FilterPlan:
+    """
+    A list of query fields compiled into steps that can be executed directly
+    against the query params of a request.
+    """
+
+    __slots__ = (
+        "query_fields",
+        "steps",
+        "opaque_steps",
+        "query_param_index",
+        "query_param_names",
+        "annotations",
+    )
+
+    def __init__(self, query_fields: Iterable[Node]) -> None:
+        self.query_fields = tuple(query_fields)
+        registry = AnnotationRegistry()
+        self.steps = tuple(
+            compile_node(node, registry, top_level=True) for node in self.query_fields
+        )
+        # Every alias used by the fields, each name with a single expression
+        self.annotations = registry.annotations
+
+        # Index of the top level steps that read each query param, steps with
+        # unknown query params are always executed.
+        self.opaque_steps: tuple[int, ...] = tuple(
+            index
+            for index, step in enumerate(self.steps)
+            if step.query_param_names is None
+        )
+        query_param_index: dict[str, list[int]] = {}
+        for index, step in enumerate(self.steps):
+            for query_param_name in step.query_param_names or ():
+                query_param_index.setdefault(query_param_name, []).append(index)
+        self.query_param_index = {
+            query_param_name: tuple(indexes)
+            for query_param_name, indexes in query_param_index.items()
+        }
+        self.query_param_names = frozenset(self.query_param_index)
+
+    def __repr__(self) -> str:
+        return "<{class_name} {query_fields!r}>".format(
+            class_name=self.__class__.__name__,
+            query_fields=list(self.query_fields),
+        )
+
+    def get_steps(self, present: frozenset[str] | None = None) -> Iterable[Step]:
+        """
+        Returns the top level steps to execute, when the names of the present
+        query params are given only the steps that read any of them are
+        returned, in the same order they were declared.
+        """
+        if present is None:
+            return self.steps
+
+        indexes = set(self.opaque_steps)
+        for query_param_name in present:
+            indexes.update(self.query_param_index.get(query_param_name, ()))
+
+        return [self.steps[index] for index in sorted(indexes)]
+
+    def get_filter(
+        self,
+        data: Mapping[str, str],
+        skip_absent: bool = False,
+        hooks: FilterHooks | None = None,
+    ) -> list[FilterResult]:
+        present = frozenset(data) if skip_absent else None
+        return [
+            step.evaluate(data, present, hooks) for step in self.get_steps(present)
+        ]
+
+    def filter(
+        self,
+        queryset: QuerySet,  # type: ignore
+        data: Mapping[str, str],
+        raise_exceptions: bool = False,
+        skip_absent: bool = False,
+        single_clone: bool = False,
+        hooks: FilterHooks | None = None,
+        exists: bool = False,
+        union_fan_out: int | None = None,
+    ) -> tuple[QuerySet, dict[str, Any]]:  # type: ignore
+        """
+        :param skip_absent: Only evaluate the nodes that read any of the query
+        params found in data, the cost of the request then depends on the
+        number of query params sent instead of the number of fields declared.
+        :param single_clone: Apply the annotations and queries of all the top
+        level nodes with a single `alias` and a single `filter`.
+        :param hooks: Receives the timing of every field found in data.
+        :param exists: Lookups that cross multi-valued relations are checked
+        with `EXISTS` subqueries instead of joins, see `get_exists_query`.
+        :param union_fan_out: ORs of at least this many indexable lookups are
+        checked with a `UNION` of a subquery per lookup, see `get_union_query`.
+        """
+        present = frozenset(data) if skip_absent else None
+
+        if single_clone:
+            return self.filter_single_clone(
+                queryset,
+                data,
+                raise_exceptions=raise_exceptions,
+                present=present,
+                hooks=hooks,
+                exists=exists,
+                union_fan_out=union_fan_out,
+            )
+
+        all_errors: dict[str, Any] = {}
+        aliased: dict[str, Any] = {}
+
+        for step in self.get_steps(present):
+            if isinstance(step, OpaqueStep) and step.filter_queryset:
+                queryset, errors = step.node.filter(
+                    queryset, data, raise_exceptions  # type: ignore
+                )
+                all_errors.update(errors)
+                continue
+
+            query, annotate, errors = step.evaluate(data, present, hooks)
+
+            if errors:
+                if raise_exceptions:
+                    raise ValidationError(errors)
+                all_errors.update(errors)
+
+            # The aliases are shared, each one is only added once
+            annotate = {
+                name: value
+                for name, value in annotate.items()
+                if aliased.get(name) is not value
+            }
+            if annotate:
+                aliased.update(annotate)
+                queryset = queryset.alias(**annotate)
+            if query:
+                query = rewrite_query(query, queryset.model, exists, union_fan_out)
+                queryset = queryset.filter(query)
+
+        return queryset, all_errors
+
+    def filter_single_clone(
+        self,
+        queryset: QuerySet,  # type: ignore
+        data: Mapping[str, str],
+        raise_exceptions: bool = False,
+        present: frozenset[str] | None = None,
+        hooks: FilterHooks | None = None,
+        exists: bool = False,
+        union_fan_out: int | None = None,
+    ) -> tuple[QuerySet, dict[str, Any]]:  # type: ignore
+        """
+        The queries of the top level nodes are joined with AND in the same
+        `filter` call, conditions over multi-valued relations then have to
+        be satisfied by the same related object instead of by any of them.
+        The errors of every node are reported together. The nodes that
+        overwrite `filter` filter the queryset afterwards, each on its own.
+        """
+        queries = []
+        all_annotate: dict[str, Any] = {}
+        all_errors: dict[str, Any] = {}
+        filter_steps = []
+
+        for step in self.get_steps(present):
+            if isinstance(step, OpaqueStep) and step.filter_queryset:
+                filter_steps.append(step)
+                continue
+
+            query, annotate, errors = step.evaluate(data, present, hooks)
+
+            if errors:
+                all_errors.update(errors)
+            all_annotate.update(annotate)
+            if query:
+                queries.append(query)
+
+        if all_errors and raise_exceptions:
+            raise ValidationError(all_errors)
+
+        if all_annotate:
+            queryset = queryset.alias(**all_annotate)
+        if queries:
+            query = combine_queries(queries, Q.AND)
+            query = rewrite_query(query, queryset.model, exists, union_fan_out)
+            queryset = queryset.filter(query)
+
+        for step in filter_steps:
+            queryset, errors = step.node.filter(
+                queryset, data, raise_exceptions  # type: ignore
+            )
+            all_errors.update(errors)
+
+        return queryset, all_errors
+
+
+class PlanCache:
+    """
+    Thread safe cache of `FilterPlan` keyed by the list of query fields, the
+    least recently used plan is evicted once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._plans: OrderedDict[tuple[Node, ...], FilterPlan] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __contains__(self, query_fields: object) -> bool:
+        if not isinstance(query_fields, Iterable):
+            return False
+        return tuple(query_fields) in self._plans
+
+    def get(self, query_fields: Iterable[Node]) -> FilterPlan:
+        key = tuple(query_fields)
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        plan = FilterPlan(key)
+
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
@@ -0,0 +1,78 @@
+from collections.abc import Iterable
+from typing import Any
+
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import (
+    ManyToManyRel,
+    Model,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.urls import (
+    URLPattern,
+    URLResolver,
+    get_resolver,
+)
+
+
+from .fields import (
+    Field,
+    Node,
+)
+
+
+def iter_view_classes(url_patterns: Iterable[Any]) -> Iterable[type[Any]]:
+    for pattern in url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_classes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            # rest_framework sets `cls` while django sets `view_class`
+            view_class = getattr(pattern.callback, "cls", None) or getattr(
+                pattern.callback, "view_class", None
+            )
+            if view_class is not None:
+                yield view_class
+
+
+def get_view_classes(urlconf: str | None = None) -> list[type[Any]]:
+    """Returns the class based views found in the urlconf without duplicates"""
+    resolver = get_resolver(urlconf)
+    return list(dict.fromkeys(iter_view_classes(resolver.url_patterns)))
+
+
+def iter_fields(nodes: Iterable[Node]) -> Iterable[Field]:
+    """Returns the fields found in the nodes and their childrens"""
+    for node in nodes:
+        if isinstance(node, Field):
+            yield node
+        else:
+            yield from iter_fields(node.childrens)
+
+
+def get_path_models(model: type[Model], path: str) -> list[type[Model]]:
+    """
+    Returns the models crossed by the lookup path starting with the given
+    model, including the intermediate models of many to many relations.
+    Transforms, lookups and annotations at the end of the path are ignored.
+    """
+    models = [model]
+
+    for name in path.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            break
+
+        if not field.is_relation or field.related_model is None:
+            break
+
+        if field.many_to_many:
+            rel = field if isinstance(field, ManyToManyRel) else field.remote_field
+            through = getattr(rel, "through", None)
+            if through is not None and not isinstance(through, str):
+                models.append(through)
+
+        model = field.related_model
+        models.append(model)
+
+    return models
@@ -0,0 +1,142 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+)
+
+
+from django.db.models import (
+    Count,
+    Max,
+    QuerySet,
+)
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+from .fields import get_canonical_value
+from .filters import (
+    QueryParamFilter,
+    get_digest,
+)
+
+if TYPE_CHECKING:
+    from rest_framework.generics import GenericAPIView
+
+    ViewBase = GenericAPIView[Any]
+else:
+    ViewBase = object
+
+__all__ = [
+    "FilterCacheHeadersMixin",
+    "FilterFreshnessMixin",
+]
+
+
+class FilterCacheHeadersMixin(ViewBase):
+    """
+    Adds the `Cache-Control` of `filter_cache_control` to the successful GET
+    responses.
+
+    No ETag is added since it could not tell when the data changes,
+    `FilterFreshnessMixin` adds one with a freshness token of the data.
+    """
+
+    # Arguments of `django.utils.cache.patch_cache_control`
+    filter_cache_control: dict[str, Any] | None = None
+
+    def finalize_response(
+        self, request: Request, response: Response, *args: Any, **kwargs: Any
+    ) -> Response:
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if (
+            self.filter_cache_control
+            and request.method in ("GET", "HEAD")
+            and response.status_code
+            in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED)
+        ):
+            patch_cache_control(response, **self.filter_cache_control)
+
+        return response
+
+
+class FilterFreshnessMixin(FilterCacheHeadersMixin):
+    """
+    Answers `If-None-Match` in `list` with 304 without serializing the page.
+
+    The weak ETag is made of the filter key of `QueryParamFilter`, the other
+    query params, like the page, and a freshness token of the filtered
+    queryset, `MAX(freshness_field)` and `COUNT(*)` computed in a single
+    aggregate, so it changes when a row is added, removed or updated. The
+    field has to change in every update, like `auto_now` fields.
+    """
+
+    freshness_field = "updated_at"
+
+    def get_query_param_filter(self) -> QueryParamFilter | None:
+        for backend_class in getattr(self, "filter_backends", None) or []:
+            if isinstance(backend_class, type) and issubclass(
+                backend_class, QueryParamFilter
+            ):
+                return backend_class()
+        return None
+
+    def get_filter_etag_values(self, request: Request) -> list[Any] | None:
+        backend = self.get_query_param_filter()
+
+        if backend is None:
+            return None
+
+        plan = backend.get_filter_plan(self)
+        known = plan.query_param_names if plan is not None else frozenset()
+        other_query_params = sorted(
+            (name, request.query_params.getlist(name))
+            for name in request.query_params.keys()
+            if name not in known
+        )
+
+        return [backend.get_filter_values(request, self), other_query_params]
+
+    def get_freshness_token(self, queryset: QuerySet) -> list[Any]:  # type: ignore
+        result = queryset.aggregate(
+            freshness_max=Max(self.freshness_field), freshness_count=Count("*")
+        )
+        return [
+            get_canonical_value(result["freshness_max"]),
+            result["freshness_count"],
+        ]
+
+    def is_not_modified(self, request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("If-None-Match")
+
+        if not if_none_match:
+            return False
+
+        etags = parse_etags(if_none_match)
+        # Weak comparison, as required for If-None-Match
+        return "*" in etags or etag.removeprefix("W/") in {
+            value.removeprefix("W/") for value in etags
+        }
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        values = self.get_filter_etag_values(request) or []
+        values.append(self.get_freshness_token(queryset))
+        etag = 'W/"{}"'.format(get_digest(values))
+
+        if self.is_not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+
+        response["ETag"] = etag
+        return response
@@ -38,6 +38,7 @@ def pytest_configure(config: Any) -> None:
             "django.contrib.sessions",
             "django.contrib.contenttypes",
             "django.contrib.auth",
+            "drf_query_filter",
             "tests",
         ],
     )
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat
 
 
 class BasicModel(models.Model):
@@ -7,3 +9,27 @@ class BasicModel(models.Model):
     date = models.DateField()  # type: ignore
     integer = models.IntegerField()  # type: ignore
     boolean = models.BooleanField()  # type: ignore
+
+
+class ProxyBasicModel(BasicModel):
+    class Meta:
+        proxy = True
+
+
+class RelatedModel(models.Model):
+    basic = models.ForeignKey(  # type: ignore
+        BasicModel, related_name="related", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=255)  # type: ignore
+    number = models.IntegerField()  # type: ignore
+
+
+class PersonModel(models.Model):
+    first_name = models.CharField(max_length=100)  # type: ignore
+    last_name = models.CharField(max_length=100)  # type: ignore
+    full_name = models.GeneratedField(
+        expression=Concat("first_name", Value(" "), "last_name"),
+        output_field=models.CharField(max_length=201),
+        db_persist=True,
+        db_index=True,
+    )
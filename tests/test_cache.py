@@ -0,0 +1,177 @@
+import datetime
+from typing import Any
+
+
+from django.contrib.auth.models import (
+    Group,
+    User,
+)
+from django.core.cache import cache
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+from drf_query_filter import fields
+from drf_query_filter.cache import tracked_models
+from drf_query_filter.filters import CachedQueryParamFilter
+from drf_query_filter.utils import get_path_models
+
+
+from .models import (
+    BasicModel,
+    ProxyBasicModel,
+)
+from .test_filters import ModelViewSet
+
+
+class CachedViewSet(ModelViewSet):
+    filter_backends = [CachedQueryParamFilter]
+
+
+def create_row(integer: int, string_uno: str = "uno") -> BasicModel:
+    return BasicModel.objects.create(
+        string_uno=string_uno,
+        string_dos="dos",
+        date=datetime.date(2020, 1, 1),
+        integer=integer,
+        boolean=True,
+    )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CachedQueryParamFilterTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.backend = CachedQueryParamFilter()
+        self.view = CachedViewSet()
+        for integer in [10, 20, 30]:
+            create_row(integer)
+
+    def filter(self, query_params: dict[str, str]) -> Any:
+        request = Request(APIRequestFactory().get("/", query_params))
+        queryset = BasicModel.objects.all().order_by("id")
+        return self.backend.filter_queryset(request, queryset, self.view)
+
+    def get_integers(self, query_params: dict[str, str]) -> list[int]:
+        return list(self.filter(query_params).values_list("integer", flat=True))
+
+    def test_hit(self) -> None:
+        with self.assertNumQueries(1):
+            self.filter({"integer": "20"})
+
+        with self.assertNumQueries(0):
+            queryset = self.filter({"unknown": "1", "integer": "20"})
+
+        self.assertEqual(list(queryset.values_list("integer", flat=True)), [20])
+        self.assertEqual(self.get_integers({"integer": "10"}), [10])
+        self.assertEqual(self.get_integers({"search_exact": "nothing"}), [])
+
+    def test_invalid_query_params(self) -> None:
+        self.assertEqual(self.get_integers({"integer": "10"}), [10])
+
+        # Never served from the entry of the valid query params
+        with self.assertRaises(ValidationError):
+            self.filter({"integer": "10", "pk": "abc"})
+
+        self.view.query_raise_exceptions = False
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_integers({"integer": "10", "pk": "abc"}), [10])
+
+    def test_ordered_lists(self) -> None:
+        self.view.query_params = [
+            fields.ListField(fields.IntegerField("range", "integer__range")),
+            fields.InIntegerField("integers", "integer"),
+        ]
+
+        # The order of the values of `range` changes the result
+        self.assertEqual(self.get_integers({"range": "30,10"}), [])
+        self.assertEqual(self.get_integers({"range": "10,30"}), [10, 20, 30])
+
+        # But not the one of `in`
+        self.assertEqual(self.get_integers({"integers": "20,10"}), [10, 20])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_integers({"integers": "10,20,10"}), [10, 20])
+
+    def test_invalidation(self) -> None:
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30])
+
+        row = create_row(40)
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30, 40])
+
+        row.string_uno = "other"
+        row.save()
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30])
+
+        row.delete()
+        self.assertEqual(self.get_integers({"search_exact": "other"}), [])
+
+    def test_untracked_models(self) -> None:
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30])
+
+        # A process that didn't compile the plan, like a worker, still
+        # invalidates the entries of the default cache
+        tracked = dict(tracked_models)
+        tracked_models.clear()
+        try:
+            create_row(40)
+        finally:
+            tracked_models.update(tracked)
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30, 40])
+
+        # The changes of proxy models invalidate their concrete model
+        row = ProxyBasicModel.objects.get(integer=40)
+        row.string_uno = "other"
+        row.save()
+        self.assertEqual(self.get_integers({"search_exact": "uno"}), [10, 20, 30])
+
+    def test_restricted_queryset(self) -> None:
+        request = Request(APIRequestFactory().get("/", {"search_exact": "uno"}))
+
+        queryset = BasicModel.objects.filter(integer__lt=25)
+        filtered = self.backend.filter_queryset(request, queryset, self.view)
+        self.assertEqual(filtered.count(), 2)
+
+        queryset = BasicModel.objects.filter(integer__gt=25)
+        filtered = self.backend.filter_queryset(request, queryset, self.view)
+        self.assertEqual(filtered.count(), 1)
+
+    def test_cache_max_length(self) -> None:
+        self.backend.cache_max_length = 1
+        with self.assertNumQueries(1) as context:
+            queryset = self.filter({"search_exact": "uno"})
+        # Only one more primary key than can be stored is read
+        self.assertIn("LIMIT 2", context.captured_queries[0]["sql"])
+        self.assertEqual(queryset.count(), 3)
+        # The next requests know the result is too big without reading it again
+        with self.assertNumQueries(0):
+            queryset = self.filter({"search_exact": "uno"})
+        self.assertEqual(queryset.count(), 3)
+
+    def test_cache_in_values_threshold(self) -> None:
+        self.filter({"search_exact": "uno"})
+
+        # The primary keys use the lookup `in` unless a threshold is given
+        queryset = self.filter({"search_exact": "uno"})
+        self.assertNotIn("json_each", str(queryset.query))
+
+        self.backend.cache_in_values_threshold = 2
+        queryset = self.filter({"search_exact": "uno"})
+        self.assertIn("json_each", str(queryset.query))
+        self.assertEqual(queryset.count(), 3)
+
+
+class PathModelsTests(TestCase):
+    def test_get_path_models(self) -> None:
+        self.assertEqual(get_path_models(BasicModel, "integer__gte"), [BasicModel])
+        self.assertEqual(get_path_models(BasicModel, "_annotation"), [BasicModel])
+        self.assertEqual(
+            get_path_models(User, "groups__name__icontains"),
+            [User, User.groups.through, Group],
+        )
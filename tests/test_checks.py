@@ -0,0 +1,173 @@
+from typing import Any
+
+
+from django.contrib.auth.models import User
+from django.core.checks.registry import registry
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import (
+    include,
+    path,
+)
+from rest_framework.routers import SimpleRouter
+
+
+from drf_query_filter import (
+    cache,
+    fields,
+)
+from drf_query_filter.checks import (
+    check_filter_indexes,
+    get_indexed_columns,
+    get_target_warnings,
+)
+from drf_query_filter.filters import (
+    CachedQueryParamFilter,
+    warm_filter_plans,
+)
+
+
+from .models import (
+    BasicModel,
+    PersonModel,
+    RelatedModel,
+)
+from .test_filters import ModelViewSet
+
+
+class ChecksViewSet(ModelViewSet):
+    query_params = [
+        fields.IntegerField("id"),
+        fields.StringField("name", "related__name"),
+        fields.StringField("search", "string_uno__icontains"),
+        fields.ConcatField("full_name", ["string_uno", "string_dos"]),
+    ]
+
+
+router = SimpleRouter()
+router.register("checks", ChecksViewSet)
+
+urlpatterns = [path("api/", include(router.urls))]
+
+
+class ConflictViewSet(ModelViewSet):
+    query_params = [
+        fields.ConcatField("a", ["string_uno", "string_dos"], target_field_name="full"),
+        fields.ConcatField("b", ["string_dos", "string_uno"], target_field_name="full"),
+    ]
+
+
+conflict_router = SimpleRouter()
+conflict_router.register("conflict", ConflictViewSet)
+
+
+class ConflictUrls:
+    urlpatterns = [path("api/", include(conflict_router.urls))]
+
+
+class BrokenField(fields.Field):
+    __slots__ = ()
+
+    def get_annotate(self) -> dict[str, Any]:
+        raise RuntimeError("broken")
+
+
+class CachedViewSet(ModelViewSet):
+    queryset = PersonModel.objects.all()  # type: ignore
+    filter_backends = [CachedQueryParamFilter]
+    query_params = [fields.StringField("first_name")]
+
+
+class BrokenViewSet(ModelViewSet):
+    query_params = [BrokenField("broken")]
+
+
+other_router = SimpleRouter()
+other_router.register("cached", CachedViewSet, basename="cached")
+other_router.register("broken", BrokenViewSet, basename="broken")
+
+
+class OtherUrls:
+    urlpatterns = [path("api/", include(other_router.urls))]
+
+
+def get_codes(model: type, path: str) -> list[str]:
+    return [code for code, _, _ in get_target_warnings(model, path)]
+
+
+class IndexesTests(TestCase):
+    def test_indexed_columns(self) -> None:
+        self.assertEqual(get_indexed_columns(RelatedModel), {"id", "basic"})
+        self.assertIn("username", get_indexed_columns(User))
+        self.assertIn("full_name", get_indexed_columns(PersonModel))
+
+    def test_target_warnings(self) -> None:
+        self.assertEqual(get_codes(BasicModel, "pk"), [])
+        self.assertEqual(get_codes(BasicModel, "id__in"), [])
+        self.assertEqual(get_codes(BasicModel, "related"), [])
+        self.assertEqual(get_codes(BasicModel, "related__basic__id"), [])
+        self.assertEqual(get_codes(User, "username__startswith"), [])
+        self.assertEqual(get_codes(User, "groups__name"), [])
+
+        self.assertEqual(get_codes(BasicModel, "integer__gte"), ["W001"])
+        self.assertEqual(get_codes(BasicModel, "related__name"), ["W001"])
+        self.assertEqual(get_codes(User, "username__icontains"), ["W002"])
+        self.assertEqual(get_codes(User, "date_joined__date"), ["W003"])
+        self.assertEqual(get_codes(User, "date_joined__date__gte"), ["W003"])
+        self.assertEqual(get_codes(BasicModel, "unknown"), ["W004"])
+        self.assertEqual(get_codes(BasicModel, "integer__unknown"), ["W004"])
+
+    def test_annotations(self) -> None:
+        self.assertEqual(get_target_warnings(BasicModel, "_total", ["_total"]), [])
+
+
+@override_settings(ROOT_URLCONF="tests.test_checks")
+class CheckFilterIndexesTests(TestCase):
+    def test_check(self) -> None:
+        messages = check_filter_indexes()
+        self.assertEqual(
+            [(message.id, message.obj) for message in messages],
+            [
+                ("drf_query_filter.W001", ChecksViewSet),
+                ("drf_query_filter.W002", ChecksViewSet),
+                ("drf_query_filter.W005", ChecksViewSet),
+            ],
+        )
+        self.assertIn("query param name", messages[0].msg)
+        self.assertIn("tests.RelatedModel.name", messages[0].msg)
+        self.assertIn("materialize_concat_fields", messages[2].hint)
+
+    @override_settings(ROOT_URLCONF=ConflictUrls)
+    def test_annotation_conflict(self) -> None:
+        messages = check_filter_indexes()
+        self.assertEqual(
+            [(message.id, message.obj) for message in messages],
+            [("drf_query_filter.E001", ConflictViewSet)],
+        )
+        self.assertIn("'full'", messages[0].msg)
+
+        with self.assertLogs("drf_query_filter", level="WARNING"):
+            self.assertEqual(warm_filter_plans(), 0)
+
+    @override_settings(ROOT_URLCONF=OtherUrls)
+    def test_without_side_effects(self) -> None:
+        messages = check_filter_indexes()
+        self.assertEqual(
+            [(message.id, message.obj) for message in messages],
+            [
+                ("drf_query_filter.W001", CachedViewSet),
+                ("drf_query_filter.E002", BrokenViewSet),
+            ],
+        )
+        self.assertIn("RuntimeError('broken')", messages[1].msg)
+        # The plan is not cached and the models of the cache are not tracked
+        self.assertNotIn(PersonModel, cache.get_tracked_models())
+        self.assertNotIn(CachedViewSet.query_params, CachedQueryParamFilter.plan_cache)
+
+    def test_registered(self) -> None:
+        self.assertIn(
+            check_filter_indexes,
+            [check for check in registry.registered_checks if "urls" in check.tags],
+        )
@@ -0,0 +1,175 @@
+import datetime
+import json
+from io import StringIO
+
+
+from django.core.management import call_command
+from django.db.models import (
+    Model,
+    Value,
+)
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+
+from drf_query_filter import (
+    cache,
+    fields,
+)
+from drf_query_filter.filters import CachedQueryParamFilter
+from drf_query_filter.management.commands import explain_filters
+
+
+from .models import (
+    BasicModel,
+    PersonModel,
+)
+from .test_checks import (
+    CachedViewSet,
+    ConflictUrls,
+    OtherUrls,
+)
+
+
+@override_settings(ROOT_URLCONF="tests.test_filters")
+class MaterializeConcatFieldsTests(TestCase):
+    def call(self, *args: str) -> str:
+        stdout = StringIO()
+        call_command("materialize_concat_fields", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_generated_field(self) -> None:
+        output = self.call()
+        self.assertIn("# tests.BasicModel", output)
+        self.assertIn(
+            "string_concat = models.GeneratedField(\n"
+            '    expression=Concat("string_uno", Value(" "), "string_dos"),\n'
+            "    output_field=models.CharField(max_length=511),\n",
+            output,
+        )
+
+    def test_index(self) -> None:
+        output = self.call("--index")
+        self.assertIn(
+            'models.Index(Concat("string_uno", Value(" "), "string_dos"),'
+            ' name="basicmodel_string_concat_idx"),',
+            output,
+        )
+
+    @override_settings(ROOT_URLCONF=ConflictUrls)
+    def test_plan_errors(self) -> None:
+        output = self.call()
+        self.assertIn(
+            "# tests.test_checks.ConflictViewSet: the filter plan can't be compiled:"
+            " ValueError(",
+            output,
+        )
+        self.assertIn("No ConcatField found", output)
+
+
+class MaterializedConcatTests(TestCase):
+    def filter(self, model: type[Model], field: fields.ConcatField, value: str) -> str:
+        queryset = model._default_manager.alias(**field.get_annotate()).filter(
+            field.get_query(value)
+        )
+        list(queryset)
+        return str(queryset.query)
+
+    def test_generated_field(self) -> None:
+        PersonModel.objects.create(first_name="Roger", last_name="Simon")
+        field = fields.ConcatField(
+            "name", ["first_name", Value(" "), "last_name"], lookup="startswith"
+        )
+
+        sql = self.filter(PersonModel, field, "Roger S")
+        self.assertIn('"tests_personmodel"."full_name" LIKE', sql)
+        self.assertNotIn("COALESCE", sql)
+        self.assertEqual(
+            PersonModel.objects.alias(**field.get_annotate())
+            .filter(field.get_query("Roger S"))
+            .count(),
+            1,
+        )
+
+    def test_without_generated_field(self) -> None:
+        field = fields.ConcatField("name", ["first_name", "last_name"])
+        self.assertIn("COALESCE", self.filter(PersonModel, field, "x"))
+
+        field = fields.ConcatField("name", ["string_uno", Value(" "), "string_dos"])
+        self.assertIn("COALESCE", self.filter(BasicModel, field, "x"))
+
+
+@override_settings(ROOT_URLCONF="tests.test_checks")
+class ExplainFiltersTests(TestCase):
+    def test_report(self) -> None:
+        stdout = StringIO()
+        call_command("explain_filters", "--pairs", stdout=stdout)
+        report = json.loads(stdout.getvalue())
+
+        self.assertEqual(report["vendor"], "sqlite")
+        view = report["views"]["tests.test_checks.ChecksViewSet"]
+        self.assertEqual(set(view["params"]), {"id", "name", "search", "full_name"})
+        self.assertEqual(len(view["pairs"]), 6)
+
+        self.assertEqual(view["params"]["id"]["values"], {"id": "1"})
+        self.assertEqual(view["params"]["id"]["seq_scans"], [])
+        self.assertEqual(view["params"]["search"]["seq_scans"], ["tests_basicmodel"])
+        self.assertEqual(view["params"]["name"]["seq_scans"], ["tests_relatedmodel"])
+        self.assertEqual(view["params"]["name"]["temp_btrees"], ["ORDER BY"])
+        self.assertIsNone(view["params"]["name"]["rows"])
+        self.assertEqual(view["pairs"]["id&search"]["seq_scans"], [])
+
+    @override_settings(ROOT_URLCONF=OtherUrls)
+    def test_without_side_effects(self) -> None:
+        stdout = StringIO()
+        call_command("explain_filters", stdout=stdout)
+        views = json.loads(stdout.getvalue())["views"]
+
+        self.assertEqual(
+            views["tests.test_checks.BrokenViewSet"], {"error": "RuntimeError('broken')"}
+        )
+        self.assertIn("first_name", views["tests.test_checks.CachedViewSet"]["params"])
+        # The plan is not cached and the models of the cache are not tracked
+        self.assertNotIn(PersonModel, cache.get_tracked_models())
+        self.assertNotIn(CachedViewSet.query_params, CachedQueryParamFilter.plan_cache)
+
+    def test_sample_values(self) -> None:
+        command = explain_filters.Command()
+        today = datetime.date.today()
+        start = today - datetime.timedelta(days=30)
+
+        self.assertEqual(command.get_sample_value(fields.IntegerField("a")), "1")
+        self.assertEqual(
+            command.get_sample_value(fields.IntegerField("a", example="7")), "7"
+        )
+        self.assertEqual(
+            command.get_sample_value(fields.RangeIntegerField("a", list_separator=":")),
+            "1:100",
+        )
+        self.assertEqual(
+            command.get_sample_value(fields.RangeDateField("a")),
+            "{},{}".format(start.isoformat(), today.isoformat()),
+        )
+        self.assertEqual(
+            command.get_sample_value(fields.RangeRelativeDateTimeField("a")), "-1d,now"
+        )
+        self.assertEqual(
+            command.get_sample_value(fields.InChoicesField("a", choices=["x", "y"])),
+            "x",
+        )
+        self.assertEqual(command.get_sample_value(fields.BooleanField("a")), "true")
+        self.assertEqual(command.get_sample_value(fields.StringField("a")), "a")
+
+    def test_postgresql_plan(self) -> None:
+        plan = (
+            "Sort  (cost=8.17..8.18 rows=3 width=40)\n"
+            "  Sort Key: id\n"
+            "  ->  Seq Scan on tests_basicmodel  (cost=0.00..8.15 rows=3 width=40)\n"
+            "        Filter: (integer = 1)"
+        )
+        report = explain_filters.Command().parse_plan("postgresql", plan)
+        self.assertEqual(report["seq_scans"], ["tests_basicmodel"])
+        self.assertEqual(report["rows"], 3)
+        self.assertEqual(len(report["plan"]), 4)
@@ -0,0 +1,183 @@
+from typing import Any
+
+
+from django.db.models import Q
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import (
+    include,
+    path,
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.routers import SimpleRouter
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+)
+
+
+from drf_query_filter import fields
+from drf_query_filter.costs import CostModel
+from drf_query_filter.filters import QueryParamFilter
+from drf_query_filter.hooks import FilterHooks
+from drf_query_filter.plans import FilterPlan
+
+
+from .models import BasicModel
+from .test_filters import ModelViewSet
+
+
+class CostHooks(FilterHooks):
+    def __init__(self) -> None:
+        self.events: list[tuple[Any, ...]] = []
+
+    def cost_estimated(
+        self,
+        request: Request,
+        view: Any,
+        costs: dict[str, float],
+        budget: float,
+        dropped: frozenset[str],
+    ) -> None:
+        self.events.append((costs, budget, dropped))
+
+
+class CostsViewSet(ModelViewSet):
+    query_params = [
+        fields.IntegerField("integer"),
+        fields.InIntegerField("ids", "id", max_length=None),
+        fields.StringField("search", "string_uno__icontains"),
+        fields.BooleanField("boolean"),
+    ]
+    query_cost_budget = 6
+
+
+class DowngradeViewSet(CostsViewSet):
+    query_cost_downgrade = True
+    query_hooks = CostHooks()
+
+
+router = SimpleRouter()
+router.register("costs", CostsViewSet, basename="costs")
+router.register("downgrade", DowngradeViewSet, basename="downgrade")
+
+urlpatterns = [path("api/", include(router.urls))]
+
+
+class CostModelTests(TestCase):
+    def test_field_cost(self) -> None:
+        model = CostModel()
+        self.assertEqual(model.get_field_cost(fields.IntegerField("a"), "1"), 1.01)
+        self.assertEqual(
+            model.get_field_cost(fields.StringField("a", ["b__icontains", "c"]), "x"),
+            10.01,
+        )
+        self.assertEqual(
+            model.get_field_cost(fields.InIntegerField("a"), ",".join(["1"] * 100)),
+            2,
+        )
+        self.assertEqual(
+            model.get_field_cost(fields.ConcatField("a", ["b", "c"]), "x"), 6.01
+        )
+
+    def test_custom_weights(self) -> None:
+        model = CostModel(
+            field_weights={fields.IntegerField: 3},
+            lookup_weights={"gte": 2},
+            list_value_weight=0,
+        )
+        self.assertEqual(model.get_field_cost(fields.IntegerField("a", "b__gte"), "1"), 6)
+        # Subclasses use the weight of their closest class
+        self.assertEqual(model.get_field_cost(fields.RangeIntegerField("a"), "1,2"), 3)
+
+    def test_costs(self) -> None:
+        plan = FilterPlan(
+            [fields.IntegerField("a") & fields.IntegerField("b"), fields.StringField("c")]
+        )
+        self.assertEqual(
+            CostModel(list_value_weight=0).get_costs(plan, {"a": "1", "c": "x"}),
+            {"a": 1, "c": 1},
+        )
+
+    def test_opaque_costs(self) -> None:
+        class OpaqueField(fields.ConcatField):
+            __slots__ = ()
+
+            def get_filter(
+                self, query_param_data: dict[str, str]
+            ) -> tuple[Q, dict[str, str], dict[str, list[Any]]]:
+                return Q(), {}, {}
+
+        plan = FilterPlan([OpaqueField("a", ["b", "c"])])
+        self.assertEqual(
+            CostModel(list_value_weight=0).get_costs(plan, {"a": "x"}), {"a": 6}
+        )
+
+
+@override_settings(ROOT_URLCONF="tests.test_costs")
+class CostBudgetTests(TestCase):
+    def setUp(self) -> None:
+        DowngradeViewSet.query_hooks.events.clear()
+        BasicModel.objects.create(
+            string_uno="Roger",
+            string_dos="Simon",
+            date="2026-03-10",
+            integer=10,
+            boolean=True,
+        )
+
+    def test_budget(self) -> None:
+        response = APIClient().get("/api/costs/", {"integer": "10", "search": "oge"})
+        self.assertEqual(response.status_code, 400)
+
+        response = APIClient().get("/api/costs/", {"integer": "10", "ids": "1,2,3"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_reject(self) -> None:
+        response = APIClient().get("/api/costs/", {"ids": ",".join(["1"] * 1000)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            [
+                "The query params are too complex, their cost is 11 and the limit is 6",
+            ],
+        )
+
+    def test_downgrade(self) -> None:
+        response = APIClient().get("/api/downgrade/", {"integer": "20", "search": "oge"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+        response = APIClient().get("/api/downgrade/", {"integer": "10", "search": "xyz"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+        costs, budget, dropped = DowngradeViewSet.query_hooks.events[-1]
+        self.assertEqual(costs, {"integer": 1.01, "search": 5.01})
+        self.assertEqual(budget, 6)
+        self.assertEqual(dropped, {"search"})
+
+    def test_plan_consumers(self) -> None:
+        backend = QueryParamFilter()
+        request = Request(
+            APIRequestFactory().get("/", {"boolean": "true", "search": "xyz"})
+        )
+        queryset = BasicModel.objects.all()
+
+        # The dropped query params are ignored by every consumer of the plan
+        view: CostsViewSet = DowngradeViewSet()
+        self.assertEqual(backend.get_filter_values(request, view), [("boolean", True)])
+        self.assertEqual(
+            backend.get_facets(request, queryset, view),
+            {"boolean": {"true": 1, "false": 0}},
+        )
+
+        view = CostsViewSet()
+        with self.assertRaises(ValidationError):
+            backend.get_facets(request, queryset, view)
+        with self.assertRaises(ValidationError):
+            backend.get_filter_key(request, view)
@@ -0,0 +1,110 @@
+import datetime
+
+from django.test import TestCase
+
+
+from drf_query_filter.dates import (
+    DateFormatParser,
+    compile_date_format,
+    get_date_format_parser,
+)
+
+FORMATS = [
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%Y%m%d%H%M%S",
+    "%H:%M",
+    "%m-%d",
+    "%Y-%m-%d %%",
+]
+
+VALUES = [
+    "2020-12-31T10:25:30Z",
+    "2020-12-31T10:25:30.5Z",
+    "2020-12-31T10:25:30.123456Z",
+    "2020-12-31T10:25:30.1234567Z",
+    "2020-1-1T10:25:30Z",
+    "2020-12-31t10:25:30z",
+    "2020-12-31 10:25:30",
+    "2020-12-31  10:25:30",
+    "2020-12-31T10:25",
+    "2020-12-31T10:25:30+0700",
+    "2020-12-31T10:25:30-0130",
+    "2020-12-31T10:25:30+07:00",
+    "2020-12-31T10:25:30+0760",
+    "2020-12-31T10:25:30Z+0700",
+    "2020-12-31",
+    "2020-02-30",
+    "2020-02-29",
+    "2021-02-29",
+    "2020-13-01",
+    "2020-00-01",
+    "0000-01-01",
+    "2020-12-31T24:00:00Z",
+    "2020-12-31T23:59:60Z",
+    "31/12/2020",
+    "1/1/2020",
+    "20201231102530",
+    "202012311025301",
+    "10:25",
+    "02-29",
+    "2020-12-31 %",
+    "２０２０-12-31",
+    "",
+]
+
+
+def strptime(value: str, date_format: str) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
+
+def parse(parser: DateFormatParser, value: str) -> datetime.datetime | None:
+    try:
+        return parser.parse(value)
+    except ValueError:
+        return None
+
+
+class DateFormatParserTests(TestCase):
+    def test_same_as_strptime(self) -> None:
+        for date_format in FORMATS:
+            parser = DateFormatParser(date_format)
+            self.assertIsNotNone(parser.pattern, date_format)
+
+            for value in VALUES:
+                expected = strptime(value, date_format)
+                result = parse(parser, value)
+                self.assertEqual(result, expected, (date_format, value))
+                if expected is not None and result is not None:
+                    self.assertEqual(result.tzinfo, expected.tzinfo, (date_format, value))
+
+    def test_unsupported_formats(self) -> None:
+        # The same directive used twice is an error for strptime too
+        self.assertIsNone(compile_date_format("%Y-%m-%d %Y"))
+
+        for date_format in ["%b %d %Y", "%Y-%j", "%f%S", "%z:", "%"]:
+            self.assertIsNone(compile_date_format(date_format), date_format)
+
+            parser = DateFormatParser(date_format)
+            self.assertEqual(
+                parse(parser, "2020-12-31"), strptime("2020-12-31", date_format)
+            )
+
+    def test_iso_formats(self) -> None:
+        self.assertTrue(DateFormatParser("%Y-%m-%dT%H:%M:%SZ").iso)
+        self.assertTrue(DateFormatParser("%Y-%m-%dT%H:%M:%S%z").iso)
+        self.assertFalse(DateFormatParser("%d/%m/%Y").iso)
+        self.assertFalse(DateFormatParser("%Y-%m-%d %H").iso)
+
+    def test_shared_parser(self) -> None:
+        self.assertIs(
+            get_date_format_parser("%Y-%m-%d"), get_date_format_parser("%Y-%m-%d")
+        )
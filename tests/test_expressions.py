@@ -0,0 +1,448 @@
+import datetime
+from typing import Any
+
+
+from django.contrib.auth.models import (
+    Group,
+    User,
+)
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+from drf_query_filter import fields
+from drf_query_filter.expressions import (
+    InValues,
+    RelatedExists,
+    UnionOr,
+    get_bucket_size,
+    get_exists_query,
+    get_multi_valued_split,
+    get_union_query,
+    is_indexable_lookup,
+    pad_values,
+)
+from drf_query_filter.fields import (
+    InChoicesField,
+    InIntegerField,
+)
+from drf_query_filter.filters import QueryParamFilter
+from drf_query_filter.plans import FilterPlan
+
+
+from .models import (
+    BasicModel,
+    RelatedModel,
+)
+from .test_filters import ModelViewSet
+
+
+class InValuesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        BasicModel.objects.bulk_create(
+            BasicModel(
+                string_uno="value_{}".format(index % 5),
+                string_dos="",
+                date=datetime.date(2020, 1, 1),
+                integer=index,
+                boolean=True,
+            )
+            for index in range(50)
+        )
+
+    def get_integers(self, query: Q) -> set[int]:
+        return set(BasicModel.objects.filter(query).values_list("integer", flat=True))
+
+    def test_strategies(self) -> None:
+        values = list(range(10, 2510))
+        expected = self.get_integers(Q(integer__in=values))
+
+        for strategy in [None, "json_each", "values", "chunks"]:
+            query = Q(InValues("integer", values, strategy))
+            self.assertEqual(self.get_integers(query), expected, strategy)
+
+    def test_strings(self) -> None:
+        values = ["value_1", "value_3"]
+        expected = self.get_integers(Q(string_uno__in=values))
+
+        for strategy in [None, "values", "chunks"]:
+            query = Q(InValues("string_uno", values, strategy))
+            self.assertEqual(self.get_integers(query), expected, strategy)
+
+    def test_chunks(self) -> None:
+        queryset = BasicModel.objects.filter(InValues("integer", [1, 2, 3], "chunks"))
+        self.assertIn('"integer" IN (%s, %s, %s)', queryset.query.sql_with_params()[0])
+
+        queryset = BasicModel.objects.filter(
+            InValues("integer", list(range(2500)), "chunks")
+        )
+        sql = queryset.query.sql_with_params()[0]
+        self.assertEqual(sql.count(" IN ("), 3)
+        # No chunk has more values than the parameters allowed by the database
+        max_query_params = connection.features.max_query_params
+        self.assertEqual(
+            max(chunk.count("%s") for chunk in sql.split(" OR ")), max_query_params
+        )
+
+    def test_array(self) -> None:
+        queryset = BasicModel.objects.filter(InValues("integer", [1, 2, 3], "array"))
+        sql, params = queryset.query.sql_with_params()
+        self.assertIn('"integer" = ANY(%s)', sql)
+        self.assertEqual(params, ([1, 2, 3],))
+
+    def test_empty(self) -> None:
+        self.assertFalse(BasicModel.objects.filter(InValues("integer", [])).exists())
+
+    def test_in_integer_field(self) -> None:
+        field = InIntegerField("ids", "integer", in_values_threshold=1000)
+
+        # Below the threshold the lookup is used as it is
+        self.assertEqual(field.get_query([1, 2]), Q(integer__in=[1, 2]))
+
+        # More values than the variables allowed by SQLite
+        errors, value = field.perform_validation(
+            ",".join(str(index) for index in range(40_000))
+        )
+        self.assertEqual(errors, [])
+        query = field.get_query(value)
+        self.assertIsInstance(query.children[0], InValues)
+        self.assertEqual(self.get_integers(query), set(range(50)))
+
+        # Without a threshold the lookup is always used
+        field = InIntegerField("ids", "integer")
+        self.assertEqual(field.get_query(value), Q(integer__in=value))
+
+    def test_in_choices_field(self) -> None:
+        choices = [("1", "value_1"), ("3", "value_3")]
+        field = InChoicesField(
+            "field",
+            choices,
+            "string_uno",
+            in_values_threshold=1,
+            in_values_strategy="chunks",
+        )
+        errors, value = field.perform_validation("1,3")
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            self.get_integers(field.get_query(value)),
+            self.get_integers(Q(string_uno__in=["value_1", "value_3"])),
+        )
+
+
+class BucketsTests(TestCase):
+    def get_sql(self, field: InIntegerField, raw_value: str) -> str:
+        errors, value = field.perform_validation(raw_value)
+        self.assertEqual(errors, [])
+        queryset = BasicModel.objects.filter(field.get_query(value))
+        sql, _ = queryset.query.sql_with_params()
+        return sql
+
+    def test_get_bucket_size(self) -> None:
+        self.assertEqual(
+            [get_bucket_size(count, True) for count in [1, 2, 3, 4, 5, 1000, 1025]],
+            [1, 2, 4, 4, 8, 1024, 2048],
+        )
+        self.assertEqual(
+            [get_bucket_size(count, (10, 100)) for count in [1, 10, 11, 100, 250]],
+            [1, 10, 100, 100, 300],
+        )
+        self.assertEqual(get_bucket_size(5, False), 5)
+
+    def test_pad_values(self) -> None:
+        self.assertEqual(pad_values([1, 2, 3], 5), [1, 2, 3, 3, 3])
+        self.assertEqual(pad_values([1, 2, 3], 3), [1, 2, 3])
+        self.assertEqual(pad_values([], 0), [])
+
+    def test_same_statement(self) -> None:
+        field = InIntegerField("ids", "integer", buckets=True)
+        sql = self.get_sql(field, "1,2,3")
+        self.assertEqual(sql.count("%s"), 4)
+        self.assertEqual(sql, self.get_sql(field, "4,5,6,7"))
+        self.assertNotEqual(sql, self.get_sql(field, "1,2,3,4,5"))
+
+        field = InIntegerField("ids", "integer", buckets=[10, 100])
+        sql = self.get_sql(field, "1,2,3")
+        self.assertEqual(sql.count("%s"), 10)
+        self.assertEqual(sql, self.get_sql(field, "1,2,3,4,5,6,7,8"))
+
+    def test_same_result(self) -> None:
+        BasicModel.objects.bulk_create(
+            BasicModel(
+                string_uno="",
+                string_dos="",
+                date=datetime.date(2020, 1, 1),
+                integer=index,
+                boolean=True,
+            )
+            for index in range(10)
+        )
+        field = InIntegerField("ids", "integer", buckets=True)
+        errors, value = field.perform_validation("1,3,5")
+        self.assertEqual(BasicModel.objects.filter(field.get_query(value)).count(), 3)
+
+
+class ExistsViewSet(ModelViewSet):
+    query_exists = True
+    query_params = [
+        fields.StringField("name", "related__name"),
+        fields.RangeIntegerField("number", "related__number", equal=True),
+        fields.IntegerField("integer"),
+    ]
+
+
+class ExistsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for integer, related in [
+            (10, [("a", 1), ("a", 5)]),
+            (20, [("a", 9), ("b", 5)]),
+            (30, []),
+        ]:
+            basic = BasicModel.objects.create(
+                string_uno="",
+                string_dos="",
+                date=datetime.date(2020, 1, 1),
+                integer=integer,
+                boolean=True,
+            )
+            for name, number in related:
+                RelatedModel.objects.create(basic=basic, name=name, number=number)
+
+    def filter(self, query_params: dict[str, str], **attributes: object) -> list[int]:
+        view = ExistsViewSet()
+        for name, value in attributes.items():
+            setattr(view, name, value)
+        request = Request(APIRequestFactory().get("/", query_params))
+        queryset = QueryParamFilter().filter_queryset(
+            request, BasicModel.objects.all(), view
+        )
+        sql = str(queryset.query)
+        if attributes.get("query_exists", True):
+            self.assertNotIn("JOIN", sql)
+        return list(queryset.values_list("integer", flat=True))
+
+    def test_no_repeated_rows(self) -> None:
+        self.assertEqual(self.filter({"name": "a"}, query_exists=False), [10, 10, 20])
+        self.assertEqual(self.filter({"name": "a"}), [10, 20])
+        self.assertEqual(self.filter({"name": "a", "integer": "20"}), [20])
+
+    def test_same_related_row(self) -> None:
+        # Range compares both bounds against the same related row
+        self.assertEqual(self.filter({"number": "4,6"}), [10, 20])
+        self.assertEqual(self.filter({"number": "2,4"}), [])
+
+    def test_separate_filters(self) -> None:
+        # Each filter call may match other related rows, like the joins do
+        query_params = {"name": "b", "number": "9,9"}
+        self.assertEqual(self.filter(query_params, query_exists=False), [20])
+        self.assertEqual(self.filter(query_params), [20])
+
+        # A single filter call needs a related row that matches both
+        self.assertEqual(
+            self.filter(query_params, query_exists=False, query_single_clone=True), []
+        )
+        self.assertEqual(self.filter(query_params, query_single_clone=True), [])
+
+    def test_get_exists_query(self) -> None:
+        query = get_exists_query(
+            Q(related__name="a", related__number__gt=1, integer=10)
+            | Q(related__name="b"),
+            BasicModel,
+        )
+        self.assertEqual(
+            query,
+            Q(
+                ("integer", 10),
+                RelatedExists(("related__name", "a"), ("related__number__gt", 1)),
+            )
+            | Q(RelatedExists(("related__name", "b"))),
+        )
+
+    def test_nested_or(self) -> None:
+        def filter(query: Q) -> list[int]:
+            joins = BasicModel.objects.filter(query).distinct()
+            exists = BasicModel.objects.filter(get_exists_query(query, BasicModel))
+            self.assertNotIn("JOIN", str(exists.query))
+            integers = sorted(exists.values_list("integer", flat=True))
+            # The same rows as the join of a single filter call
+            self.assertEqual(integers, sorted(joins.values_list("integer", flat=True)))
+            return integers
+
+        # The OR nested in the AND needs the same related row as its sibling
+        query = Q(related__name="b") & (Q(related__number=9) | Q(related__number=1))
+        self.assertEqual(
+            get_exists_query(query, BasicModel),
+            Q(
+                RelatedExists(
+                    ("related__name", "b"),
+                    Q(related__number=9) | Q(related__number=1),
+                )
+            ),
+        )
+        self.assertEqual(filter(query), [])
+        self.assertEqual(
+            filter(Q(related__name="a") & (Q(related__number=9) | Q(related__number=1))),
+            [10, 20],
+        )
+
+        # Mixed with other lookups it keeps the join
+        query = Q(related__name="b") & (Q(related__number=9) | Q(integer=20))
+        self.assertEqual(get_exists_query(query, BasicModel), query)
+
+    def test_get_multi_valued_split(self) -> None:
+        self.assertIsNone(get_multi_valued_split(BasicModel, "integer__gte"))
+        self.assertIsNone(get_multi_valued_split(BasicModel, "related__isnull"))
+        self.assertIsNone(get_multi_valued_split(RelatedModel, "basic__integer"))
+        split = get_multi_valued_split(RelatedModel, "basic__related__name")
+        assert split is not None
+        source, relation, rest = split
+        self.assertEqual((source, relation.name, rest), ("basic", "related", "name"))
+
+    def test_many_to_many(self) -> None:
+        user = User.objects.create(username="user")
+        user.groups.add(Group.objects.create(name="x"), Group.objects.create(name="y"))
+        User.objects.create(username="other")
+
+        queryset = User.objects.filter(
+            get_exists_query(Q(groups__name__in=["x", "y"]), User)
+        )
+        self.assertEqual(list(queryset.values_list("username", flat=True)), ["user"])
+
+        groups = Group.objects.filter(get_exists_query(Q(user__username="user"), Group))
+        self.assertEqual(groups.count(), 2)
+
+
+class UnionViewSet(ModelViewSet):
+    query_union_fan_out: int | None = 2
+    query_params = [
+        fields.StringField(
+            "search", ["string_uno", "string_dos", "related__name"], connector=Q.OR
+        ),
+        fields.StringField("names", ["string_uno", "string_dos"], connector=Q.OR),
+        fields.StringField(
+            "contains",
+            ["string_uno__icontains", "string_dos__icontains"],
+            connector=Q.OR,
+        ),
+        fields.IntegerField("integer"),
+    ]
+
+
+class UnionOrTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for integer, string_uno, string_dos, names in [
+            (10, "a", "b", ["c"]),
+            (20, "b", "a", ["a", "a"]),
+            (30, "c", "c", ["b"]),
+            (40, "d", "d", []),
+        ]:
+            basic = BasicModel.objects.create(
+                string_uno=string_uno,
+                string_dos=string_dos,
+                date=datetime.date(2020, 1, 1),
+                integer=integer,
+                boolean=True,
+            )
+            for name in names:
+                RelatedModel.objects.create(basic=basic, name=name, number=0)
+
+    def filter(self, query_params: dict[str, str], fan_out: int | None = 2) -> Any:
+        view = UnionViewSet()
+        view.query_union_fan_out = fan_out
+        request = Request(APIRequestFactory().get("/", query_params))
+        return QueryParamFilter().filter_queryset(request, BasicModel.objects.all(), view)
+
+    def get_integers(self, queryset: Any) -> list[int]:
+        return sorted(queryset.values_list("integer", flat=True))
+
+    def test_union(self) -> None:
+        queryset = self.filter({"names": "a"})
+        self.assertIn("UNION", str(queryset.query))
+        self.assertEqual(self.get_integers(queryset), [10, 20])
+
+        queryset = self.filter({"names": "b", "integer": "20"})
+        self.assertEqual(self.get_integers(queryset), [20])
+
+    def test_multi_valued_relation(self) -> None:
+        # The OR crosses the relation, the UNION would lose the related row
+        queryset = self.filter({"search": "a"})
+        self.assertNotIn("UNION", str(queryset.query))
+        self.assertEqual(self.get_integers(queryset), [10, 20, 20])
+
+        basic = BasicModel.objects.get(integer=40)
+        RelatedModel.objects.create(basic=basic, name="x", number=1)
+        RelatedModel.objects.create(basic=basic, name="y", number=7)
+        query = Q(related__name="x") & Q(
+            related__number=7, related__id=7, _connector=Q.OR
+        )
+        self.assertEqual(get_union_query(query, BasicModel), query)
+
+        plan = FilterPlan(
+            [
+                fields.StringField("n", "related__name")
+                & fields.IntegerField(
+                    "i", ["related__number", "related__id"], connector=Q.OR
+                )
+            ]
+        )
+        all_options: list[dict[str, Any]] = [{}, {"exists": True}, {"union_fan_out": 2}]
+        for options in all_options:
+            queryset, _ = plan.filter(
+                BasicModel.objects.all(), {"n": "x", "i": "7"}, **options
+            )
+            self.assertFalse(queryset.exists(), options)
+
+    def test_same_rows(self) -> None:
+        for value in ["a", "b", "c", "d", "x"]:
+            self.assertEqual(
+                self.get_integers(self.filter({"names": value})),
+                sorted(set(self.get_integers(self.filter({"names": value}, None)))),
+            )
+
+    def test_fan_out(self) -> None:
+        self.assertNotIn("UNION", str(self.filter({"search": "a"}, 4).query))
+        self.assertNotIn("UNION", str(self.filter({"search": "a"}, None).query))
+
+    def test_not_indexable(self) -> None:
+        queryset = self.filter({"contains": "A"})
+        self.assertNotIn("UNION", str(queryset.query))
+        self.assertEqual(self.get_integers(queryset), [10, 20])
+
+    def test_get_union_query(self) -> None:
+        union = Q(string_uno="a", string_dos__startswith="b", _connector=Q.OR)
+        query = get_union_query(Q(integer=1) & ~union, BasicModel)
+        self.assertEqual(
+            query,
+            Q(integer=1)
+            & ~Q(UnionOr(("string_dos__startswith", "b"), ("string_uno", "a"))),
+        )
+        self.assertEqual(
+            BasicModel.objects.filter(query).count(),
+            BasicModel.objects.filter(Q(integer=1) & ~union).count(),
+        )
+
+        query = Q(_annotation="a") | Q(integer=1)
+        self.assertEqual(get_union_query(query, BasicModel), query)
+
+    def test_is_indexable_lookup(self) -> None:
+        self.assertTrue(is_indexable_lookup(BasicModel, "integer"))
+        self.assertTrue(is_indexable_lookup(BasicModel, "pk__in"))
+        self.assertTrue(is_indexable_lookup(BasicModel, "string_uno__startswith"))
+        self.assertTrue(is_indexable_lookup(RelatedModel, "basic__integer__gte"))
+        self.assertTrue(is_indexable_lookup(RelatedModel, "basic__gt"))
+
+        self.assertFalse(is_indexable_lookup(BasicModel, "_annotation"))
+        self.assertFalse(is_indexable_lookup(BasicModel, "related__name"))
+        self.assertFalse(is_indexable_lookup(User, "groups__name"))
+        self.assertFalse(is_indexable_lookup(BasicModel, "string_uno__icontains"))
+        self.assertFalse(is_indexable_lookup(BasicModel, "integer__unknown"))
+        # Transforms wrap the column in a function
+        self.assertFalse(is_indexable_lookup(User, "date_joined__year"))
+        self.assertFalse(is_indexable_lookup(User, "date_joined__year__gte"))
+        self.assertFalse(is_indexable_lookup(User, "date_joined__date"))
+        self.assertFalse(is_indexable_lookup(BasicModel, "related__name__lower"))
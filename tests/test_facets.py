@@ -0,0 +1,215 @@
+import datetime
+from typing import Any
+
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+from drf_query_filter import fields
+from drf_query_filter.facets import (
+    get_date_edges,
+    get_facet_choices,
+)
+from drf_query_filter.filters import QueryParamFilter
+
+
+from .models import BasicModel
+from .test_filters import ModelViewSet
+
+
+class FacetsViewSet(ModelViewSet):
+    query_params = [
+        fields.ChoicesField("integer", choices=["10", "20", "30"]),
+        fields.BooleanField("boolean"),
+        fields.InChoicesField(
+            "strings", choices=[("a", "uno"), ("b", "dos")], target_fields="string_uno"
+        ),
+        fields.StringField("search", "string_dos"),
+    ]
+
+
+class FacetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for integer, boolean, string_uno, string_dos in [
+            (10, True, "uno", "x"),
+            (20, False, "uno", "x"),
+            (10, False, "dos", "y"),
+            (30, True, "dos", "x"),
+        ]:
+            BasicModel.objects.create(
+                string_uno=string_uno,
+                string_dos=string_dos,
+                date=datetime.date(2020, 1, 1),
+                integer=integer,
+                boolean=boolean,
+            )
+
+    def get_facets(self, query_params: dict[str, str]) -> Any:
+        request = Request(APIRequestFactory().get("/", query_params))
+        return QueryParamFilter().get_facets(
+            request, BasicModel.objects.all(), FacetsViewSet()
+        )
+
+    def test_facets(self) -> None:
+        with self.assertNumQueries(1):
+            facets = self.get_facets({"boolean": "true", "search": "x"})
+
+        self.assertEqual(
+            facets,
+            {
+                "integer": {"10": 1, "20": 0, "30": 1},
+                "boolean": {"true": 2, "false": 1},
+                "strings": {"a": 1, "b": 1},
+            },
+        )
+
+    def test_excludes_own_filter(self) -> None:
+        facets = self.get_facets({"strings": "a", "integer": "10", "unknown": "1"})
+
+        self.assertEqual(facets["strings"], {"a": 1, "b": 1})
+        self.assertEqual(facets["integer"], {"10": 1, "20": 1, "30": 0})
+        self.assertEqual(facets["boolean"], {"true": 1, "false": 0})
+
+    def test_invalid_values_are_ignored(self) -> None:
+        self.assertEqual(self.get_facets({"integer": "40"}), self.get_facets({}))
+
+    def test_choices(self) -> None:
+        choices = get_facet_choices(fields.BooleanField("boolean"))
+        self.assertEqual(list(choices), ["true", "false"])
+
+
+class RangeSummariesViewSet(ModelViewSet):
+    query_params = [
+        fields.RangeIntegerField("integer", equal=True),
+        fields.RangeDateField("date", equal=True),
+        fields.BooleanField("boolean"),
+    ]
+
+
+class RangeSummariesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for integer, day, boolean in [
+            (1, 1, True),
+            (4, 2, True),
+            (5, 9, False),
+            (10, 20, True),
+        ]:
+            BasicModel.objects.create(
+                string_uno="uno",
+                string_dos="dos",
+                date=datetime.date(2020, 1, day),
+                integer=integer,
+                boolean=boolean,
+            )
+
+    def get_summaries(self, query_params: dict[str, str], **kwargs: Any) -> Any:
+        request = Request(APIRequestFactory().get("/", query_params))
+        return QueryParamFilter().get_range_summaries(
+            request, BasicModel.objects.all(), RangeSummariesViewSet(), **kwargs
+        )
+
+    def test_summaries(self) -> None:
+        with self.assertNumQueries(2):
+            summaries = self.get_summaries({"integer": "1,5"}, buckets=2)
+
+        # The integer summary ignores its own query param
+        self.assertEqual(summaries["integer"]["min"], 1)
+        self.assertEqual(summaries["integer"]["max"], 10)
+        self.assertEqual(
+            summaries["integer"]["buckets"],
+            [
+                {"start": 1, "end": 6, "count": 3},
+                {"start": 6, "end": 11, "count": 1},
+            ],
+        )
+
+        self.assertEqual(summaries["date"]["min"], datetime.date(2020, 1, 1))
+        self.assertEqual(summaries["date"]["max"], datetime.date(2020, 1, 9))
+        self.assertEqual(
+            summaries["date"]["buckets"],
+            [
+                {
+                    "start": datetime.date(2019, 12, 30),
+                    "end": datetime.date(2020, 1, 6),
+                    "count": 2,
+                },
+                {
+                    "start": datetime.date(2020, 1, 6),
+                    "end": datetime.date(2020, 1, 13),
+                    "count": 1,
+                },
+            ],
+        )
+
+    def test_bounds(self) -> None:
+        bounds = {
+            "integer": (0, 9),
+            "date": (datetime.date(2020, 1, 1), datetime.date(2020, 1, 31)),
+        }
+        with self.assertNumQueries(1):
+            summaries = self.get_summaries(
+                {"boolean": "true"}, buckets=3, bounds=bounds, date_interval="month"
+            )
+
+        self.assertEqual(summaries["integer"]["min"], 1)
+        self.assertEqual(summaries["integer"]["max"], 10)
+        self.assertEqual(
+            [bucket["count"] for bucket in summaries["integer"]["buckets"]], [1, 1, 1]
+        )
+        self.assertEqual(
+            [bucket["count"] for bucket in summaries["date"]["buckets"]], [3]
+        )
+
+    def test_empty(self) -> None:
+        summaries = self.get_summaries({"integer": "100,200"})
+        self.assertEqual(summaries["date"], {"min": None, "max": None, "buckets": []})
+
+    def test_date_edges(self) -> None:
+        start, end = datetime.date(2020, 1, 15), datetime.date(2020, 3, 2)
+        self.assertEqual(
+            get_date_edges(start, end, 5, None),
+            [
+                datetime.date(2020, 1, 1),
+                datetime.date(2020, 2, 1),
+                datetime.date(2020, 3, 1),
+                datetime.date(2020, 4, 1),
+            ],
+        )
+        self.assertEqual(len(get_date_edges(start, end, 10, None)), 9)
+        # Every bucket spans 5 days, the last one is completed
+        edges = get_date_edges(start, end, 10, "day")
+        self.assertEqual(len(edges), 11)
+        self.assertEqual(edges[1] - edges[0], datetime.timedelta(days=5))
+        self.assertEqual(edges[-1], datetime.date(2020, 3, 5))
+
+        # Even months give more buckets than requested
+        edges = get_date_edges(datetime.date(1990, 1, 1), end, 10, None)
+        self.assertLessEqual(len(edges), 11)
+        self.assertEqual(edges[0], datetime.date(1990, 1, 1))
+        self.assertGreater(edges[-1], end)
+
+    def test_extreme_dates(self) -> None:
+        # The edges are counted, not built day by day, and clamped at the last date
+        edges = get_date_edges(datetime.date.min, datetime.date.max, 10, None)
+        self.assertLessEqual(len(edges), 11)
+        self.assertEqual(edges[0], datetime.date.min)
+        self.assertEqual(edges[-1], datetime.date.max)
+
+        BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date.max,
+            integer=100,
+            boolean=True,
+        )
+        summaries = self.get_summaries({})
+        self.assertEqual(summaries["date"]["max"], datetime.date.max)
+        buckets = summaries["date"]["buckets"]
+        self.assertLessEqual(len(buckets), 10)
+        self.assertEqual(buckets[-1]["end"], datetime.date.max)
+        # The last bucket includes the sentinel
+        self.assertEqual(sum(bucket["count"] for bucket in buckets), 5)
@@ -4,6 +4,7 @@ from typing import Any
 from zoneinfo import ZoneInfo
 
 
+from django.contrib.auth.models import User
 from django.core.validators import (
     EmailValidator,
     MaxValueValidator,
@@ -38,6 +39,8 @@ from drf_query_filter.fields import (
     RangeDecimalField,
     RangeFloatField,
     RangeIntegerField,
+    RangeRelativeDateTimeField,
+    RelativeDateTimeField,
     StringField,
     default_timezone,
 )
@@ -331,6 +334,73 @@ class DateTimeFieldTests(TestCase):
         self.assertEqual(value, timezone.make_aware(_datetime, default_timezone()))
 
 
+class FixedNowField(RangeRelativeDateTimeField):
+    __slots__ = ()
+
+    def get_now(self) -> datetime.datetime:
+        return timezone.make_aware(
+            datetime.datetime(2020, 3, 11, 10, 47, 31), default_timezone()
+        )
+
+
+class RelativeDateTimeFieldTests(TestCase):
+    def get_value(self, raw_value: str, **kwargs: Any) -> Any:
+        errors, value = FixedNowField("field", **kwargs).perform_validation(raw_value)
+        self.assertFalse(errors, errors)
+        return [timezone.make_naive(item, default_timezone()) for item in value]
+
+    def test_tokens(self) -> None:
+        self.assertEqual(
+            self.get_value("-24h,now"),
+            [
+                datetime.datetime(2020, 3, 10, 10, 47),
+                datetime.datetime(2020, 3, 11, 10, 47),
+            ],
+        )
+        self.assertEqual(
+            self.get_value("-15m,now+1h"),
+            [
+                datetime.datetime(2020, 3, 11, 10, 32),
+                datetime.datetime(2020, 3, 11, 11, 47),
+            ],
+        )
+        self.assertEqual(
+            self.get_value("2020-01-01T00:00:00Z,-2w")[1],
+            datetime.datetime(2020, 2, 26, 10, 47),
+        )
+
+    def test_out_of_range(self) -> None:
+        for raw_value in ["-999999d,now", "now,+999999w"]:
+            errors, _ = FixedNowField("field").perform_validation(raw_value)
+            self.assertEqual([error.code for error in errors], ["out_of_range"])
+
+    def test_granularity(self) -> None:
+        self.assertEqual(
+            self.get_value("-7d,now", granularity=datetime.timedelta(days=1)),
+            [datetime.datetime(2020, 3, 4), datetime.datetime(2020, 3, 11)],
+        )
+        # Weeks start on Monday
+        self.assertEqual(
+            self.get_value("now,now", granularity=datetime.timedelta(weeks=1))[0],
+            datetime.datetime(2020, 3, 9),
+        )
+        self.assertEqual(
+            self.get_value("now,now", granularity=datetime.timedelta(minutes=15))[0],
+            datetime.datetime(2020, 3, 11, 10, 45),
+        )
+
+    def test_invalid(self) -> None:
+        for raw_value in ["-24x,now", "24h,now", "-h,now", "now-,now"]:
+            errors, _ = FixedNowField("field").perform_validation(raw_value)
+            self.assertEqual(errors[0].code, "wrong_format", raw_value)
+
+    def test_same_query(self) -> None:
+        field = RelativeDateTimeField("field", granularity=datetime.timedelta(hours=1))
+        self.assertEqual(
+            field.get_filter({"field": "-1h"}), field.get_filter({"field": "-60m"})
+        )
+
+
 class TestingRangeMixin(TestCase):
     def validate(
         self,
@@ -400,6 +470,68 @@ class TestingRangeMixin(TestCase):
         self.get_validate_query(RangeFloatField, 1.0, 10.0)
         self.get_validate_query(RangeDecimalField, Decimal(1), Decimal(10))
 
+    def test_datetime_bounds(self) -> None:
+        start = timezone.make_aware(datetime.datetime(2020, 1, 1), default_timezone())
+        end = timezone.make_aware(datetime.datetime(2020, 1, 31), default_timezone())
+
+        field = RangeDateField("field", "date_joined__date", datetime_bounds=True)
+        _, value = field.perform_validation("2019-12-31,2020-01-31")
+        self.assertEqual(
+            field.get_query(value),
+            Q(date_joined__gte=start, date_joined__lt=end),
+        )
+
+        field = RangeDateField("field", equal=True, datetime_bounds=True)
+        _, value = field.perform_validation("2019-12-31,2020-01-30")
+        self.assertEqual(
+            field.get_query(value),
+            Q(field__gte=start - datetime.timedelta(days=1), field__lt=end),
+        )
+
+        _, value = field.perform_validation(",2020-01-30")
+        self.assertEqual(field.get_query(value), Q(field__lt=end))
+
+    def test_datetime_bounds_last_date(self) -> None:
+        last = timezone.make_aware(datetime.datetime(9999, 12, 31), default_timezone())
+
+        # The last date has no next day, the end is left open
+        field = RangeDateField("field", equal=True, datetime_bounds=True)
+        errors, value = field.perform_validation(",9999-12-31")
+        self.assertEqual(errors, [])
+        self.assertEqual(field.get_query(value), Q())
+
+        errors, value = field.perform_validation("9999-12-31,")
+        self.assertEqual(errors, [])
+        self.assertEqual(field.get_query(value), Q(field__gte=last))
+
+        # And no day starts after it
+        field = RangeDateField("field", datetime_bounds=True)
+        errors, _ = field.perform_validation("9999-12-31,")
+        self.assertEqual([error.code for error in errors], ["out_of_range"])
+
+        errors, value = field.perform_validation(",9999-12-31")
+        self.assertEqual(errors, [])
+        self.assertEqual(field.get_query(value), Q(field__lt=last))
+
+    def test_datetime_bounds_filter(self) -> None:
+        _timezone = default_timezone()
+        for day, hour in [(1, 0), (1, 23), (2, 0), (3, 12)]:
+            User.objects.create(
+                username="{}-{}".format(day, hour),
+                date_joined=timezone.make_aware(
+                    datetime.datetime(2020, 1, day, hour), _timezone
+                ),
+            )
+
+        field = RangeDateField("joined", "date_joined", equal=True, datetime_bounds=True)
+        _, value = field.perform_validation("2020-01-01,2020-01-02")
+        queryset = User.objects.filter(field.get_query(value))
+
+        self.assertEqual(
+            sorted(queryset.values_list("username", flat=True)), ["1-0", "1-23", "2-0"]
+        )
+        self.assertNotIn("cast_date", str(queryset.query))
+
 
 class TestingInMixin(TestCase):
     choices = [
@@ -446,3 +578,52 @@ class TestingInMixin(TestCase):
             str(field_choices.get_query(value)),
             str(Q(**{"field__in": ["uno", "dos"]})),
         )
+
+    def test_list_options(self) -> None:
+        field_integer = InIntegerField(
+            "field", list_separator="|", unique=True, sort=True
+        )
+        errors, value = field_integer.perform_validation("9|7|9|01|1|3")
+        self.assertEqual(len(errors), 0, errors)
+        self.assertEqual(value, [1, 3, 7, 9])
+
+        field_choices = InChoicesField("field", choices=self.choices, unique=True)
+        errors, value = field_choices.perform_validation("20,10,20")
+        self.assertEqual(len(errors), 0, errors)
+        self.assertEqual(value, ["dos", "uno"])
+
+    def test_max_length(self) -> None:
+        field_integer = InIntegerField("field", max_length=3)
+        self.validate(field_integer, "1,2,3")
+        errors, value = field_integer.perform_validation("1,2,3,4")
+        self.assertEqual([error.code for error in errors], ["max_length"])
+        self.assertEqual(value, [])
+
+        # Only the values count, not the empty parts
+        errors, value = field_integer.perform_validation("1,,2,3,")
+        self.assertEqual(len(errors), 0, errors)
+        self.assertEqual(value, [1, 2, 3])
+
+    def test_sort_not_comparable(self) -> None:
+        field_choices = InChoicesField(
+            "field", choices={"a": 2, "b": None, "c": "x", "d": 1}, sort=True
+        )
+        errors, value = field_choices.perform_validation("c,a,b,d")
+        self.assertEqual(len(errors), 0, errors)
+        self.assertEqual(value, ["x", 1, 2, None])
+
+    def test_bulk_validation_errors(self) -> None:
+        field_integer = InIntegerField("field")
+        errors, value = field_integer.perform_validation("1,a,3,b")
+        self.assertEqual([error.code for error in errors], ["invalid", "invalid"])
+        self.assertEqual(value, [1, 3])
+
+        field_integer = InIntegerField("field", validators=[MaxValueValidator(5)])
+        errors, value = field_integer.perform_validation("1,10")
+        self.assertEqual([error.code for error in errors], ["max_value"])
+        self.assertEqual(value, [1])
+
+        field_choices = InChoicesField("field", choices=self.choices)
+        errors, value = field_choices.perform_validation("10,50,20")
+        self.assertEqual([error.code for error in errors], ["not_in_choices"])
+        self.assertEqual(value, ["uno", "dos"])
@@ -0,0 +1,115 @@
+from typing import Any
+
+
+from django.db.models import Q
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import (
+    include,
+    path,
+)
+from rest_framework.request import Request
+from rest_framework.routers import SimpleRouter
+from rest_framework.test import APIClient
+
+
+from drf_query_filter import fields
+from drf_query_filter.hooks import (
+    FilterHooks,
+    LoggingHooks,
+    get_sql_shape,
+)
+
+
+from .models import BasicModel
+from .test_filters import ModelViewSet
+
+
+class RecordingHooks(FilterHooks):
+    def __init__(self) -> None:
+        self.events: list[tuple[Any, ...]] = []
+
+    def filter_started(self, request: Request, view: Any) -> None:
+        self.events.append(("started",))
+
+    def field_evaluated(
+        self,
+        field: fields.Field,
+        errors: list[Any],
+        validation_time: float,
+        build_time: float,
+        query: Q | None,
+        annotate: dict[str, Any],
+    ) -> None:
+        assert validation_time >= 0 and build_time >= 0
+        self.events.append(("field", field.query_param_name, bool(errors), query))
+
+    def filter_finished(
+        self,
+        request: Request,
+        view: Any,
+        queryset: Any,
+        present: frozenset[str],
+        invalid: frozenset[str],
+        duration: float,
+    ) -> None:
+        self.events.append(("finished", present, invalid, get_sql_shape(queryset)))
+
+
+class HooksViewSet(ModelViewSet):
+    query_hooks = RecordingHooks()
+    query_raise_exceptions = False
+
+
+router = SimpleRouter()
+router.register("hooks", HooksViewSet)
+
+urlpatterns = [path("api/", include(router.urls))]
+
+
+@override_settings(ROOT_URLCONF="tests.test_hooks")
+class HooksTests(TestCase):
+    def setUp(self) -> None:
+        HooksViewSet.query_hooks.events.clear()
+
+    def test_events(self) -> None:
+        client = APIClient()
+        response = client.get(
+            "/api/hooks/", {"search_exact": "Blue", "integer": "3000", "unknown": "1"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        events = HooksViewSet.query_hooks.events
+        self.assertEqual(events[0], ("started",))
+        self.assertEqual(
+            events[1:3],
+            [
+                ("field", "integer", True, None),
+                (
+                    "field",
+                    "search_exact",
+                    False,
+                    Q(string_uno="Blue", string_dos="Blue", _connector=Q.OR),
+                ),
+            ],
+        )
+
+        name, present, invalid, sql = events[3]
+        self.assertEqual(name, "finished")
+        self.assertEqual(present, {"search_exact", "integer"})
+        self.assertEqual(invalid, {"integer"})
+        self.assertIn("%s", sql)
+        self.assertNotIn("Blue", sql)
+
+    def test_logging_hooks(self) -> None:
+        HooksViewSet.query_hooks = LoggingHooks()  # type: ignore
+        try:
+            with self.assertLogs("drf_query_filter", level="DEBUG") as logs:
+                APIClient().get("/api/hooks/", {"pk": "1"})
+        finally:
+            HooksViewSet.query_hooks = RecordingHooks()
+
+        self.assertTrue(logs.output[0].startswith("DEBUG:drf_query_filter:field pk"))
+        self.assertIn(BasicModel._meta.db_table, logs.output[1])
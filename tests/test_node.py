@@ -2,7 +2,13 @@ from django.db.models import Q
 from django.test import TestCase
 
 
-from drf_query_filter.fields import Field
+from drf_query_filter.fields import (
+    Field,
+    IntegerField,
+    Node,
+    RangeDateField,
+)
+from drf_query_filter.plans import PlanCache
 
 
 class NodeTests(TestCase):
@@ -38,3 +44,43 @@ class NodeTests(TestCase):
         node = (Field("a") | Field("b")) & Field("c")
         query, _, _ = node.get_filter({"a": "value", "c": "value"})
         self.assertEqual(query, Q(a="value") & Q(c="value"))
+
+    def test_query_param_names(self) -> None:
+        node = Field("a") | (Field("b", "target") & Field("c"))
+        self.assertEqual(node.get_query_param_names(), {"a", "b", "c"})
+        self.assertEqual(Field("a", "target").get_query_param_names(), {"a"})
+
+    def test_combining_returns_new_nodes(self) -> None:
+        field_a = Field("a")
+        node = field_a & Field("b")
+        self.assertEqual(field_a.childrens, ())
+        self.assertEqual(len(node.childrens), 2)
+
+        other_node = node & Field("c")
+        self.assertEqual(len(node.childrens), 2)
+        self.assertEqual(len(other_node.childrens), 3)
+        self.assertIs(other_node.childrens[0], field_a)
+
+        fields = node
+        fields &= Field("d")
+        self.assertEqual(len(node.childrens), 2)
+
+    def test_structural_equality(self) -> None:
+        def build() -> Node:
+            return Field("a") | (IntegerField("b", "target") & RangeDateField("c"))
+
+        self.assertEqual(build(), build())
+        self.assertEqual(hash(build()), hash(build()))
+        self.assertNotEqual(Field("a"), Field("a", "target"))
+        self.assertNotEqual(Field("a"), IntegerField("a"))
+        self.assertNotEqual(Field("a") & Field("b"), Field("a") | Field("b"))
+        self.assertNotEqual(
+            RangeDateField("c", equal=True), RangeDateField("c", equal=False)
+        )
+
+        cache = PlanCache()
+        self.assertIs(cache.get([build()]), cache.get([build()]))
+
+    def test_slots(self) -> None:
+        for node in [Node(None), Field("a"), IntegerField("a"), RangeDateField("a")]:
+            self.assertFalse(hasattr(node, "__dict__"), node)
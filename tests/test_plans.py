@@ -0,0 +1,270 @@
+import datetime
+
+
+from django.db.models import (
+    Q,
+    Value,
+)
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from rest_framework.exceptions import ValidationError
+
+
+from drf_query_filter.fields import (
+    ConcatField,
+    Field,
+    IntegerField,
+    Node,
+)
+from drf_query_filter.filters import (
+    QueryParamFilter,
+    warm_filter_plans,
+)
+from drf_query_filter.plans import (
+    FilterPlan,
+    PlanCache,
+    combine_queries,
+)
+
+
+from .models import BasicModel
+from .test_filters import ModelViewSet
+
+
+class CombineQueriesTests(TestCase):
+    def test_equal_to_operators(self) -> None:
+        a, b, c = Q(a=1), Q(b=1, c=1, _connector=Q.OR), Q(d=1)
+        self.assertEqual(combine_queries([a, b, c], Q.AND), a & b & c)
+        self.assertEqual(combine_queries([a, b, c], Q.OR), a | b | c)
+        self.assertEqual(combine_queries([a, b, c], Q.XOR), a ^ b ^ c)
+        self.assertEqual(combine_queries([Q(a=1)], Q.OR), Q(a=1))
+        self.assertFalse(combine_queries([], Q.AND))
+
+
+class FilterPlanTests(TestCase):
+    def assertSameFilter(self, node: Node, data: dict[str, str]) -> None:
+        plan = FilterPlan([node])
+        ((query, annotate, errors),) = plan.get_filter(data)
+        expected_query, expected_annotate, expected_errors = node.get_filter(data)
+
+        # empty queries are discarded when combined, their connector is irrelevant
+        self.assertEqual(query or None, expected_query or None, data)
+        self.assertEqual(annotate, expected_annotate, data)
+        self.assertEqual(errors, expected_errors, data)
+
+    def test_same_result_as_tree(self) -> None:
+        datas = [
+            {},
+            {"a": "1"},
+            {"a": "1", "c": "1"},
+            {"b": "1", "c": "x"},
+            {"a": "x", "b": "1", "c": "1", "d": "1"},
+        ]
+        nodes = [
+            Field("a") & Field("b"),
+            Field("a") | Field("b") & IntegerField("c"),
+            (Field("a") | Field("b")) & IntegerField("c"),
+            (Field("a", ["a_a", "a_b"], connector=Q.OR) & Field("b")) ^ Field("d"),
+            (IntegerField("a") ^ IntegerField("b")) | (IntegerField("c") & Field("d")),
+        ]
+
+        for node in nodes:
+            for data in datas:
+                self.assertSameFilter(node, data)
+
+    def test_node_errors(self) -> None:
+        node = Node([IntegerField("a"), IntegerField("b")], connector=Q.OR)
+        _, _, errors = node.get_filter({"a": "x", "b": "1"})
+        self.assertIn("a", errors)
+        self.assertSameFilter(node, {"a": "x", "b": "1"})
+
+    def test_custom_get_filter(self) -> None:
+        class CustomField(Field):
+            def get_filter(self, query_param_data):  # type: ignore
+                return Q(custom=True), {}, {}
+
+        plan = FilterPlan([Node([CustomField("a"), Field("b")])])
+        ((query, _, _),) = plan.get_filter({"b": "1"})
+        self.assertEqual(query, Q(custom=True) & Q(b="1"))
+
+    def test_custom_filter(self) -> None:
+        class ReversedField(IntegerField):
+            __slots__ = ()
+
+            def filter(self, queryset, data, raise_exceptions=False):  # type: ignore
+                queryset, errors = super().filter(queryset, data, raise_exceptions)
+                return queryset.order_by("-integer"), errors
+
+        for integer in [1, 2, 3]:
+            BasicModel.objects.create(
+                string_uno="",
+                string_dos="",
+                date=datetime.date(2026, 1, 1),
+                integer=integer,
+                boolean=True,
+            )
+
+        # The filter of the top level nodes is called like before the plans
+        plan = FilterPlan([ReversedField("min", "integer__gte"), IntegerField("a")])
+        for single_clone in [False, True]:
+            queryset, _ = plan.filter(
+                BasicModel.objects.all(), {"min": "2"}, single_clone=single_clone
+            )
+            self.assertEqual(list(queryset.values_list("integer", flat=True)), [3, 2])
+
+            _, errors = plan.filter(
+                BasicModel.objects.all(), {"min": "x"}, single_clone=single_clone
+            )
+            self.assertEqual(set(errors), {"min"})
+
+        with self.assertRaises(ValidationError):
+            plan.filter(BasicModel.objects.all(), {"min": "x"}, raise_exceptions=True)
+
+
+class SkipAbsentTests(TestCase):
+    def test_same_result(self) -> None:
+        query_fields = [
+            Field("a") | (Field("b") & IntegerField("c")),
+            IntegerField("d"),
+            Node([Field("e"), Field("f")], connector=Q.OR),
+        ]
+        plan = FilterPlan(query_fields)
+
+        for data in [{}, {"c": "1"}, {"a": "1", "f": "1"}, {"d": "x", "e": "1"}]:
+            results = plan.get_filter(data, skip_absent=True)
+            self.assertEqual(
+                [query for query, _, _ in results if query],
+                [query for query, _, _ in plan.get_filter(data) if query],
+                data,
+            )
+
+    def test_absent_fields_are_not_evaluated(self) -> None:
+        evaluated = []
+
+        class TrackedField(Field):
+            def get_raw_value_from_query_param(self, query_param_data):  # type: ignore
+                evaluated.append(self.query_param_name)
+                return super().get_raw_value_from_query_param(query_param_data)
+
+        plan = FilterPlan(
+            [
+                TrackedField("a") | TrackedField("b"),
+                TrackedField("c") & (TrackedField("d") | TrackedField("e")),
+                TrackedField("f"),
+            ]
+        )
+        plan.get_filter({"e": "1", "z": "1"}, skip_absent=True)
+        self.assertEqual(evaluated, ["e"])
+
+        self.assertEqual(plan.query_param_index["e"], (1,))
+        self.assertEqual(
+            list(plan.get_steps(frozenset(["f", "a"]))),
+            [plan.steps[0], plan.steps[2]],
+        )
+
+
+class SingleCloneTests(TestCase):
+    def test_same_result(self) -> None:
+        for integer in range(10):
+            BasicModel.objects.create(
+                string_uno="uno {}".format(integer),
+                string_dos="dos {}".format(integer % 3),
+                date=datetime.date(2026, 1, 1 + integer),
+                integer=integer,
+                boolean=integer % 2 == 0,
+            )
+
+        plan = FilterPlan(ModelViewSet.query_params)
+        queryset = BasicModel.objects.order_by("pk")
+
+        for data in [
+            {"search_startswith": "dos"},
+            {"string_concat": "1 dos", "boolean": "1"},
+            {"search_exact": "dos 2", "date": "2026-01-01,2026-01-05"},
+        ]:
+            expected, _ = plan.filter(queryset, data)
+            result, _ = plan.filter(queryset, data, single_clone=True)
+            self.assertEqual(list(result), list(expected), data)
+
+    def test_errors(self) -> None:
+        plan = FilterPlan([IntegerField("a"), IntegerField("b")])
+        queryset = BasicModel.objects.all()
+
+        _, errors = plan.filter(queryset, {"a": "x", "b": "y"}, single_clone=True)
+        self.assertEqual(set(errors), {"a", "b"})
+
+        with self.assertRaises(ValidationError) as context:
+            plan.filter(queryset, {"a": "x", "b": "y"}, True, single_clone=True)
+        self.assertEqual(set(context.exception.detail), {"a", "b"})
+
+
+class AnnotationsTests(TestCase):
+    def test_shared_alias(self) -> None:
+        BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date(2026, 1, 1),
+            integer=1,
+            boolean=True,
+        )
+        targets = ["string_uno", Value(" "), "string_dos"]
+        plan = FilterPlan(
+            [
+                ConcatField("a", targets, lookup="icontains"),
+                ConcatField("b", targets, lookup="startswith")
+                | ConcatField("a", targets, lookup="icontains"),
+            ]
+        )
+        self.assertEqual(list(plan.annotations), ["_a"])
+
+        ((query, annotate, _),) = plan.get_filter({"b": "uno"}, skip_absent=True)
+        self.assertEqual(query, Q(_a__startswith="uno"))
+        self.assertEqual(list(annotate), ["_a"])
+
+        queryset, _ = plan.filter(BasicModel.objects.all(), {"a": "o d", "b": "uno"})
+        self.assertEqual(list(queryset.query.annotations), ["_a"])
+        self.assertEqual(queryset.count(), 1)
+
+    def test_name_collision(self) -> None:
+        a = ConcatField("a", ["string_uno", "string_dos"])
+        b = ConcatField("b", ["string_dos", "string_uno"], target_field_name="_a")
+
+        with self.assertRaises(ValueError):
+            FilterPlan([a, b])
+
+
+class PlanCacheTests(TestCase):
+    def test_reuse_and_eviction(self) -> None:
+        cache = PlanCache(maxsize=2)
+        fields_a = [Field("a")]
+        fields_b = [Field("b")]
+        fields_c = [Field("c")]
+
+        plan_a = cache.get(fields_a)
+        self.assertIs(cache.get(fields_a), plan_a)
+        cache.get(fields_b)
+        cache.get(fields_a)
+        cache.get(fields_c)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn(fields_a, cache)
+        self.assertNotIn(fields_b, cache)
+        self.assertIn(fields_c, cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    @override_settings(ROOT_URLCONF="tests.test_filters")
+    def test_warm_filter_plans(self) -> None:
+        QueryParamFilter.plan_cache.clear()
+        self.assertEqual(warm_filter_plans(), 1)
+        self.assertIn(ModelViewSet.query_params, QueryParamFilter.plan_cache)
+
+    def test_skip_callable_query_params(self) -> None:
+        class View:
+            def get_query_params(self) -> list[Node]:
+                return [Field("a")]
+
+        self.assertIsNone(QueryParamFilter().warm_filter_plan(View))
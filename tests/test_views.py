@@ -0,0 +1,188 @@
+import datetime
+from typing import Any
+
+
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import (
+    include,
+    path,
+)
+from rest_framework.request import Request
+from rest_framework.routers import SimpleRouter
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+)
+
+
+from drf_query_filter import fields
+from drf_query_filter.filters import QueryParamFilter
+from drf_query_filter.views import (
+    FilterCacheHeadersMixin,
+    FilterFreshnessMixin,
+)
+
+
+from .models import BasicModel
+from .test_filters import ModelViewSet
+
+
+class CacheHeadersViewSet(FilterCacheHeadersMixin, ModelViewSet):
+    query_params = ModelViewSet.query_params + [
+        fields.InIntegerField("integers", "integer"),
+    ]
+    query_raise_exceptions = False
+    filter_cache_control = {"max_age": 60, "public": True}
+
+
+class FreshnessViewSet(FilterFreshnessMixin, CacheHeadersViewSet):
+    freshness_field = "date"
+
+
+router = SimpleRouter()
+router.register("headers", CacheHeadersViewSet)
+router.register("freshness", FreshnessViewSet, basename="freshness")
+
+urlpatterns = [path("api/", include(router.urls))]
+
+
+class FilterKeyTests(TestCase):
+    def get_filter_key(self, query_params: dict[str, str]) -> str:
+        request = Request(APIRequestFactory().get("/", query_params))
+        return QueryParamFilter().get_filter_key(request, CacheHeadersViewSet())
+
+    def test_canonical_values(self) -> None:
+        key = self.get_filter_key({"boolean": "true", "integers": "3,1,2"})
+
+        for query_params in [
+            {"integers": "1,2,3,3", "boolean": "1"},
+            {"boolean": "t", "integers": "3,1,2", "other": "1"},
+        ]:
+            self.assertEqual(key, self.get_filter_key(query_params))
+
+        self.assertNotEqual(
+            key, self.get_filter_key({"boolean": "0", "integers": "1,2,3"})
+        )
+
+    def test_invalid_values_are_dropped(self) -> None:
+        self.assertEqual(
+            self.get_filter_key({"pk": "a", "integers": "1"}),
+            self.get_filter_key({"integers": "1"}),
+        )
+
+    def test_filter_values(self) -> None:
+        request = Request(
+            APIRequestFactory().get(
+                "/", {"date": "2020-01-01,", "integers": "2,1", "pk": "01"}
+            )
+        )
+        self.assertEqual(
+            QueryParamFilter().get_filter_values(request, CacheHeadersViewSet()),
+            [("date", ["2020-01-01", None]), ("integers", [1, 2]), ("pk", 1)],
+        )
+
+
+@override_settings(ROOT_URLCONF="tests.test_views")
+class FilterCacheHeadersMixinTests(TestCase):
+    def setUp(self) -> None:
+        self.row = BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date(2020, 1, 1),
+            integer=10,
+            boolean=True,
+        )
+
+    def test_cache_control(self) -> None:
+        response = APIClient().get("/api/headers/", {"integers": "10,20"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("max-age=60", response["Cache-Control"])
+        # Without the data the ETag would answer 304 after the rows change
+        self.assertFalse(response.has_header("ETag"))
+
+        response = APIClient().get("/api/headers/{}/".format(self.row.pk))
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(ROOT_URLCONF="tests.test_views")
+class FilterFreshnessMixinTests(TestCase):
+    def setUp(self) -> None:
+        self.row = BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date(2020, 1, 1),
+            integer=10,
+            boolean=True,
+        )
+        self.client = APIClient()
+
+    def get(self, etag: str = "") -> Any:
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(
+            "/api/freshness/", {"integers": "10,20"}, headers=headers
+        )
+
+    def test_not_modified(self) -> None:
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # A single aggregate, the page is not queried nor serialized
+        with self.assertNumQueries(1):
+            response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        self.assertEqual(self.get('"other", ' + etag).status_code, 304)
+        self.assertEqual(self.get("*").status_code, 304)
+
+    def test_modified(self) -> None:
+        etag = self.get()["ETag"]
+
+        self.row.date = datetime.date(2020, 1, 2)
+        self.row.save()
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+
+        BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date(2020, 1, 1),
+            integer=20,
+            boolean=True,
+        )
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        # Rows that do not match the filter do not change the ETag
+        etag = response["ETag"]
+        BasicModel.objects.create(
+            string_uno="uno",
+            string_dos="dos",
+            date=datetime.date(2021, 1, 1),
+            integer=30,
+            boolean=True,
+        )
+        self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_equivalent_requests(self) -> None:
+        def get_etag(query_params: dict[str, str]) -> str:
+            response = self.client.get("/api/freshness/", query_params)
+            self.assertEqual(response.status_code, 200)
+            return response["ETag"]
+
+        etag = get_etag({"integers": "10,20", "boolean": "true"})
+
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(etag, get_etag({"boolean": "1", "integers": "20,10"}))
+        self.assertNotEqual(
+            etag, get_etag({"boolean": "1", "integers": "20,10", "page": "2"})
+        )
+        self.assertNotEqual(etag, get_etag({"boolean": "1"}))